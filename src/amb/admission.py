@@ -0,0 +1,239 @@
+"""
+Admission Module for AMB Hallucination Prevention
+Concurrency limits, bounded queueing and latency-based load shedding
+"""
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Waiter:
+    """
+    A queued request waiting for a slot, from a thread or an event loop
+    """
+    
+    __slots__ = ("event", "loop", "future")
+    
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+    
+    def grant(self):
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+    
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(True)
+
+
+class AdmissionController:
+    """
+    Admits requests up to a concurrency limit and sheds load once the SLO is out of reach
+    
+    Requests beyond max_concurrency wait in a FIFO queue of at most max_queue
+    entries. A queued request is rejected up front if its predicted queue wait
+    plus service time exceeds max_response_time_ms, and rejected later if it
+    is still queued when that budget runs out. Service time is an
+    exponentially weighted average of recent request durations, so shedding
+    follows live latency. Slots are handed directly to the oldest waiter.
+    """
+    
+    def __init__(self, max_concurrency: int = 64, max_queue: int = 256, max_response_time_ms: float = 200,
+                 smoothing: float = 0.2):
+        """
+        Initialize AdmissionController
+        
+        Args:
+            max_concurrency: Maximum requests processed at once
+            max_queue: Maximum requests waiting for a slot
+            max_response_time_ms: Latency target a queued request must still be able to meet
+            smoothing: Weight of the newest observation in the service time average (0-1]
+        """
+        if max_concurrency <= 0:
+            raise ValueError("Max concurrency must be positive")
+        
+        if max_queue < 0:
+            raise ValueError("Max queue must be non-negative")
+        
+        if max_response_time_ms <= 0:
+            raise ValueError("Max response time must be positive")
+        
+        if not 0 < smoothing <= 1:
+            raise ValueError("Smoothing must be in (0, 1]")
+        
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_response_time_ms = max_response_time_ms
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self.admitted = 0
+        self.max_queue_depth = 0
+        self.rejected = {"queue_full": 0, "slo": 0, "timeout": 0}
+        self._predicted_service_time = None
+        self._waiters = deque()
+        self._lock = threading.Lock()
+    
+    @property
+    def predicted_service_time(self) -> float:
+        """
+        Predicted duration of one request in seconds (0 until observed)
+        """
+        return self._predicted_service_time or 0.0
+    
+    @property
+    def queue_depth(self) -> int:
+        """
+        Number of requests currently waiting for a slot
+        """
+        return len(self._waiters)
+    
+    def acquire(self) -> Optional[str]:
+        """
+        Wait for a slot from a thread
+        
+        Returns:
+            None if admitted, otherwise the rejection reason
+        """
+        with self._lock:
+            admitted, rejection, budget = self._admit_or_queue()
+            if admitted or rejection:
+                return rejection
+            waiter = self._enqueue(_Waiter())
+        
+        if waiter.event.wait(budget):
+            return None
+        
+        return self._expire(waiter)
+    
+    async def acquire_async(self) -> Optional[str]:
+        """
+        Wait for a slot from an asyncio task
+        
+        Returns:
+            None if admitted, otherwise the rejection reason
+        """
+        with self._lock:
+            admitted, rejection, budget = self._admit_or_queue()
+            if admitted or rejection:
+                return rejection
+            waiter = self._enqueue(_Waiter(asyncio.get_running_loop()))
+        
+        try:
+            await asyncio.wait_for(waiter.future, budget)
+            return None
+        except asyncio.TimeoutError:
+            return self._expire(waiter)
+        except asyncio.CancelledError:
+            # Give back a slot that was granted while the caller was being cancelled
+            if self._expire(waiter) is None:
+                self.release()
+            raise
+    
+    def release(self, seconds: Optional[float] = None):
+        """
+        Free a slot, handing it to the oldest waiter if any
+        
+        Args:
+            seconds: Duration of the finished request, used to predict service time
+        """
+        with self._lock:
+            if seconds is not None:
+                if self._predicted_service_time is None:
+                    self._predicted_service_time = seconds
+                else:
+                    self._predicted_service_time += self.smoothing * (seconds - self._predicted_service_time)
+            
+            if self._waiters:
+                self.admitted += 1
+                self._waiters.popleft().grant()
+            else:
+                self.in_flight -= 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get admission statistics
+        
+        Returns:
+            Dictionary with in-flight and queued counts, rejections by reason and predicted service time
+        """
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "queue_depth": len(self._waiters),
+                "max_queue_depth": self.max_queue_depth,
+                "admitted": self.admitted,
+                "rejected": dict(self.rejected),
+                "predicted_service_ms": self.predicted_service_time * 1000
+            }
+    
+    def reset_stats(self):
+        """
+        Reset admission counters (in-flight and queued requests are kept)
+        """
+        with self._lock:
+            self.admitted = 0
+            self.max_queue_depth = len(self._waiters)
+            self.rejected = {reason: 0 for reason in self.rejected}
+    
+    def _admit_or_queue(self) -> Tuple[bool, Optional[str], Optional[float]]:
+        """
+        Decide on a new request (caller holds the lock)
+        
+        Returns:
+            Tuple of (admitted_now, rejection_reason, max_queue_wait_seconds)
+        """
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True, None, None
+        
+        position = len(self._waiters)
+        if position >= self.max_queue:
+            return False, self._reject("queue_full", f"Admission queue full ({self.max_queue} waiting)"), None
+        
+        service = self.predicted_service_time
+        budget = self.max_response_time_ms / 1000 - service
+        predicted_wait = service * (position // self.max_concurrency + 1)
+        
+        if predicted_wait > budget:
+            return False, self._reject(
+                "slo", f"Predicted latency {(predicted_wait + service) * 1000:.1f}ms exceeds "
+                       f"{self.max_response_time_ms}ms"
+            ), None
+        
+        return False, None, budget
+    
+    def _enqueue(self, waiter: _Waiter) -> _Waiter:
+        self._waiters.append(waiter)
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        return waiter
+    
+    def _expire(self, waiter: _Waiter) -> Optional[str]:
+        """
+        Withdraw a waiter whose wait ended without a grant
+        
+        Args:
+            waiter: Queued waiter
+        
+        Returns:
+            Rejection reason, or None if the slot was granted in the meantime
+        """
+        with self._lock:
+            if waiter not in self._waiters:
+                return None
+            self._waiters.remove(waiter)
+            return self._reject("timeout", "Queued past the latency budget")
+    
+    def _reject(self, reason: str, message: str) -> str:
+        self.rejected[reason] += 1
+        logger.warning(f"Request shed: {message}")
+        return message
\ No newline at end of file
@@ -0,0 +1,241 @@
+"""
+Audit Module for AMB Hallucination Prevention
+Rotating compressed JSONL audit segments written from a background thread
+"""
+
+import glob
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Dict, Any, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SegmentAuditSink:
+    """
+    Appends audit entries to rotating gzip-compressed JSONL segments
+    
+    write() only puts the entry on a bounded buffer; a daemon thread drains
+    it every flush_interval seconds and appends each batch to the current
+    segment as its own gzip member, so everything flushed stays readable
+    even if the process dies mid-segment. A new segment is started once the
+    current one holds segment_bytes of uncompressed JSON or is older than
+    segment_seconds. When the buffer is full, write() blocks for up to
+    backpressure_timeout seconds and then drops the entry and counts it.
+    Entries written after close() are dropped and counted the same way.
+    """
+    
+    def __init__(self, directory: str, segment_bytes: int = 8 * 1024 * 1024, segment_seconds: float = 3600,
+                 flush_interval: float = 1.0, max_buffer: int = 10000, backpressure_timeout: float = 0.05):
+        """
+        Initialize SegmentAuditSink
+        
+        Args:
+            directory: Directory holding the segments (created if missing)
+            segment_bytes: Uncompressed bytes per segment before rotating
+            segment_seconds: Segment age in seconds before rotating
+            flush_interval: Seconds between background flushes
+            max_buffer: Maximum entries buffered before write() applies backpressure
+            backpressure_timeout: Seconds write() waits for buffer space before dropping
+        """
+        if segment_bytes <= 0 or segment_seconds <= 0:
+            raise ValueError("Segment size and age must be positive")
+        
+        if flush_interval <= 0:
+            raise ValueError("Flush interval must be positive")
+        
+        if max_buffer <= 0 or backpressure_timeout < 0:
+            raise ValueError("Buffer size must be positive and backpressure timeout non-negative")
+        
+        os.makedirs(directory, exist_ok=True)
+        
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.flush_interval = flush_interval
+        self.backpressure_timeout = backpressure_timeout
+        self.written = 0
+        self.dropped = 0
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        self._buffer = queue.Queue(maxsize=max_buffer)
+        self._segment_index = self._last_segment_index()
+        self._segment_path = None
+        self._segment_size = 0
+        self._segment_started = 0.0
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="amb-audit-sink", daemon=True)
+        self._thread.start()
+    
+    def write(self, stream: str, entry: Any):
+        """
+        Queue an audit entry
+        
+        Args:
+            stream: Audit stream the entry belongs to (such as "validation")
+            entry: JSON-serializable entry, or a record whose to_dict() is called when it is written
+        """
+        if self._closed:
+            self._count_dropped(1)
+            return
+        
+        try:
+            self._buffer.put((stream, entry), timeout=self.backpressure_timeout)
+        except queue.Full:
+            self._count_dropped(1)
+            return
+        
+        # Raced with close(); its final flush may already have run
+        if self._closed:
+            self.flush()
+    
+    def flush(self):
+        """
+        Write all buffered entries now
+        """
+        # Draining under the lock keeps concurrent flushes from reordering entries
+        with self._flush_lock:
+            entries = []
+            while True:
+                try:
+                    entries.append(self._buffer.get_nowait())
+                except queue.Empty:
+                    break
+            
+            start = 0
+            while start < len(entries):
+                start = self._append(entries, start)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get sink statistics
+        
+        Returns:
+            Dictionary with written, dropped and buffered entry counts and the current segment
+        """
+        with self._stats_lock:
+            written, dropped = self.written, self.dropped
+        
+        return {
+            "written": written,
+            "dropped": dropped,
+            "buffered": self._buffer.qsize(),
+            "segment": self._segment_path
+        }
+    
+    def close(self):
+        """
+        Stop the background thread and write remaining entries
+        """
+        self._closed = True
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+    
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+    
+    def _append(self, entries: List, start: int) -> int:
+        """
+        Append entries to the current segment up to its rotation point (caller holds the flush lock)
+        
+        Args:
+            entries: Buffered (stream, entry) pairs
+            start: Index of the first entry to write
+        
+        Returns:
+            Index of the first entry not written
+        """
+        if self._segment_path is None or time.monotonic() - self._segment_started >= self.segment_seconds:
+            self._rotate()
+        
+        lines = []
+        size = self._segment_size
+        index = start
+        while index < len(entries) and (size < self.segment_bytes or not lines):
+            stream, entry = entries[index]
+            if not isinstance(entry, dict):
+                entry = entry.to_dict()
+            line = json.dumps({"stream": stream, **entry}, default=str) + "\n"
+            lines.append(line)
+            size += len(line)
+            index += 1
+        
+        try:
+            with open(self._segment_path, "ab") as segment:
+                segment.write(gzip.compress("".join(lines).encode()))
+            with self._stats_lock:
+                self.written += len(lines)
+        except OSError as e:
+            logger.error(f"Audit write failed: {str(e)}")
+            self._count_dropped(len(lines))
+        
+        self._segment_size = size
+        if size >= self.segment_bytes:
+            self._segment_path = None
+        
+        return index
+    
+    def _count_dropped(self, count: int):
+        with self._stats_lock:
+            self.dropped += count
+    
+    def _rotate(self):
+        """
+        Start a new segment (caller holds the flush lock)
+        """
+        self._segment_index += 1
+        self._segment_path = os.path.join(self.directory, f"audit-{self._segment_index:08d}.jsonl.gz")
+        self._segment_size = 0
+        self._segment_started = time.monotonic()
+        logger.debug(f"Audit segment {self._segment_path} started")
+    
+    def _last_segment_index(self) -> int:
+        segments = segment_paths(self.directory)
+        if not segments:
+            return 0
+        return int(os.path.basename(segments[-1])[len("audit-"):-len(".jsonl.gz")])
+
+
+def segment_paths(directory: str) -> List[str]:
+    """
+    List audit segments in write order
+    
+    Args:
+        directory: Directory written by SegmentAuditSink
+    
+    Returns:
+        Segment paths, oldest first
+    """
+    return sorted(glob.glob(os.path.join(directory, "audit-[0-9]*.jsonl.gz")))
+
+
+def read_audit(directory: str, stream: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream audit entries back from their segments, oldest first
+    
+    Segments are decompressed line by line, so memory use does not grow
+    with the size of the trail.
+    
+    Args:
+        directory: Directory written by SegmentAuditSink
+        stream: Only yield entries of this stream (all streams if None)
+    
+    Yields:
+        Audit entries, each with its "stream" key
+    """
+    for path in segment_paths(directory):
+        with gzip.open(path, "rt", encoding="utf-8") as segment:
+            for line in segment:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if stream is None or entry["stream"] == stream:
+                    yield entry
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""
+Check Graph Module for AMB Hallucination Prevention
+Dependency-ordered execution of validation checks with memoized results
+"""
+
+import contextvars
+import logging
+from concurrent.futures import Executor, FIRST_COMPLETED, wait
+from typing import Dict, Any, Callable, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class CheckNode:
+    """
+    A check with named inputs and outputs
+    """
+    
+    def __init__(self, name: str, func: Callable[..., Dict[str, Any]], inputs: Iterable[str],
+                 outputs: Iterable[str]):
+        """
+        Initialize CheckNode
+        
+        Args:
+            name: Node name
+            func: Callable taking the inputs as keyword arguments and returning a dict of outputs
+            inputs: Names of the values the node reads
+            outputs: Names of the values the node produces
+        """
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+    
+    def run(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run the node on the available values
+        
+        Args:
+            values: Values computed so far
+        
+        Returns:
+            Dictionary of the node's outputs
+        """
+        result = self.func(**{name: values[name] for name in self.inputs})
+        
+        missing = set(self.outputs) - set(result)
+        if missing:
+            raise ValueError(f"Check {self.name} did not produce {sorted(missing)}")
+        
+        return {name: result[name] for name in self.outputs}
+
+
+class CheckGraph:
+    """
+    Runs check nodes in dependency order, computing each output once per run
+    
+    Values not produced by any node are external inputs supplied to run().
+    A run only executes the nodes needed for the requested outputs and skips
+    any node whose outputs are already present, so a values dictionary can be
+    reused across stages of one request. With an executor, nodes whose inputs
+    are ready run concurrently.
+    """
+    
+    def __init__(self, nodes: List[CheckNode]):
+        """
+        Initialize CheckGraph
+        
+        Args:
+            nodes: Check nodes (each output must be produced by exactly one node)
+        """
+        self.nodes = {}
+        self._producers = {}
+        
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"Duplicate check node: {node.name}")
+            self.nodes[node.name] = node
+            
+            for output in node.outputs:
+                if output in self._producers:
+                    raise ValueError(f"Output {output} produced by both {self._producers[output]} and {node.name}")
+                self._producers[output] = node.name
+        
+        self.order = self._topological_order()
+    
+    @property
+    def external_inputs(self) -> Set[str]:
+        """
+        Values that must be supplied to run()
+        """
+        return {name for node in self.nodes.values() for name in node.inputs if name not in self._producers}
+    
+    def run(self, values: Dict[str, Any], targets: Iterable[str], executor: Optional[Executor] = None) -> Dict[str, Any]:
+        """
+        Compute the target values
+        
+        Args:
+            values: External inputs and any previously computed values (updated in place)
+            targets: Names of the values to compute
+            executor: Optional executor to run independent nodes concurrently
+        
+        Returns:
+            The updated values dictionary
+        """
+        pending = self._required_nodes(targets, values)
+        
+        missing = {name for node in pending for name in self.nodes[node].inputs
+                   if name not in values and name not in self._producers}
+        if missing:
+            raise ValueError(f"Missing check inputs: {sorted(missing)}")
+        
+        if executor is None:
+            for name in self.order:
+                if name in pending:
+                    values.update(self.nodes[name].run(values))
+            return values
+        
+        running = {}
+        while pending or running:
+            for name in [n for n in self.order if n in pending and self._ready(n, values)]:
+                pending.discard(name)
+                # Each node gets its own copy of the caller's context (e.g. the active span)
+                context = contextvars.copy_context()
+                running[executor.submit(context.run, self.nodes[name].run, dict(values))] = name
+            
+            if not running:
+                raise ValueError(f"Check nodes cannot run: {sorted(pending)}")
+            
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                del running[future]
+                values.update(future.result())
+        
+        return values
+    
+    def _ready(self, name: str, values: Dict[str, Any]) -> bool:
+        return all(value in values for value in self.nodes[name].inputs)
+    
+    def _required_nodes(self, targets: Iterable[str], values: Dict[str, Any]) -> Set[str]:
+        """
+        Find the nodes needed to produce the targets from the given values
+        
+        Args:
+            targets: Names of the values to compute
+            values: Values already available
+        
+        Returns:
+            Set of node names to run
+        """
+        required = set()
+        stack = [target for target in targets if target not in values]
+        
+        while stack:
+            value = stack.pop()
+            producer = self._producers.get(value)
+            if producer is None:
+                raise ValueError(f"No check produces {value}")
+            if producer in required:
+                continue
+            required.add(producer)
+            stack.extend(name for name in self.nodes[producer].inputs
+                         if name not in values and name in self._producers)
+        
+        return required
+    
+    def _topological_order(self) -> List[str]:
+        """
+        Order nodes so every node follows the producers of its inputs
+        
+        Returns:
+            Node names in dependency order
+        """
+        order = []
+        state = {}
+        
+        def visit(name: str, path: List[str]):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Check dependency cycle: {' -> '.join(path + [name])}")
+            
+            state[name] = "visiting"
+            for value in self.nodes[name].inputs:
+                producer = self._producers.get(value)
+                if producer is not None:
+                    visit(producer, path + [name])
+            state[name] = "done"
+            order.append(name)
+        
+        for name in self.nodes:
+            visit(name, [])
+        
+        return order
\ No newline at end of file
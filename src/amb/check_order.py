@@ -0,0 +1,134 @@
+"""
+Check Order Module for AMB Hallucination Prevention
+Cost-aware runtime ordering of short-circuiting checks
+"""
+
+import logging
+import threading
+from typing import Dict, Any, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveCheckOrder:
+    """
+    Orders checks that stop at the first rejection to minimize expected cost
+    
+    Each check's duration and rejection rate are tracked as exponentially
+    weighted averages. For independent checks that stop at the first
+    rejection, running them in ascending cost / rejection-rate order
+    minimizes the expected cost per call. The declared order is kept until
+    every check has min_samples observations, and the order is recomputed
+    every reorder_interval observations rather than on every call. Checks
+    with side effects are pinned after all others in their declared order,
+    so they only run once every side-effect-free check has passed.
+    """
+    
+    def __init__(self, checks: Iterable[str], smoothing: float = 0.05, min_samples: int = 20,
+                 reorder_interval: int = 50, pinned_last: Iterable[str] = ()):
+        """
+        Initialize AdaptiveCheckOrder
+        
+        Args:
+            checks: Check names in their declared (fallback) order
+            smoothing: Weight of the newest observation in the averages (0-1]
+            min_samples: Observations per check before reordering starts
+            reorder_interval: Observations between order recomputations
+            pinned_last: Checks with side effects, always run last in declared order
+        """
+        if not 0 < smoothing <= 1:
+            raise ValueError("Smoothing must be in (0, 1]")
+        
+        if min_samples <= 0 or reorder_interval <= 0:
+            raise ValueError("Min samples and reorder interval must be positive")
+        
+        self.checks = tuple(checks)
+        self.pinned_last = tuple(name for name in self.checks if name in set(pinned_last))
+        self.smoothing = smoothing
+        self.min_samples = min_samples
+        self.reorder_interval = reorder_interval
+        self._stats = {name: {"samples": 0, "cost": 0.0, "reject_rate": 0.0} for name in self.checks}
+        self._order = tuple(name for name in self.checks if name not in self.pinned_last) + self.pinned_last
+        self._since_reorder = 0
+        self._lock = threading.Lock()
+    
+    def order(self, enabled: Iterable[str] = None) -> List[str]:
+        """
+        Get the current run order
+        
+        Args:
+            enabled: Checks to include (all checks if None)
+        
+        Returns:
+            Check names in the order they should run
+        """
+        if enabled is None:
+            return list(self._order)
+        
+        enabled = set(enabled)
+        return [name for name in self._order if name in enabled]
+    
+    def record(self, name: str, seconds: float, rejected: bool):
+        """
+        Record one run of a check
+        
+        Args:
+            name: Check name
+            seconds: Time the check took
+            rejected: Whether the check rejected the input
+        """
+        with self._lock:
+            stats = self._stats[name]
+            if stats["samples"] == 0:
+                stats["cost"] = seconds
+                stats["reject_rate"] = float(rejected)
+            else:
+                stats["cost"] += self.smoothing * (seconds - stats["cost"])
+                stats["reject_rate"] += self.smoothing * (float(rejected) - stats["reject_rate"])
+            stats["samples"] += 1
+            
+            self._since_reorder += 1
+            if self._since_reorder >= self.reorder_interval:
+                self._since_reorder = 0
+                self._reorder()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get per-check cost and rejection statistics
+        
+        Returns:
+            Dictionary with the current order and per-check averages
+        """
+        with self._lock:
+            return {
+                "order": list(self._order),
+                "checks": {
+                    name: {
+                        "samples": stats["samples"],
+                        "cost_ms": stats["cost"] * 1000,
+                        "reject_rate": stats["reject_rate"]
+                    }
+                    for name, stats in self._stats.items()
+                }
+            }
+    
+    def _reorder(self):
+        """
+        Recompute the order from current statistics (caller holds the lock)
+        """
+        if any(stats["samples"] < self.min_samples for stats in self._stats.values()):
+            return
+        
+        def rank(item: Tuple[int, str]) -> Tuple[float, int]:
+            index, name = item
+            stats = self._stats[name]
+            # A check that never rejects only adds cost, so it goes last
+            reject_rate = max(stats["reject_rate"], 1e-6)
+            return stats["cost"] / reject_rate, index
+        
+        movable = [(index, name) for index, name in enumerate(self.checks) if name not in self.pinned_last]
+        order = tuple(name for _, name in sorted(movable, key=rank)) + self.pinned_last
+        
+        if order != self._order:
+            logger.info(f"Check order changed: {' -> '.join(order)}")
+            self._order = order
\ No newline at end of file
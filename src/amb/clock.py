@@ -0,0 +1,98 @@
+"""
+Clock Module for AMB Hallucination Prevention
+Per-request clock snapshot shared by every component that timestamps the request
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from .records import format_timestamp
+
+_current_clock = contextvars.ContextVar("amb_request_clock", default=None)
+
+
+class RequestClock:
+    """
+    One monotonic and one wall-clock reading taken when a request starts
+    
+    Every timestamp recorded while handling the request reuses these
+    readings, so a response carries one consistent time and the clock is
+    read once instead of per record. The ISO form is formatted on first use
+    and memoized. scan_time accumulates the seconds spent scanning content,
+    which ContentScanner charges against its per-request budget.
+    """
+    
+    __slots__ = ("started", "wall_time", "scan_time", "_iso")
+    
+    def __init__(self):
+        self.started = time.monotonic()
+        self.wall_time = time.time()
+        self.scan_time = 0.0
+        self._iso = None
+    
+    @property
+    def iso(self) -> str:
+        """
+        Wall-clock start as a naive ISO 8601 UTC string
+        """
+        if self._iso is None:
+            self._iso = format_timestamp(self.wall_time)
+        return self._iso
+    
+    def elapsed(self) -> float:
+        """
+        Seconds since the request started
+        """
+        return time.monotonic() - self.started
+
+
+@contextmanager
+def request_clock() -> Iterator[RequestClock]:
+    """
+    Start a request clock for the current context
+    
+    Executor work launched with a copied context sees the same clock.
+    
+    Yields:
+        The new clock
+    """
+    clock = RequestClock()
+    token = _current_clock.set(clock)
+    try:
+        yield clock
+    finally:
+        _current_clock.reset(token)
+
+
+def current_clock() -> Optional[RequestClock]:
+    """
+    Get the clock of the request being handled in this context
+    
+    Returns:
+        Active clock, or None outside a request
+    """
+    return _current_clock.get()
+
+
+def request_time() -> float:
+    """
+    Wall-clock start of the current request, or now outside a request
+    
+    Returns:
+        Seconds since the epoch
+    """
+    clock = _current_clock.get()
+    return clock.wall_time if clock is not None else time.time()
+
+
+def request_timestamp() -> str:
+    """
+    ISO timestamp of the current request, or of now outside a request
+    
+    Returns:
+        Naive ISO 8601 UTC string
+    """
+    clock = _current_clock.get()
+    return clock.iso if clock is not None else format_timestamp(time.time())
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""
+Context View Module for AMB Hallucination Prevention
+Lazy views over request contexts, including contexts sent as serialized JSON
+"""
+
+import json
+import re
+from collections.abc import Mapping
+from typing import Any, Iterator, Tuple, Union
+
+from .records import DataPoint
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def iter_json_object(text: str) -> Iterator[Tuple[str, Any]]:
+    """
+    Decode the members of a serialized JSON object one at a time
+    
+    Only the member being yielded is decoded, so walking a large object
+    never holds more than one of its values. Duplicate keys are yielded as
+    they appear.
+    
+    Args:
+        text: Serialized JSON object
+    
+    Yields:
+        (key, value) pairs in document order
+    
+    Raises:
+        ValueError: If the text is not a well-formed JSON object
+    """
+    end = len(text)
+    index = _WHITESPACE.match(text, 0).end()
+    if index >= end or text[index] != "{":
+        raise ValueError("Serialized context must be a JSON object")
+    
+    index = _WHITESPACE.match(text, index + 1).end()
+    if index < end and text[index] == "}":
+        index += 1
+    else:
+        while True:
+            if index >= end or text[index] != '"':
+                raise ValueError(f"Expected a member name at offset {index}")
+            key, index = _DECODER.raw_decode(text, index)
+            
+            index = _WHITESPACE.match(text, index).end()
+            if index >= end or text[index] != ":":
+                raise ValueError(f"Expected ':' at offset {index}")
+            value, index = _DECODER.raw_decode(text, _WHITESPACE.match(text, index + 1).end())
+            yield key, value
+            
+            index = _WHITESPACE.match(text, index).end()
+            if index < end and text[index] == ",":
+                index = _WHITESPACE.match(text, index + 1).end()
+            elif index < end and text[index] == "}":
+                index += 1
+                break
+            else:
+                raise ValueError(f"Expected ',' or '}}' at offset {index}")
+    
+    if _WHITESPACE.match(text, index).end() != end:
+        raise ValueError(f"Unexpected data after the context object at offset {index}")
+
+
+class JsonContext(Mapping):
+    """
+    Read-only mapping over a context sent as a serialized JSON object
+    
+    The payload is decoded to text once and its members are parsed on
+    demand each time the context is walked, so a context with a very large
+    number of keys is never materialized as a dict. Key lookups scan the
+    text as well; they are meant for the occasional field such as "source",
+    and as with json.loads the last duplicate key wins. Malformed JSON past
+    the opening brace raises ValueError when it is reached.
+    """
+    
+    def __init__(self, raw: Union[bytes, bytearray, memoryview, str]):
+        """
+        Initialize JsonContext
+        
+        Args:
+            raw: Serialized JSON object (UTF-8 when given as bytes)
+        """
+        self.text = raw if isinstance(raw, str) else bytes(raw).decode("utf-8")
+        
+        start = _WHITESPACE.match(self.text, 0).end()
+        if start >= len(self.text) or self.text[start] != "{":
+            raise ValueError("Serialized context must be a JSON object")
+        
+        first = _WHITESPACE.match(self.text, start + 1).end()
+        self._empty = self.text[first:first + 1] == "}"
+    
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return iter_json_object(self.text)
+    
+    def values(self) -> Iterator[Any]:
+        return (value for _, value in self.items())
+    
+    def __iter__(self) -> Iterator[str]:
+        return (key for key, _ in self.items())
+    
+    def __getitem__(self, key: str) -> Any:
+        found = False
+        result = None
+        for member, value in self.items():
+            if member == key:
+                found, result = True, value
+        if not found:
+            raise KeyError(key)
+        return result
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self.items())
+    
+    def __bool__(self) -> bool:
+        return not self._empty
+    
+    def __repr__(self) -> str:
+        return f"JsonContext({len(self.text)} chars)"
+
+
+class DataPointView:
+    """
+    Lazy data points over a context mapping
+    
+    Every iteration walks the context's items and yields a DataPoint for
+    each non-None value, so the points are never collected into a list
+    before validation picks the ones it accepts.
+    """
+    
+    __slots__ = ("context", "source", "timestamp")
+    
+    def __init__(self, context: Mapping, timestamp: float, source: str = "context"):
+        """
+        Initialize DataPointView
+        
+        Args:
+            context: Context mapping (a dict or JsonContext)
+            timestamp: Timestamp given to every data point
+            source: Source recorded on every data point
+        """
+        self.context = context
+        self.source = source
+        self.timestamp = timestamp
+    
+    def __iter__(self) -> Iterator[DataPoint]:
+        for key, value in self.context.items():
+            if value is not None:
+                yield DataPoint(key, value, self.source, self.timestamp)
\ No newline at end of file
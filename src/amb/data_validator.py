@@ -3,35 +3,145 @@ Data Validator Module for AMB Hallucination Prevention
 Validates raw data to prevent hallucinations
 """
 
+import bisect
 import re
 import logging
-from typing import Dict, Any, Tuple, Optional, List
-from datetime import datetime
+from typing import Dict, Any, Callable, Tuple, Optional, List
 import hashlib
+import itertools
+import threading
+
+from .audit import SegmentAuditSink
+from .clock import request_time
+from .log_pipeline import PER_REQUEST
+from .records import ValidationRecord
+from .scanning import ContentScanner, ScanBudgetExceeded, linear_pattern
+from .shared_store import SharedReferenceStore
+from .tracing import Tracer, NOOP_TRACER, current_span
 
 logger = logging.getLogger(__name__)
 
+# Common hallucination patterns and the confidence multiplier applied per hit
+HALLUCINATION_PATTERNS = [
+    r'(?i)as an ai',
+    r'(?i)i cannot',
+    r'(?i)i don\'t have access',
+    r'\[PLACEHOLDER\]',
+    r'\[INSERT.*HERE\]'
+]
+HALLUCINATION_PENALTY = 0.3
+# Error reported for data whose pattern scan ran out of the request's scan budget
+SCAN_BUDGET_EXCEEDED = "Scan budget exceeded"
+
+# Compiled once in backtracking-free form; the combined pattern screens many texts in a single scan
+_HALLUCINATION_RES = [re.compile(linear_pattern(pattern)) for pattern in HALLUCINATION_PATTERNS]
+_HALLUCINATION_ANY = re.compile("|".join(
+    f"(?i:{regex.pattern[4:]})" if regex.pattern.startswith("(?i)") else f"(?:{regex.pattern})"
+    for regex in _HALLUCINATION_RES
+))
+
+
+class VersionedDict(dict):
+    """
+    Dict that takes a new version number on every write
+    
+    Callers fold the version into cache tokens so that anything derived
+    from the contents is dropped once they change.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._writes = itertools.count(1)
+        self.version = 0
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._bump()
+    
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._bump()
+    
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._bump()
+    
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._bump()
+        return value
+    
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._bump()
+        return value
+    
+    def popitem(self):
+        item = super().popitem()
+        self._bump()
+        return item
+    
+    def clear(self):
+        super().clear()
+        self._bump()
+    
+    def _bump(self):
+        # next() on a count is atomic, so concurrent writers never share a version
+        self.version = next(self._writes)
+
 
 class DataValidator:
     """
     Validates data points against source truth to prevent raw data hallucination
     """
     
-    def __init__(self, confidence_threshold: float = 0.85):
+    def __init__(self, confidence_threshold: float = 0.85, tracer: Optional[Tracer] = None,
+                 shared_store: Optional[SharedReferenceStore] = None,
+                 audit_sink: Optional[SegmentAuditSink] = None,
+                 scanner: Optional[ContentScanner] = None):
         """
         Initialize DataValidator
         
         Args:
             confidence_threshold: Minimum confidence score for valid data (0-1)
+            tracer: Tracer recording validation spans (disabled by default)
+            shared_store: Shared source fingerprints consulted after source_data_cache
+            audit_sink: Durable audit trail receiving every validation event (history only if None)
+            scanner: Scanner for HALLUCINATION_PATTERNS (default chunking and no time budget if None)
         """
         if not 0 <= confidence_threshold <= 1:
             raise ValueError("Confidence threshold must be between 0 and 1")
         
         self.confidence_threshold = confidence_threshold
-        self.source_data_cache = {}
+        self.source_data_cache = VersionedDict()
+        self.shared_store = shared_store
+        self.audit_sink = audit_sink
+        self.scanner = scanner or ContentScanner(HALLUCINATION_PATTERNS)
         self.validation_history = []
+        self._history_lock = threading.Lock()
+        self._restore_loader = None
+        self._restore_lock = threading.Lock()
+        self.tracer = tracer or NOOP_TRACER
         logger.info(f"DataValidator initialized with threshold: {confidence_threshold}")
     
+    @property
+    def source_version(self) -> int:
+        """
+        Version of the source fingerprints, changed by every write to them
+        """
+        shared_version = self.shared_store.version if self.shared_store is not None else 0
+        return self.source_data_cache.version + shared_version
+    
+    def set_source_fingerprint(self, source_reference: str, digest: str):
+        """
+        Record the MD5 hex digest of a source's current content
+        
+        Args:
+            source_reference: Source reference
+            digest: MD5 hex digest validated data is compared against
+        """
+        self.source_data_cache[source_reference] = digest
+    
     def validate_data_point(self, data: Any, source_reference: str) -> Tuple[bool, float, Optional[str]]:
         """
         Validate a single data point against source reference
@@ -43,35 +153,110 @@ class DataValidator:
         Returns:
             Tuple of (is_valid, confidence_score, error_message)
         """
-        try:
-            if data is None:
-                logger.warning("Null data point received")
-                return False, 0.0, "Data point is null"
+        return self._validate_point(data, source_reference)
+    
+    def validate_data_points(self, points: List[Tuple[Any, str]]) -> List[Tuple[bool, float, Optional[str]]]:
+        """
+        Validate many data points, screening them for hallucination patterns in one scan
+        
+        Results are identical to calling validate_data_point on each point; each
+        point is converted to text once and only points flagged by the combined
+        scan are checked pattern by pattern.
+        
+        Args:
+            points: List of (data, source_reference) pairs
+            
+        Returns:
+            List of (is_valid, confidence_score, error_message) tuples in input order
+        """
+        data_strs = [str(data) for data, _ in points]
+        flagged = self.screen_patterns(data_strs)
+        
+        return [
+            self._validate_point(data, source, data_str, may_match)
+            for (data, source), data_str, may_match in zip(points, data_strs, flagged)
+        ]
+    
+    def screen_patterns(self, texts: List[str]) -> List[bool]:
+        """
+        Find which texts may contain a hallucination pattern using one combined scan
+        
+        Args:
+            texts: Texts to screen
+            
+        Returns:
+            List of flags, True where a pattern matched
+        """
+        flagged = [False] * len(texts)
+        if not texts:
+            return flagged
+        
+        # Newline separators keep matches (including ".*") inside one text
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+        
+        for match in _HALLUCINATION_ANY.finditer("\n".join(texts)):
+            flagged[bisect.bisect_right(starts, match.start()) - 1] = True
+        
+        return flagged
+    
+    def _validate_point(self, data: Any, source_reference: str, data_str: Optional[str] = None,
+                        may_match: bool = True) -> Tuple[bool, float, Optional[str]]:
+        """
+        Validate a data point, reusing its text form and pattern screen result
+        
+        Args:
+            data: Data point to validate
+            source_reference: Reference to source truth
+            data_str: Precomputed str(data)
+            may_match: False if a screen found no hallucination pattern
             
-            if not source_reference:
-                logger.warning("No source reference provided")
-                return False, 0.0, "Missing source reference"
+        Returns:
+            Tuple of (is_valid, confidence_score, error_message); data whose
+            pattern scan ran out of budget is rejected with a SCAN_BUDGET_EXCEEDED
+            error and the score of the checks made before the scan
+        """
+        with self.tracer.span("validate_data_point", source=source_reference) as span:
+            try:
+                if data is None:
+                    logger.warning("Null data point received")
+                    return False, 0.0, "Data point is null"
+            
+                if not source_reference:
+                    logger.warning("No source reference provided")
+                    return False, 0.0, "Missing source reference"
             
-            # Calculate confidence score based on data characteristics
-            confidence = self._calculate_confidence(data, source_reference)
+                # Calculate confidence score based on data characteristics
+                try:
+                    confidence = self._calculate_confidence(data, source_reference, data_str, may_match)
+                except ScanBudgetExceeded as e:
+                    logger.warning("Data validation aborted: %s", e)
+                    span.set_attribute("scan_aborted", True)
+                    return False, e.confidence, f"{SCAN_BUDGET_EXCEEDED}: {e}"
             
-            # Check if confidence meets threshold
-            is_valid = confidence >= self.confidence_threshold
+                # Check if confidence meets threshold
+                is_valid = confidence >= self.confidence_threshold
+                span.set_attribute("confidence", confidence)
+                span.set_attribute("valid", is_valid)
             
-            # Log validation result
-            self._log_validation(data, source_reference, is_valid, confidence)
+                # Log validation result
+                self._log_validation(data, source_reference, is_valid, confidence)
             
-            if not is_valid:
-                error_msg = f"Confidence {confidence:.2f} below threshold {self.confidence_threshold}"
-                logger.warning(f"Data validation failed: {error_msg}")
-                return False, confidence, error_msg
+                if not is_valid:
+                    error_msg = f"Confidence {confidence:.2f} below threshold {self.confidence_threshold}"
+                    logger.warning("Data validation failed: %s", error_msg)
+                    return False, confidence, error_msg
             
-            logger.debug(f"Data validated successfully with confidence: {confidence}")
-            return True, confidence, None
+                logger.debug("Data validated successfully with confidence: %s", confidence)
+                return True, confidence, None
             
-        except Exception as e:
-            logger.error(f"Validation error: {str(e)}")
-            return False, 0.0, f"Validation error: {str(e)}"
+            except Exception as e:
+                logger.error("Validation error: %s", e)
+                span.set_attribute("error", str(e))
+                return False, 0.0, f"Validation error: {str(e)}"
     
     def validate_batch(self, data_points: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -90,11 +275,9 @@ class DataValidator:
         valid_count = 0
         invalid_count = 0
         
-        for point in data_points:
-            data = point.get("data")
-            source = point.get("source", "")
-            
-            is_valid, confidence, error = self.validate_data_point(data, source)
+        points = [(point.get("data"), point.get("source", "")) for point in data_points]
+        
+        for (data, source), (is_valid, confidence, error) in zip(points, self.validate_data_points(points)):
             
             if is_valid:
                 valid_count += 1
@@ -109,7 +292,7 @@ class DataValidator:
                 "error": error
             })
         
-        logger.info(f"Batch validation complete: {valid_count} valid, {invalid_count} invalid")
+        logger.info("Batch validation complete: %d valid, %d invalid", valid_count, invalid_count, extra=PER_REQUEST)
         
         return {
             "valid": valid_count,
@@ -136,12 +319,12 @@ class DataValidator:
             in_bounds = min_val <= float(value) <= max_val
             
             if not in_bounds:
-                logger.warning(f"Value {value} outside bounds [{min_val}, {max_val}]")
+                logger.warning("Value %s outside bounds [%s, %s]", value, min_val, max_val)
             
             return in_bounds
             
         except (TypeError, ValueError) as e:
-            logger.error(f"Numeric bounds check failed: {str(e)}")
+            logger.error("Numeric bounds check failed: %s", e)
             return False
     
     def detect_pattern_anomaly(self, data: str, expected_pattern: str) -> bool:
@@ -163,51 +346,87 @@ class DataValidator:
             matches = bool(pattern.match(str(data)))
             
             if not matches:
-                logger.warning(f"Pattern anomaly detected: {data} doesn't match {expected_pattern}")
+                logger.warning("Pattern anomaly detected: %s doesn't match %s", data, expected_pattern)
             
             return matches
             
         except re.error as e:
-            logger.error(f"Pattern matching error: {str(e)}")
+            logger.error("Pattern matching error: %s", e)
             return False
     
-    def _calculate_confidence(self, data: Any, source_reference: str) -> float:
+    def detect_hard_patterns(self, text: str) -> List[str]:
+        """
+        Find hallucination patterns whose presence alone fails validation
+        
+        Args:
+            text: Text fragment to scan
+            
+        Returns:
+            List of matched patterns (empty if none would force rejection)
+        """
+        if not text or HALLUCINATION_PENALTY >= self.confidence_threshold:
+            return []
+        
+        return [pattern for pattern, regex in zip(HALLUCINATION_PATTERNS, _HALLUCINATION_RES) if regex.search(text)]
+    
+    def _calculate_confidence(self, data: Any, source_reference: str, data_str: Optional[str] = None,
+                              may_match: bool = True) -> float:
         """
         Calculate confidence score for data validity
         
         Args:
             data: Data to evaluate
             source_reference: Source reference
+            data_str: Precomputed str(data)
+            may_match: False to skip the per-pattern scan for screened-clean data
             
         Returns:
-            Confidence score between 0 and 1
+            Confidence score between 0 and 1; every penalty only lowers the
+            score, so scoring stops once it is below the threshold and the
+            returned score of rejected data is an upper bound
+            
+        Raises:
+            ScanBudgetExceeded: If the pattern scan runs out of budget, with the
+                score reached before it as its confidence attribute
         """
         confidence = 1.0
         
         # Reduce confidence for missing source
         if not source_reference:
             confidence *= 0.5
+            if confidence < self.confidence_threshold:
+                return confidence
         
         # Reduce confidence for suspicious patterns
-        data_str = str(data)
+        if data_str is None:
+            data_str = str(data)
         
-        # Check for common hallucination patterns
-        hallucination_patterns = [
-            r'(?i)as an ai',
-            r'(?i)i cannot',
-            r'(?i)i don\'t have access',
-            r'\[PLACEHOLDER\]',
-            r'\[INSERT.*HERE\]'
-        ]
+        span = current_span()
+        span.set_attribute("data_length", len(data_str))
         
-        for pattern in hallucination_patterns:
-            if re.search(pattern, data_str):
-                confidence *= 0.3
-                logger.debug(f"Hallucination pattern detected: {pattern}")
+        # Check for common hallucination patterns
+        if may_match:
+            try:
+                hits = self.scanner.matches(data_str)
+            except ScanBudgetExceeded as e:
+                # Score so far, an upper bound like that of any rejected data
+                e.confidence = confidence
+                raise
+            
+            for index in hits:
+                confidence *= HALLUCINATION_PENALTY
+                span.add("patterns_hit")
+                logger.debug("Hallucination pattern detected: %s", HALLUCINATION_PATTERNS[index])
+                if confidence < self.confidence_threshold:
+                    return confidence
         
         # Check data consistency
-        if source_reference in self.source_data_cache:
-            cached_hash = self.source_data_cache[source_reference]
+        self._restore_pending()
+        cached_hash = self.source_data_cache.get(source_reference)
+        if cached_hash is None and self.shared_store is not None:
+            cached_hash = self.shared_store.source_fingerprint(source_reference)
+        span.set_attribute("cache_hit", cached_hash is not None)
+        if cached_hash is not None:
             current_hash = hashlib.md5(data_str.encode()).hexdigest()
             
             if cached_hash != current_hash:
@@ -229,19 +448,19 @@ class DataValidator:
             is_valid: Validation result
             confidence: Confidence score
         """
-        validation_entry = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "data_hash": hashlib.md5(str(data).encode()).hexdigest(),
-            "source": source,
-            "valid": is_valid,
-            "confidence": confidence
-        }
+        validation_entry = ValidationRecord(request_time(), hashlib.md5(str(data).encode()).digest(), source,
+                                            is_valid, confidence)
         
-        self.validation_history.append(validation_entry)
+        # The in-memory history is a bounded recent window; the sink keeps the full trail
+        if self.audit_sink is not None:
+            self.audit_sink.write("validation", validation_entry)
         
-        # Keep history size manageable
-        if len(self.validation_history) > 10000:
-            self.validation_history = self.validation_history[-5000:]
+        with self._history_lock:
+            self.validation_history.append(validation_entry)
+            
+            # Keep history size manageable
+            if len(self.validation_history) > 10000:
+                self.validation_history = self.validation_history[-5000:]
     
     def get_validation_stats(self) -> Dict[str, Any]:
         """
@@ -250,7 +469,10 @@ class DataValidator:
         Returns:
             Dictionary with validation statistics
         """
-        if not self.validation_history:
+        with self._history_lock:
+            history = list(self.validation_history)
+        
+        if not history:
             return {
                 "total_validations": 0,
                 "valid_count": 0,
@@ -258,13 +480,54 @@ class DataValidator:
                 "average_confidence": 0.0
             }
         
-        valid_count = sum(1 for v in self.validation_history if v["valid"])
-        invalid_count = len(self.validation_history) - valid_count
-        avg_confidence = sum(v["confidence"] for v in self.validation_history) / len(self.validation_history)
+        valid_count = sum(1 for v in history if v.valid)
+        invalid_count = len(history) - valid_count
+        avg_confidence = sum(v.confidence for v in history) / len(history)
         
         return {
-            "total_validations": len(self.validation_history),
+            "total_validations": len(history),
             "valid_count": valid_count,
             "invalid_count": invalid_count,
             "average_confidence": avg_confidence
-        }
\ No newline at end of file
+        }
+    
+    def export_state(self) -> Dict[str, Any]:
+        """
+        Export the source-truth cache for a snapshot
+        
+        Returns:
+            JSON-serializable state
+        """
+        self._restore_pending()
+        return {"source_data_cache": dict(self.source_data_cache)}
+    
+    def load_state(self, state: Dict[str, Any]):
+        """
+        Restore state exported by export_state
+        
+        Args:
+            state: Exported state
+        """
+        self.source_data_cache.update(state["source_data_cache"])
+    
+    def defer_restore(self, loader: Callable[[], Dict[str, Any]]):
+        """
+        Restore exported state on first use instead of now
+        
+        Args:
+            loader: Callable returning state exported by export_state
+        """
+        with self._restore_lock:
+            self._restore_loader = loader
+    
+    def _restore_pending(self):
+        """
+        Load deferred snapshot state once
+        """
+        if self._restore_loader is None:
+            return
+        
+        with self._restore_lock:
+            loader, self._restore_loader = self._restore_loader, None
+            if loader is not None:
+                self.load_state(loader())
\ No newline at end of file
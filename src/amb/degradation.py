@@ -0,0 +1,134 @@
+"""
+Degradation Module for AMB Hallucination Prevention
+Tiered check profiles switched on rolling latency with hysteresis
+"""
+
+import logging
+import math
+import threading
+from collections import deque
+from typing import Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Checks run by each tier, from most to least thorough. Pattern detection is
+# cheap and catches most hallucinations, so every tier keeps it.
+CHECK_TIERS = {
+    "full": ("data_validation", "logic_consistency", "pattern_detection"),
+    "standard": ("data_validation", "pattern_detection"),
+    "minimal": ("pattern_detection",)
+}
+TIER_ORDER = ("full", "standard", "minimal")
+
+
+class DegradationController:
+    """
+    Picks the check tier from the rolling p95 request latency
+    
+    Latencies are kept in a rolling window. Once it holds min_samples values,
+    the tier steps down one level when p95 exceeds degrade_ratio of the
+    latency target and steps back up one level when p95 falls below
+    restore_ratio. The gap between the two ratios, and clearing the window
+    after every switch, keep the tier from flapping.
+    """
+    
+    def __init__(self, max_response_time_ms: float = 200, degrade_ratio: float = 0.9,
+                 restore_ratio: float = 0.6, window_size: int = 200, min_samples: int = 20,
+                 enabled: bool = True):
+        """
+        Initialize DegradationController
+        
+        Args:
+            max_response_time_ms: Request latency target in milliseconds
+            degrade_ratio: Fraction of the target at which checks are dropped
+            restore_ratio: Fraction of the target below which checks are restored
+            window_size: Number of recent latencies considered
+            min_samples: Samples required before the tier may change
+            enabled: Whether tiers switch automatically (always "full" if False)
+        """
+        if max_response_time_ms <= 0:
+            raise ValueError("Max response time must be positive")
+        
+        if not 0 < restore_ratio < degrade_ratio:
+            raise ValueError("Restore ratio must be positive and below the degrade ratio")
+        
+        if min_samples <= 0 or window_size < min_samples:
+            raise ValueError("Window size must be at least min_samples, which must be positive")
+        
+        self.max_response_time_ms = max_response_time_ms
+        self.degrade_ratio = degrade_ratio
+        self.restore_ratio = restore_ratio
+        self.min_samples = min_samples
+        self.enabled = enabled
+        self.tier = "full"
+        self.transitions = 0
+        self._window = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+    
+    @property
+    def checks(self) -> Tuple[str, ...]:
+        """
+        Checks enabled by the current tier
+        """
+        return CHECK_TIERS[self.tier]
+    
+    def observe(self, seconds: float):
+        """
+        Record a request latency and switch tiers if needed
+        
+        Args:
+            seconds: Request latency in seconds
+        """
+        if not self.enabled:
+            return
+        
+        with self._lock:
+            self._window.append(seconds)
+            
+            if len(self._window) < self.min_samples:
+                return
+            
+            p95_ms = self._rolling_p95() * 1000
+            level = TIER_ORDER.index(self.tier)
+            
+            if p95_ms > self.max_response_time_ms * self.degrade_ratio and level < len(TIER_ORDER) - 1:
+                self._switch(TIER_ORDER[level + 1], p95_ms)
+            elif p95_ms < self.max_response_time_ms * self.restore_ratio and level > 0:
+                self._switch(TIER_ORDER[level - 1], p95_ms)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get degradation state
+        
+        Returns:
+            Dictionary with tier, enabled checks, rolling p95 and transition count
+        """
+        with self._lock:
+            return {
+                "tier": self.tier,
+                "checks": list(self.checks),
+                "rolling_p95_ms": self._rolling_p95() * 1000,
+                "transitions": self.transitions
+            }
+    
+    def reset(self):
+        """
+        Return to the full tier and drop latency history
+        """
+        with self._lock:
+            self.tier = "full"
+            self.transitions = 0
+            self._window.clear()
+    
+    def _rolling_p95(self) -> float:
+        if not self._window:
+            return 0.0
+        ordered = sorted(self._window)
+        return ordered[max(0, math.ceil(len(ordered) * 0.95) - 1)]
+    
+    def _switch(self, tier: str, p95_ms: float):
+        logger.warning(f"Check tier {self.tier} -> {tier} (rolling p95 {p95_ms:.1f}ms, "
+                       f"target {self.max_response_time_ms}ms)")
+        self.tier = tier
+        self.transitions += 1
+        self._window.clear()
\ No newline at end of file
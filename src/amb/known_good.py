@@ -0,0 +1,134 @@
+"""
+Known Good Module for AMB Hallucination Prevention
+LRU index of content that recently passed every check
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class KnownGoodIndex:
+    """
+    Remembers verdicts for content that passed every check under a given state
+    
+    Up to capacity fingerprints are kept in LRU order. All entries are tied
+    to a state token (thresholds, fact, rule and source versions, enabled
+    checks); when the token changes the whole index is dropped.
+    """
+    
+    def __init__(self, capacity: int = 10000):
+        """
+        Initialize KnownGoodIndex
+        
+        Args:
+            capacity: Maximum fingerprints kept
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[bytes, Any]" = OrderedDict()
+        self._token: Optional[Hashable] = None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def fingerprint(content: str, scope: str = "") -> bytes:
+        """
+        Fingerprint content within a scope (such as its source reference)
+        
+        Args:
+            content: Exact content
+            scope: Extra key material the verdict depends on
+        
+        Returns:
+            16-byte digest
+        """
+        return hashlib.blake2b(f"{scope}\0{content}".encode(), digest_size=16).digest()
+    
+    def get(self, fingerprint: bytes, token: Hashable) -> Optional[Any]:
+        """
+        Look up a cached verdict
+        
+        Args:
+            fingerprint: Content fingerprint
+            token: Current validation state token
+        
+        Returns:
+            Cached verdict, or None on a miss
+        """
+        with self._lock:
+            self._check_token(token)
+            
+            if fingerprint not in self._entries:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(fingerprint)
+            self.hits += 1
+            return self._entries[fingerprint]
+    
+    def put(self, fingerprint: bytes, token: Hashable, verdict: Any):
+        """
+        Remember a verdict for content that passed every check
+        
+        Args:
+            fingerprint: Content fingerprint
+            token: Validation state token the verdict was computed under
+            verdict: Verdict to return on later hits
+        """
+        with self._lock:
+            self._check_token(token)
+            
+            self._entries[fingerprint] = verdict
+            self._entries.move_to_end(fingerprint)
+            
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """
+        Drop every cached verdict
+        """
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get index statistics
+        
+        Returns:
+            Dictionary with size, hits, misses and invalidations
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations
+            }
+    
+    def _check_token(self, token: Hashable):
+        """
+        Drop all entries if the validation state changed (caller holds the lock)
+        
+        Args:
+            token: Current validation state token
+        """
+        if token == self._token:
+            return
+        
+        if self._entries:
+            self.invalidations += 1
+            logger.info("Validation state changed; known-good index cleared")
+        
+        self._entries.clear()
+        self._token = token
\ No newline at end of file
@@ -0,0 +1,154 @@
+"""
+Log Pipeline Module for AMB Hallucination Prevention
+Queue-based logging with sampled per-request records and deferred formatting
+"""
+
+import logging
+import queue
+import random
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Passed as extra= on the INFO lines emitted once per request, so they can be sampled
+PER_REQUEST = {"per_request": True}
+
+
+class RequestLogSampler(logging.Filter):
+    """
+    Keeps a fraction of per-request INFO records
+    
+    Records marked with PER_REQUEST at INFO level or below are kept with
+    probability sample_rate. Warnings, errors and unmarked records always
+    pass.
+    """
+    
+    def __init__(self, sample_rate: float = 1.0):
+        """
+        Initialize RequestLogSampler
+        
+        Args:
+            sample_rate: Fraction of per-request records kept (0-1)
+        """
+        super().__init__()
+        
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("Sample rate must be between 0 and 1")
+        
+        self.sample_rate = sample_rate
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or not getattr(record, "per_request", False):
+            return True
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Enqueues records as they are and drops them when the queue is full
+    
+    The stock QueueHandler formats every record in the calling thread so it
+    can cross process boundaries. The queue here stays in-process, so
+    formatting is left to the listener thread and only happens for records
+    that are actually emitted.
+    """
+    
+    def __init__(self, record_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(record_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+class QueueLogging:
+    """
+    Moves log output for a logger tree onto a background listener thread
+    
+    While started, the logger's records go through a bounded queue to a
+    QueueListener that runs the real handlers, so file and stream I/O never
+    happen on the request thread. Per-request INFO records are sampled
+    before they are queued. When the queue is full new records are dropped
+    and counted rather than blocking. stop() drains the queue and restores
+    the logger's previous handlers.
+    """
+    
+    def __init__(self, handlers: Optional[Iterable[logging.Handler]] = None, logger_name: str = "amb",
+                 sample_rate: float = 1.0, max_queue: int = 10000):
+        """
+        Initialize QueueLogging
+        
+        Args:
+            handlers: Handlers run by the listener (the root logger's handlers if None)
+            logger_name: Logger whose records are queued, including its children
+            sample_rate: Fraction of per-request INFO records kept (0-1)
+            max_queue: Maximum records buffered before dropping
+        """
+        if max_queue <= 0:
+            raise ValueError("Max queue must be positive")
+        
+        self.logger = logging.getLogger(logger_name)
+        self.handlers = list(handlers) if handlers is not None else list(logging.getLogger().handlers)
+        self.sampler = RequestLogSampler(sample_rate)
+        self._handler = _DeferredQueueHandler(queue.Queue(maxsize=max_queue))
+        self._handler.addFilter(self.sampler)
+        self._listener = QueueListener(self._handler.queue, *self.handlers, respect_handler_level=True)
+        self._saved = None
+    
+    def start(self):
+        """
+        Route the logger's records through the queue
+        """
+        if self._saved is not None:
+            return
+        
+        self._saved = (self.logger.handlers[:], self.logger.propagate)
+        self.logger.handlers = [self._handler]
+        # The listener runs the handlers the records would otherwise have propagated to
+        self.logger.propagate = False
+        self._listener.start()
+        
+        logger.info(f"Queue logging started: {len(self.handlers)} handlers, "
+                    f"{self.sampler.sample_rate:.0%} of per-request records")
+    
+    def stop(self):
+        """
+        Write the queued records and restore the logger's previous handlers
+        """
+        if self._saved is None:
+            return
+        
+        self.logger.handlers, self.logger.propagate = self._saved
+        self._saved = None
+        self._listener.stop()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue statistics
+        
+        Returns:
+            Dictionary with queued and dropped record counts and the sample rate
+        """
+        return {
+            "queued": self._handler.queue.qsize(),
+            "dropped": self._handler.dropped,
+            "sample_rate": self.sampler.sample_rate
+        }
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
\ No newline at end of file
@@ -4,9 +4,15 @@ Ensures logical consistency in generated responses
 """
 
 import logging
-from typing import List, Dict, Any, Tuple, Optional
-from collections import deque
-from datetime import datetime
+from typing import List, Dict, Any, Callable, Tuple, Optional
+import threading
+from collections import Counter, deque
+
+from .clock import request_time, request_timestamp
+from .log_pipeline import PER_REQUEST
+from .records import ContextRecord, format_timestamp
+from .shared_store import SharedReferenceStore
+from .tracing import Tracer, NOOP_TRACER
 
 logger = logging.getLogger(__name__)
 
@@ -16,12 +22,15 @@ class LogicChecker:
     Checks for logical contradictions and inconsistencies in AMB responses
     """
     
-    def __init__(self, context_window: int = 100):
+    def __init__(self, context_window: int = 100, tracer: Optional[Tracer] = None,
+                 shared_store: Optional[SharedReferenceStore] = None):
         """
         Initialize LogicChecker
         
         Args:
             context_window: Number of previous statements to maintain for consistency checking
+            tracer: Tracer recording consistency check spans (disabled by default)
+            shared_store: Shared reference facts checked alongside session facts
         """
         if context_window <= 0:
             raise ValueError("Context window must be positive")
@@ -30,8 +39,27 @@ class LogicChecker:
         self.context_memory = deque(maxlen=context_window)
         self.contradiction_rules = self._initialize_rules()
         self.session_facts = {}
+        self.shared_store = shared_store
+        # Bumped whenever facts or rules change, so cached verdicts can be invalidated
+        self._session_facts_version = 0
+        self.rules_version = 0
+        self._statement_counts = Counter()
+        self._restore_loader = None
+        self._lock = threading.RLock()
+        self.tracer = tracer or NOOP_TRACER
         logger.info(f"LogicChecker initialized with context window: {context_window}")
     
+    @property
+    def facts_version(self) -> int:
+        """
+        Version of the facts in force, covering session and shared reference data
+        
+        Both counters only grow, so their sum changes whenever either does.
+        """
+        self._restore_pending()
+        shared_version = self.shared_store.version if self.shared_store is not None else 0
+        return self._session_facts_version + shared_version
+    
     def check_statement_consistency(self, statement: str, metadata: Dict[str, Any] = None) -> Tuple[bool, List[str]]:
         """
         Check if statement is logically consistent with context
@@ -43,41 +71,67 @@ class LogicChecker:
         Returns:
             Tuple of (is_consistent, list_of_contradictions)
         """
-        try:
-            if not statement:
-                logger.warning("Empty statement provided")
-                return False, ["Empty statement"]
+        with self.tracer.span("check_statement_consistency") as span:
+            try:
+                if not statement:
+                    logger.warning("Empty statement provided")
+                    return False, ["Empty statement"]
             
-            contradictions = []
-            
-            # Check against context memory
-            context_contradictions = self._check_context_consistency(statement)
-            contradictions.extend(context_contradictions)
-            
-            # Check against session facts
-            fact_contradictions = self._check_fact_consistency(statement)
-            contradictions.extend(fact_contradictions)
-            
-            # Check internal statement consistency
-            internal_contradictions = self._check_internal_consistency(statement)
-            contradictions.extend(internal_contradictions)
-            
-            is_consistent = len(contradictions) == 0
+                # Check and context update must be atomic across threads
+                with self._lock:
+                    self._restore_pending()
+                    contradictions = []
+                
+                    # Check against context memory
+                    context_contradictions = self._check_context_consistency(statement)
+                    contradictions.extend(context_contradictions)
+                
+                    # Check against session facts
+                    fact_contradictions = self._check_fact_consistency(statement)
+                    contradictions.extend(fact_contradictions)
+                
+                    # Check internal statement consistency
+                    internal_contradictions = self._check_internal_consistency(statement)
+                    contradictions.extend(internal_contradictions)
+                
+                    is_consistent = len(contradictions) == 0
+                    span.set_attribute("statement_length", len(statement))
+                    span.set_attribute("context_size", len(self.context_memory))
+                    span.set_attribute("contradictions", len(contradictions))
+                
+                    # Add to context if consistent
+                    if is_consistent:
+                        self._add_to_context(statement, metadata)
             
-            # Add to context if consistent
-            if is_consistent:
-                self._add_to_context(statement, metadata)
+                if contradictions:
+                    logger.warning("Logic inconsistencies found: %s", contradictions)
+                else:
+                    logger.debug("Statement is logically consistent")
             
-            if contradictions:
-                logger.warning(f"Logic inconsistencies found: {contradictions}")
-            else:
-                logger.debug("Statement is logically consistent")
+                return is_consistent, contradictions
             
-            return is_consistent, contradictions
+            except Exception as e:
+                logger.error("Logic check error: %s", e)
+                span.set_attribute("error", str(e))
+                return False, [f"Logic check error: {str(e)}"]
+    
+    def check_fragment(self, fragment: str) -> List[str]:
+        """
+        Check a partial statement for contradictions without touching context
+        
+        Only substring-based checks (internal and fact consistency) are run, so
+        any contradiction found in a fragment is also present in the full statement.
+        
+        Args:
+            fragment: Partial statement to check
             
-        except Exception as e:
-            logger.error(f"Logic check error: {str(e)}")
-            return False, [f"Logic check error: {str(e)}"]
+        Returns:
+            List of contradictions found
+        """
+        if not fragment:
+            return []
+        
+        return self._check_internal_consistency(fragment) + self._check_fact_consistency(fragment)
     
     def check_response_logic(self, response: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -129,7 +183,8 @@ class LogicChecker:
             "consistency_score": consistency_score
         }
         
-        logger.info(f"Response logic check complete: valid={result['valid']}, score={consistency_score:.2f}")
+        logger.info("Response logic check complete: valid=%s, score=%.2f", result["valid"], consistency_score,
+                    extra=PER_REQUEST)
         
         return result
     
@@ -145,12 +200,62 @@ class LogicChecker:
             logger.warning("Cannot register fact with empty key")
             return
         
-        self.session_facts[fact_key] = {
-            "value": fact_value,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        with self._lock:
+            self._restore_pending()
+            self.session_facts[fact_key] = {
+                "value": fact_value,
+                "timestamp": request_timestamp()
+            }
+            self._session_facts_version += 1
         
-        logger.debug(f"Fact registered: {fact_key} = {fact_value}")
+        logger.debug("Fact registered: %s = %s", fact_key, fact_value)
+    
+    def set_contradiction_rules(self, rules: List[Dict[str, Any]]):
+        """
+        Replace the contradiction rules
+        
+        Args:
+            rules: New rule definitions
+        """
+        with self._lock:
+            self._restore_pending()
+            self.contradiction_rules = list(rules)
+            self.rules_version += 1
+    
+    def in_context(self, statement: str) -> bool:
+        """
+        Check whether a statement is currently held in context memory
+        
+        Args:
+            statement: Statement to look up
+            
+        Returns:
+            True if the statement is in the context window
+        """
+        with self._lock:
+            self._restore_pending()
+            return self._statement_counts[statement] > 0
+    
+    def reaffirm_statement(self, statement: str, metadata: Dict[str, Any] = None) -> bool:
+        """
+        Re-add a statement that is still in context memory without re-checking it
+        
+        Every statement added after it was checked against it, so it is still
+        consistent with the whole window as long as facts and rules are unchanged.
+        
+        Args:
+            statement: Statement that previously passed the consistency check
+            metadata: Optional metadata
+            
+        Returns:
+            True if the statement was in context and has been re-added
+        """
+        with self._lock:
+            self._restore_pending()
+            if not self._statement_counts[statement]:
+                return False
+            self._add_to_context(statement, metadata)
+            return True
     
     def detect_circular_logic(self, statements: List[str]) -> bool:
         """
@@ -219,8 +324,8 @@ class LogicChecker:
         
         for context_item in self.context_memory:
             # Check for direct contradictions
-            if self._statements_contradict(statement, context_item["statement"]):
-                contradictions.append(f"Contradicts previous: {context_item['statement'][:50]}...")
+            if self._statements_contradict(statement, context_item.statement):
+                contradictions.append(f"Contradicts previous: {context_item.statement[:50]}...")
         
         return contradictions
     
@@ -237,8 +342,17 @@ class LogicChecker:
         contradictions = []
         statement_lower = statement.lower()
         
-        for fact_key, fact_data in self.session_facts.items():
-            fact_value = str(fact_data["value"]).lower()
+        with self._lock:
+            self._restore_pending()
+            facts = [(key, data["value"]) for key, data in self.session_facts.items()]
+        
+        # Session facts override shared reference facts with the same key
+        if self.shared_store is not None:
+            session_keys = {key for key, _ in facts}
+            facts.extend((key, value) for key, value in self.shared_store.facts() if key not in session_keys)
+        
+        for fact_key, value in facts:
+            fact_value = str(value).lower()
             
             # Simple contradiction detection
             if fact_key.lower() in statement_lower:
@@ -247,7 +361,7 @@ class LogicChecker:
                 
                 for neg in negations:
                     if neg in statement_lower and fact_value in statement_lower:
-                        contradictions.append(f"Contradicts fact: {fact_key} = {fact_data['value']}")
+                        contradictions.append(f"Contradicts fact: {fact_key} = {value}")
                         break
         
         return contradictions
@@ -347,13 +461,17 @@ class LogicChecker:
             statement: Statement to add
             metadata: Optional metadata
         """
-        context_item = {
-            "statement": statement,
-            "timestamp": datetime.utcnow().isoformat(),
-            "metadata": metadata or {}
-        }
+        context_item = ContextRecord(statement, request_time(), metadata or {})
+        
+        # Track which statements the window holds; a full deque evicts its oldest item
+        if len(self.context_memory) == self.context_memory.maxlen:
+            evicted = self.context_memory[0].statement
+            self._statement_counts[evicted] -= 1
+            if not self._statement_counts[evicted]:
+                del self._statement_counts[evicted]
         
         self.context_memory.append(context_item)
+        self._statement_counts[statement] += 1
     
     def _initialize_rules(self) -> List[Dict[str, Any]]:
         """
@@ -384,10 +502,73 @@ class LogicChecker:
         Returns:
             Dictionary with context summary
         """
-        return {
-            "context_size": len(self.context_memory),
-            "max_context": self.context_window,
-            "facts_registered": len(self.session_facts),
-            "oldest_context": self.context_memory[0]["timestamp"] if self.context_memory else None,
-            "newest_context": self.context_memory[-1]["timestamp"] if self.context_memory else None
-        }
\ No newline at end of file
+        with self._lock:
+            self._restore_pending()
+            return {
+                "context_size": len(self.context_memory),
+                "max_context": self.context_window,
+                "facts_registered": len(self.session_facts),
+                "oldest_context": format_timestamp(self.context_memory[0].timestamp) if self.context_memory else None,
+                "newest_context": format_timestamp(self.context_memory[-1].timestamp) if self.context_memory else None
+            }
+    
+    def export_state(self) -> Dict[str, Any]:
+        """
+        Export context memory, session facts and rules for a snapshot
+        
+        Returns:
+            JSON-serializable state
+        """
+        with self._lock:
+            self._restore_pending()
+            return {
+                "context": [item.to_dict() for item in self.context_memory],
+                "session_facts": dict(self.session_facts),
+                "contradiction_rules": list(self.contradiction_rules),
+                "facts_version": self._session_facts_version,
+                "rules_version": self.rules_version
+            }
+    
+    def load_state(self, state: Dict[str, Any]):
+        """
+        Replace context, facts and rules with state exported by export_state
+        
+        Versions are restored too, so verdicts cached under the snapshot's
+        state stay valid.
+        
+        Args:
+            state: Exported state
+        """
+        with self._lock:
+            self._restore_loader = None
+            self.context_memory.clear()
+            self._statement_counts.clear()
+            for item in state["context"][-self.context_window:]:
+                self.context_memory.append(ContextRecord.from_dict(item))
+                self._statement_counts[item["statement"]] += 1
+            self.session_facts = dict(state["session_facts"])
+            self.contradiction_rules = list(state["contradiction_rules"])
+            self._session_facts_version = state["facts_version"]
+            self.rules_version = state["rules_version"]
+    
+    def defer_restore(self, loader: Callable[[], Dict[str, Any]]):
+        """
+        Restore exported state on first use instead of now
+        
+        Args:
+            loader: Callable returning state exported by export_state
+        """
+        with self._lock:
+            self._restore_loader = loader
+    
+    def _restore_pending(self):
+        """
+        Load deferred snapshot state once
+        """
+        if self._restore_loader is None:
+            return
+        
+        with self._lock:
+            loader, self._restore_loader = self._restore_loader, None
+            if loader is not None:
+                self.load_state(loader())
\ No newline at end of file
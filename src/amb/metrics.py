@@ -0,0 +1,356 @@
+"""
+Metrics Module for AMB Hallucination Prevention
+Thread-safe counters and latency histograms for request statistics
+"""
+
+import logging
+import math
+import threading
+import weakref
+from typing import Dict, Any, Iterable, List, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+Number = Union[int, float]
+
+
+class ShardedCounters:
+    """
+    Named counters sharded per thread and merged on read
+    
+    Each thread increments its own shard, so updates never contend and are
+    never lost. A lock is only taken when a thread creates its shard, on
+    reset and on read. Shards of threads that have exited are folded into a
+    retired total, so short-lived threads do not accumulate shards.
+    """
+    
+    def __init__(self, names: Iterable[str], initial: Dict[str, Number] = None):
+        """
+        Initialize ShardedCounters
+        
+        Args:
+            names: Counter names
+            initial: Optional starting values (defaults to 0 for every name)
+        """
+        self.names = tuple(names)
+        self._initial = {name: 0 for name in self.names}
+        self._initial.update(initial or {})
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[Tuple[weakref.ref, Dict[str, Number]]] = []
+        self._retired = {name: 0 for name in self.names}
+        self._generation = 0
+    
+    def add(self, name: str, amount: Number = 1):
+        """
+        Add to a counter from the calling thread
+        
+        Args:
+            name: Counter name
+            amount: Amount to add
+        """
+        self._shard()[name] += amount
+    
+    def snapshot(self) -> Dict[str, Number]:
+        """
+        Merge all shards into a single dictionary
+        
+        Returns:
+            Dictionary of counter totals
+        """
+        with self._lock:
+            self._fold_finished()
+            shards = [shard for _, shard in self._shards]
+            totals = {name: self._initial[name] + self._retired[name] for name in self.names}
+        
+        for shard in shards:
+            for name in self.names:
+                totals[name] += shard[name]
+        
+        return totals
+    
+    def reset(self):
+        """
+        Reset all counters to their starting values
+        """
+        with self._lock:
+            self._generation += 1
+            self._shards = []
+            self._retired = {name: 0 for name in self.names}
+    
+    def _shard(self) -> Dict[str, Number]:
+        """
+        Get the calling thread's shard for the current generation
+        
+        Returns:
+            Shard dictionary
+        """
+        local = self._local
+        if getattr(local, "generation", None) != self._generation:
+            shard = {name: 0 for name in self.names}
+            with self._lock:
+                self._fold_finished()
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+                local.generation = self._generation
+            local.shard = shard
+        return local.shard
+    
+    def _fold_finished(self):
+        """
+        Move the shards of exited threads into the retired totals (caller holds the lock)
+        
+        An exited thread can no longer add to its shard, so folding it loses nothing.
+        """
+        live = []
+        for thread_ref, shard in self._shards:
+            thread = thread_ref()
+            if thread is not None and thread.is_alive():
+                live.append((thread_ref, shard))
+            else:
+                for name in self.names:
+                    self._retired[name] += shard[name]
+        self._shards = live
+
+
+class LatencyHistogram:
+    """
+    Fixed-memory log-bucketed latency histogram with mergeable snapshots
+    
+    Values are bucketed on a logarithmic scale so every recorded value is
+    reported within the configured relative precision, in the spirit of HDR
+    histograms. Memory is fixed by the value range and precision, not by the
+    number of samples.
+    """
+    
+    def __init__(self, min_value: float = 1e-6, max_value: float = 60.0, precision: float = 0.01):
+        """
+        Initialize LatencyHistogram
+        
+        Args:
+            min_value: Smallest distinguishable value in seconds
+            max_value: Largest tracked value in seconds (larger values are clamped)
+            precision: Relative bucket width (0.01 reports values within 1%)
+        """
+        if min_value <= 0 or max_value <= min_value:
+            raise ValueError("Histogram range must satisfy 0 < min_value < max_value")
+        
+        if not 0 < precision < 1:
+            raise ValueError("Precision must be between 0 and 1")
+        
+        self.min_value = min_value
+        self.max_value = max_value
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self._counts = [0] * (self._index(max_value) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+    
+    def record(self, value: float):
+        """
+        Record a latency sample
+        
+        Args:
+            value: Latency in seconds
+        """
+        index = self._index(value)
+        
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total += value
+            if self.min is None or value < self.min:
+                self.min = value
+            if self.max is None or value > self.max:
+                self.max = value
+    
+    def percentile(self, percent: float) -> float:
+        """
+        Get the value at a percentile
+        
+        Args:
+            percent: Percentile between 0 and 100
+            
+        Returns:
+            Latency in seconds (0.0 if no samples)
+        """
+        if not 0 <= percent <= 100:
+            raise ValueError("Percentile must be between 0 and 100")
+        
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+            
+            rank = max(1, math.ceil(self.count * percent / 100))
+            seen = 0
+            
+            for index, bucket_count in enumerate(self._counts):
+                seen += bucket_count
+                if seen >= rank:
+                    # Report the bucket's upper edge, bounded by the observed extremes
+                    return min(max(self._upper_edge(index), self.min), self.max)
+        
+        return self.max
+    
+    def summary(self) -> Dict[str, float]:
+        """
+        Summarize the histogram in milliseconds
+        
+        Returns:
+            Dictionary with count, mean, p50, p95, p99 and max
+        """
+        count = self.count
+        
+        return {
+            "count": count,
+            "mean_ms": (self.total / count) * 1000 if count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": (self.max or 0.0) * 1000
+        }
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Export a serializable, mergeable snapshot
+        
+        Returns:
+            Snapshot dictionary with sparse bucket counts
+        """
+        with self._lock:
+            return {
+                "min_value": self.min_value,
+                "max_value": self.max_value,
+                "precision": self.precision,
+                "buckets": {str(i): c for i, c in enumerate(self._counts) if c},
+                "count": self.count,
+                "total": self.total,
+                "min": self.min,
+                "max": self.max
+            }
+    
+    def merge(self, snapshot: Dict[str, Any]):
+        """
+        Merge a snapshot taken from a histogram with the same layout
+        
+        Args:
+            snapshot: Snapshot from LatencyHistogram.snapshot()
+        """
+        layout = (snapshot["min_value"], snapshot["max_value"], snapshot["precision"])
+        if layout != (self.min_value, self.max_value, self.precision):
+            raise ValueError("Cannot merge histograms with different layouts")
+        
+        with self._lock:
+            for index, bucket_count in snapshot["buckets"].items():
+                self._counts[int(index)] += bucket_count
+            self.count += snapshot["count"]
+            self.total += snapshot["total"]
+            for bound, pick in (("min", min), ("max", max)):
+                other = snapshot[bound]
+                if other is not None:
+                    current = getattr(self, bound)
+                    setattr(self, bound, other if current is None else pick(current, other))
+    
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> "LatencyHistogram":
+        """
+        Rebuild a histogram from a snapshot
+        
+        Args:
+            snapshot: Snapshot from LatencyHistogram.snapshot()
+            
+        Returns:
+            New histogram
+        """
+        histogram = cls(snapshot["min_value"], snapshot["max_value"], snapshot["precision"])
+        histogram.merge(snapshot)
+        return histogram
+    
+    def reset(self):
+        """
+        Drop all samples
+        """
+        with self._lock:
+            self._counts = [0] * len(self._counts)
+            self.count = 0
+            self.total = 0.0
+            self.min = None
+            self.max = None
+    
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        value = min(value, self.max_value)
+        return int(math.log(value / self.min_value) / self._log_base)
+    
+    def _upper_edge(self, index: int) -> float:
+        return self.min_value * math.exp((index + 1) * self._log_base)
+
+
+class StageLatency:
+    """
+    Latency histograms for the overall request and each pipeline stage
+    """
+    
+    STAGES = ("total", "preprocess", "generation", "validation", "logic_check", "postprocess")
+    
+    def __init__(self, stages: Iterable[str] = STAGES):
+        """
+        Initialize StageLatency
+        
+        Args:
+            stages: Stage names to track
+        """
+        self.histograms = {stage: LatencyHistogram() for stage in stages}
+    
+    def record(self, stage: str, seconds: float):
+        """
+        Record a sample for a stage (unknown stages are ignored)
+        
+        Args:
+            stage: Stage name
+            seconds: Duration in seconds
+        """
+        histogram = self.histograms.get(stage)
+        if histogram is not None:
+            histogram.record(seconds)
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarize every stage
+        
+        Returns:
+            Dictionary of stage name to percentile summary
+        """
+        return {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+    
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Export mergeable snapshots for every stage
+        
+        Returns:
+            Dictionary of stage name to histogram snapshot
+        """
+        return {stage: histogram.snapshot() for stage, histogram in self.histograms.items()}
+    
+    def merge(self, snapshot: Dict[str, Dict[str, Any]]):
+        """
+        Merge snapshots taken from another worker
+        
+        Args:
+            snapshot: Snapshot from StageLatency.snapshot()
+        """
+        for stage, stage_snapshot in snapshot.items():
+            if stage in self.histograms:
+                self.histograms[stage].merge(stage_snapshot)
+            else:
+                self.histograms[stage] = LatencyHistogram.from_snapshot(stage_snapshot)
+    
+    def reset(self):
+        """
+        Drop all samples
+        """
+        for histogram in self.histograms.values():
+            histogram.reset()
\ No newline at end of file
@@ -0,0 +1,456 @@
+"""
+Model Backend Module for AMB Hallucination Prevention
+Pluggable sync/async model backends used by the response generator
+"""
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Iterator, AsyncIterator
+from urllib.parse import urlparse
+
+from .context_view import JsonContext
+
+logger = logging.getLogger(__name__)
+
+
+class BackendError(Exception):
+    """
+    Raised when a model backend fails to produce a response
+    """
+
+
+class ModelBackend(ABC):
+    """
+    Base class for model backends with per-backend concurrency limits
+    
+    Subclasses must implement _generate and may override _agenerate with a
+    native coroutine. The default async path runs _generate in the default executor.
+    The concurrency limit applies separately to sync and async callers.
+    """
+    
+    def __init__(self, max_concurrency: int = 8):
+        """
+        Initialize ModelBackend
+        
+        Args:
+            max_concurrency: Maximum number of generations in flight
+        """
+        if max_concurrency <= 0:
+            raise ValueError("Max concurrency must be positive")
+        
+        self.max_concurrency = max_concurrency
+        self._sync_slots = threading.BoundedSemaphore(max_concurrency)
+        self._async_slots = weakref.WeakKeyDictionary()
+        self._slots_lock = threading.Lock()
+    
+    def generate(self, query: str, context: Dict[str, Any], constraints: Dict[str, Any] = None) -> str:
+        """
+        Generate response content for a query
+        
+        Args:
+            query: User query
+            context: Context information
+            constraints: Optional generation constraints
+        
+        Returns:
+            Generated content
+        """
+        with self._sync_slots:
+            return self._generate(query, context or {}, constraints or {})
+    
+    async def agenerate(self, query: str, context: Dict[str, Any], constraints: Dict[str, Any] = None) -> str:
+        """
+        Generate response content for a query without blocking the event loop
+        
+        Args:
+            query: User query
+            context: Context information
+            constraints: Optional generation constraints
+        
+        Returns:
+            Generated content
+        """
+        async with self._get_async_slots():
+            return await self._agenerate(query, context or {}, constraints or {})
+    
+    def stream(self, query: str, context: Dict[str, Any], constraints: Dict[str, Any] = None) -> Iterator[str]:
+        """
+        Stream response content in chunks as they are produced
+        
+        Closing the returned generator cancels the generation.
+        
+        Args:
+            query: User query
+            context: Context information
+            constraints: Optional generation constraints
+            
+        Returns:
+            Iterator over content chunks
+        """
+        with self._sync_slots:
+            yield from self._stream(query, context or {}, constraints or {})
+    
+    async def astream(self, query: str, context: Dict[str, Any],
+                      constraints: Dict[str, Any] = None) -> AsyncIterator[str]:
+        """
+        Stream response content in chunks without blocking the event loop
+        
+        Closing the returned generator (aclose) cancels the generation.
+        
+        Args:
+            query: User query
+            context: Context information
+            constraints: Optional generation constraints
+            
+        Returns:
+            Async iterator over content chunks
+        """
+        async with self._get_async_slots():
+            chunks = self._astream(query, context or {}, constraints or {})
+            try:
+                async for chunk in chunks:
+                    yield chunk
+            finally:
+                await chunks.aclose()
+    
+    def close(self):
+        """
+        Release any resources held by the backend
+        """
+    
+    @abstractmethod
+    def _generate(self, query: str, context: Dict[str, Any], constraints: Dict[str, Any]) -> str:
+        """
+        Produce response content (implemented by subclasses)
+        """
+    
+    async def _agenerate(self, query: str, context: Dict[str, Any], constraints: Dict[str, Any]) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._generate, query, context, constraints)
+    
+    def _stream(self, query: str, context: Dict[str, Any], constraints: Dict[str, Any]) -> Iterator[str]:
+        yield self._generate(query, context, constraints)
+    
+    async def _astream(self, query: str, context: Dict[str, Any],
+                       constraints: Dict[str, Any]) -> AsyncIterator[str]:
+        yield await self._agenerate(query, context, constraints)
+    
+    def _get_async_slots(self) -> asyncio.Semaphore:
+        """
+        Get the semaphore bound to the running event loop
+        
+        Returns:
+            Semaphore limiting async generations on this loop
+        """
+        loop = asyncio.get_running_loop()
+        
+        with self._slots_lock:
+            slots = self._async_slots.get(loop)
+            if slots is None:
+                slots = asyncio.Semaphore(self.max_concurrency)
+                self._async_slots[loop] = slots
+        
+        return slots
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class DeterministicBackend(ModelBackend):
+    """
+    In-process fake backend returning deterministic content for testing
+    """
+    
+    def __init__(self, responses: Dict[str, str] = None, latency_ms: float = 0.0,
+                 max_concurrency: int = 8, chunk_size: int = 16):
+        """
+        Initialize DeterministicBackend
+        
+        Args:
+            responses: Optional mapping of query to scripted content
+            latency_ms: Simulated generation latency in milliseconds
+            max_concurrency: Maximum number of generations in flight
+            chunk_size: Characters per streamed chunk
+        """
+        super().__init__(max_concurrency)
+        
+        if latency_ms < 0:
+            raise ValueError("Latency must be non-negative")
+        
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive")
+        
+        self.responses = dict(responses or {})
+        self.latency_ms = latency_ms
+        self.chunk_size = chunk_size
+        self.calls = 0
+        self.chunks_streamed = 0
+        self._calls_lock = threading.Lock()
+    
+    def _generate(self, query: str, context: Dict[str, Any], constraints: Dict[str, Any]) -> str:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return self._render(query, constraints)
+    
+    async def _agenerate(self, query: str, context: Dict[str, Any], constraints: Dict[str, Any]) -> str:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return self._render(query, constraints)
+    
+    def _stream(self, query: str, context: Dict[str, Any], constraints: Dict[str, Any]) -> Iterator[str]:
+        content = self._render(query, constraints)
+        chunk_delay = self.latency_ms / 1000 / max(1, -(-len(content) // self.chunk_size))
+        
+        for start in range(0, len(content), self.chunk_size):
+            if chunk_delay:
+                time.sleep(chunk_delay)
+            with self._calls_lock:
+                self.chunks_streamed += 1
+            yield content[start:start + self.chunk_size]
+    
+    async def _astream(self, query: str, context: Dict[str, Any],
+                       constraints: Dict[str, Any]) -> AsyncIterator[str]:
+        content = self._render(query, constraints)
+        chunk_delay = self.latency_ms / 1000 / max(1, -(-len(content) // self.chunk_size))
+        
+        for start in range(0, len(content), self.chunk_size):
+            if chunk_delay:
+                await asyncio.sleep(chunk_delay)
+            with self._calls_lock:
+                self.chunks_streamed += 1
+            yield content[start:start + self.chunk_size]
+    
+    def _render(self, query: str, constraints: Dict[str, Any]) -> str:
+        """
+        Render content for a query, honouring the max_length constraint
+        
+        Args:
+            query: User query
+            constraints: Generation constraints
+        
+        Returns:
+            Generated content
+        """
+        with self._calls_lock:
+            self.calls += 1
+        
+        content = self.responses.get(query, f"Response to: {query}")
+        
+        max_length = constraints.get("max_length")
+        if max_length is not None:
+            content = content[:max_length]
+        
+        return content
+
+
+class HTTPBackend(ModelBackend):
+    """
+    Backend calling a JSON-over-HTTP model endpoint with pooled keep-alive connections
+    
+    Requests are POSTed as {"query", "context", "constraints"} and the endpoint
+    must answer with {"content": "..."}. A JsonContext is spliced into the body
+    as the text it arrived as. Async calls run on the default executor and
+    share the same connection pool.
+    """
+    
+    def __init__(self, url: str, timeout: float = 10.0, max_concurrency: int = 8):
+        """
+        Initialize HTTPBackend
+        
+        Args:
+            url: Endpoint URL (http only)
+            timeout: Socket timeout in seconds
+            max_concurrency: Maximum number of requests in flight (and pooled connections)
+        """
+        super().__init__(max_concurrency)
+        
+        parsed = urlparse(url)
+        if parsed.scheme != "http" or not parsed.hostname:
+            raise ValueError(f"Unsupported backend URL: {url}")
+        
+        self.url = url
+        self.timeout = timeout
+        self._host = parsed.hostname
+        self._port = parsed.port or 80
+        self._path = parsed.path or "/"
+        self._pool = queue.LifoQueue(maxsize=max_concurrency)
+        self.connections_opened = 0
+        self._connections_lock = threading.Lock()
+    
+    def _generate(self, query: str, context: Dict[str, Any], constraints: Dict[str, Any]) -> str:
+        if isinstance(context, JsonContext):
+            # Forward a serialized context verbatim rather than decoding and re-encoding it
+            body = '{"query": %s, "context": %s, "constraints": %s}' % (
+                json.dumps(query), context.text, json.dumps(constraints, default=str)
+            )
+        else:
+            body = json.dumps({
+                "query": query,
+                "context": context,
+                "constraints": constraints
+            }, default=str)
+        body = body.encode("utf-8")
+        
+        connection = self._acquire_connection()
+        
+        try:
+            connection.request("POST", self._path, body=body,
+                               headers={"Content-Type": "application/json"})
+            http_response = connection.getresponse()
+            payload = http_response.read()
+        except Exception as e:
+            connection.close()
+            raise BackendError(f"Backend request failed: {str(e)}") from e
+        
+        self._release_connection(connection, http_response.will_close)
+        
+        if http_response.status != 200:
+            raise BackendError(f"Backend returned HTTP {http_response.status}")
+        
+        try:
+            return json.loads(payload)["content"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise BackendError(f"Malformed backend response: {str(e)}") from e
+    
+    def _acquire_connection(self) -> HTTPConnection:
+        """
+        Take a pooled connection or open a new one
+        
+        Returns:
+            HTTP connection
+        """
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            with self._connections_lock:
+                self.connections_opened += 1
+            return HTTPConnection(self._host, self._port, timeout=self.timeout)
+    
+    def _release_connection(self, connection: HTTPConnection, will_close: bool):
+        """
+        Return a connection to the pool for reuse
+        
+        Args:
+            connection: Connection to release
+            will_close: Whether the server is closing the connection
+        """
+        if will_close:
+            connection.close()
+            return
+        
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+    
+    def close(self):
+        """
+        Close all pooled connections
+        """
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class LocalModelServer:
+    """
+    Local HTTP stand-in for a model endpoint, backed by an in-process backend
+    """
+    
+    def __init__(self, backend: Optional[ModelBackend] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize LocalModelServer
+        
+        Args:
+            backend: Backend used to produce content (defaults to DeterministicBackend)
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+        """
+        self.backend = backend or DeterministicBackend()
+        self.connections_accepted = 0
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+    
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/generate"
+    
+    def start(self) -> "LocalModelServer":
+        """
+        Start serving in a background thread
+        
+        Returns:
+            The running server
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+            self._thread.start()
+            logger.info(f"Local model server listening on {self.url}")
+        return self
+    
+    def stop(self):
+        """
+        Stop serving and release the socket
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+    
+    def _make_handler(self):
+        server = self
+        
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def setup(self):
+                super().setup()
+                server.connections_accepted += 1
+            
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                    content = server.backend.generate(
+                        payload.get("query", ""),
+                        payload.get("context") or {},
+                        payload.get("constraints") or {}
+                    )
+                    status, body = 200, {"content": content}
+                except Exception as e:
+                    status, body = 500, {"error": str(e)}
+                
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def log_message(self, format, *args):
+                logger.debug("Local model server: " + format % args)
+        
+        return _Handler
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
\ No newline at end of file
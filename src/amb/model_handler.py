@@ -3,30 +3,93 @@ Model Handler Module for AMB Hallucination Prevention
 Main orchestrator for the AMB system with hallucination prevention
 """
 
+import asyncio
+import bisect
+import contextvars
+import functools
 import logging
 import json
-from typing import Dict, Any, List, Optional, Tuple
-from datetime import datetime
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Tuple
+import threading
 import time
 
-from .data_validator import DataValidator
+from .admission import AdmissionController
+from .audit import SegmentAuditSink
+from .check_order import AdaptiveCheckOrder
+from .clock import RequestClock, current_clock, request_clock, request_time, request_timestamp
+from .context_view import JsonContext
+from .data_validator import DataValidator, HALLUCINATION_PATTERNS, SCAN_BUDGET_EXCEEDED
+from .degradation import DegradationController, CHECK_TIERS
+from .known_good import KnownGoodIndex
+from .log_pipeline import PER_REQUEST, QueueLogging
 from .logic_checker import LogicChecker
+from .metrics import ShardedCounters, StageLatency
+from .model_backend import ModelBackend
+from .records import HallucinationRecord
+from .response_cache import NearDuplicateCache
 from .response_generator import ResponseGenerator
+from .retry_policy import RetryPolicy
+from .scanning import ContentScanner, ScanBudgetExceeded, CHUNK_SIZE
+from .shared_store import SharedReferenceStore
+from .snapshot import SnapshotReader, write_snapshot
+from .tracing import Tracer, JsonlSpanExporter, current_span
 
 logger = logging.getLogger(__name__)
 
+# Hallucination log type recorded for each detection check
+DETECTION_TYPES = {
+    "data_validation": "data_validation",
+    "logic_consistency": "logic_inconsistency",
+    "pattern_detection": "pattern_match"
+}
+
+# Input injection patterns, combined so a query is scanned once
+INJECTION_PATTERNS = [
+    r"<script",
+    r"javascript:",
+    r"on\w+\s*=",
+    r"eval\s*\(",
+    r"DROP\s+TABLE",
+    r"DELETE\s+FROM",
+    r"INSERT\s+INTO"
+]
+_INJECTION_RE = re.compile("|".join(f"(?:{pattern})" for pattern in INJECTION_PATTERNS), re.IGNORECASE)
+
+# Pattern detection rules in priority order: (pattern, confidence, reason)
+DETECTION_PATTERNS = [
+    (r"(?i)as an ai|as a language model", 0.95, "Self-referential AI pattern"),
+    (r"(?i)i don't have access|cannot access", 0.9, "Access limitation pattern"),
+    (r"\[.*?\]|\{.*?\}", 0.8, "Placeholder pattern"),
+    (r"(?i)hypothetically|theoretically|in theory", 0.7, "Speculative language pattern")
+]
+# Detection confidence when content cannot be scanned within the request's scan budget (scan_budget_ms)
+SCAN_ABORTED_CONFIDENCE = 0.5
+
 
 class ModelHandler:
     """
     Main handler for AMB model with integrated hallucination prevention
+    
+    Concurrency contract: one handler may be shared by any number of threads
+    and event loops. process_request, batch_process, detect_hallucination and
+    the async entry points are safe to call concurrently. Counters are kept
+    in per-thread shards and merged by get_performance_metrics, so a snapshot
+    taken while requests are in flight may lag by the requests still running.
+    Shared stores (hallucination logs, validation history, context memory and
+    session facts) are guarded by per-store locks; a LogicChecker consistency
+    check and its context update happen atomically. Configuration and
+    component attributes must not be reassigned while requests are running.
     """
     
-    def __init__(self, config: Dict[str, Any] = None):
+    def __init__(self, config: Dict[str, Any] = None, backend: Optional[ModelBackend] = None):
         """
         Initialize ModelHandler
         
         Args:
             config: Configuration dictionary
+            backend: Model backend used for generation (defaults to DeterministicBackend)
         """
         self.config = config or self._get_default_config()
         
@@ -34,22 +97,119 @@ class ModelHandler:
         self._validate_config()
         
         # Initialize components
+        self.tracer = self._create_tracer()
+        # Log output moved to a background thread, with per-request INFO records sampled
+        self.log_queue = None
+        if self.config.get("log_queue", False):
+            self.log_queue = QueueLogging(sample_rate=self.config.get("log_sample_rate", 1.0),
+                                          max_queue=self.config.get("log_queue_size", 10000))
+            self.log_queue.start()
         confidence_threshold = self.config.get("confidence_threshold", 0.85)
-        self.data_validator = DataValidator(confidence_threshold)
-        self.logic_checker = LogicChecker(self.config.get("context_window", 100))
-        self.response_generator = ResponseGenerator(confidence_threshold)
-        
-        # Performance tracking
-        self.performance_metrics = {
-            "total_requests": 0,
-            "successful_requests": 0,
-            "failed_requests": 0,
-            "hallucinations_prevented": 0,
-            "total_response_time": 0.0
+        # Reference facts and source fingerprints published by another process, read in place
+        shared_store_name = self.config.get("shared_store_name")
+        self.shared_store = SharedReferenceStore.attach(shared_store_name) if shared_store_name else None
+        # Complete validation and hallucination audit trail, written off the request path
+        audit_path = self.config.get("audit_path")
+        self.audit_sink = SegmentAuditSink(
+            audit_path,
+            self.config.get("audit_segment_bytes", 8 * 1024 * 1024),
+            self.config.get("audit_segment_seconds", 3600)
+        ) if audit_path else None
+        
+        # Content scans are linear; scan_budget_ms optionally caps their time per request,
+        # and chunks are scanned in parallel when scan_workers > 0
+        scan_workers = self.config.get("scan_workers", 0)
+        scan_budget_ms = self.config.get("scan_budget_ms")
+        self.scan_executor = ThreadPoolExecutor(max_workers=scan_workers,
+                                                thread_name_prefix="amb-scan") if scan_workers else None
+        scan_settings = {
+            "chunk_size": self.config.get("scan_chunk_size", CHUNK_SIZE),
+            "time_budget": scan_budget_ms / 1000 if scan_budget_ms is not None else None,
+            "executor": self.scan_executor
         }
+        self.pattern_scanner = ContentScanner([pattern for pattern, _, _ in DETECTION_PATTERNS], **scan_settings)
+        self.data_validator = DataValidator(confidence_threshold, tracer=self.tracer, shared_store=self.shared_store,
+                                            audit_sink=self.audit_sink,
+                                            scanner=ContentScanner(HALLUCINATION_PATTERNS, **scan_settings))
+        self.logic_checker = LogicChecker(self.config.get("context_window", 100), tracer=self.tracer,
+                                          shared_store=self.shared_store)
+        retry_policy = RetryPolicy(self.config.get("max_retries", 2), self.config.get("max_response_time_ms", 200))
+        
+        # Independent response checks run concurrently when check_workers > 0
+        check_workers = self.config.get("check_workers", 0)
+        self.check_executor = ThreadPoolExecutor(max_workers=check_workers,
+                                                 thread_name_prefix="amb-checks") if check_workers else None
+        
+        # Responses for near-duplicate queries are served from cache when caching is enabled
+        response_cache = NearDuplicateCache(
+            self.config.get("cache_max_distance", 0),
+            self.config.get("cache_ttl_seconds", 300),
+            self.config.get("cache_max_bytes", 16 * 1024 * 1024)
+        ) if self.config.get("enable_caching", True) else None
+        
+        # The generator shares this handler's validator and checker, so caches,
+        # history and context memory exist once
+        self.response_generator = ResponseGenerator(confidence_threshold, backend, retry_policy=retry_policy,
+                                                    tracer=self.tracer, data_validator=self.data_validator,
+                                                    logic_checker=self.logic_checker,
+                                                    check_executor=self.check_executor,
+                                                    response_cache=response_cache)
+        
+        # Performance tracking (per-thread shards, merged on read)
+        self._counters = ShardedCounters(
+            ["total_requests", "successful_requests", "failed_requests", "hallucinations_prevented",
+             "total_response_time", "rejected_requests"],
+            {"total_response_time": 0.0}
+        )
+        
+        # Latency histograms for the whole request and each pipeline stage
+        self.latency = StageLatency()
+        self.response_generator.stage_recorder = self.latency.record
+        
+        # Detection checks, reordered at runtime by measured cost and rejection rate
+        self._detection_checks = {
+            "data_validation": self._check_data_validation,
+            "logic_consistency": self._check_logic_consistency,
+            "pattern_detection": self._check_patterns
+        }
+        # The logic check adds the content to the checker's context, so it must
+        # only run once the other checks have passed
+        self.check_order = AdaptiveCheckOrder(self._detection_checks, pinned_last=["logic_consistency"])
+        
+        # Verdicts for content that already passed every check (None disables the fast path)
+        known_good_capacity = self.config.get("known_good_capacity", 10000)
+        self.known_good = (KnownGoodIndex(known_good_capacity)
+                           if self.config.get("enable_caching", True) and known_good_capacity else None)
         
         # Hallucination tracking
         self.hallucination_logs = []
+        self._logs_lock = threading.Lock()
+        
+        # Check tiers dropped under latency pressure and restored with hysteresis
+        max_response_time_ms = self.config.get("max_response_time_ms", 200)
+        self.degradation = DegradationController(
+            max_response_time_ms,
+            self.config.get("degrade_at_ratio", 0.9),
+            self.config.get("restore_at_ratio", 0.6),
+            enabled=self.config.get("degradation_enabled", True)
+        )
+        
+        # Admission control: concurrency limit, bounded queue and SLO-based shedding
+        self.admission = AdmissionController(
+            self.config.get("max_concurrent_requests", 64),
+            self.config.get("max_queued_requests", 256),
+            self.config.get("max_response_time_ms", 200)
+        )
+        
+        # Metrics from a restored snapshot, merged on first read
+        self._metrics_loader = None
+        self._metrics_lock = threading.Lock()
+        
+        # Executor for CPU-bound stages of the async path; one worker keeps
+        # validation state mutations serialized
+        self.executor = ThreadPoolExecutor(max_workers=self.config.get("validation_workers", 1),
+                                           thread_name_prefix="amb-validation")
+        self.response_generator.executor = self.executor
         
         logger.info("ModelHandler initialized with hallucination prevention")
     
@@ -63,53 +223,190 @@ class ModelHandler:
         Returns:
             Response dictionary with validated content
         """
-        start_time = time.time()
+        return self._process_request(request)
+    
+    def _process_request(self, request: Dict[str, Any], injection_detected: Optional[bool] = None,
+                         data_validations: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Admit a request and process it, shedding it if the handler is overloaded
+        
+        Args:
+            request: Request dictionary
+            injection_detected: Result of a batch injection scan of the query, if available
+            data_validations: Result of a batch validation of the context's data points, if available
+            
+        Returns:
+            Response dictionary
+        """
+        rejection = self.admission.acquire()
+        if rejection is not None:
+            return self._create_overloaded_response(rejection)
+        
+        with request_clock() as clock:
+            try:
+                return self._handle_request(request, injection_detected, data_validations)
+            finally:
+                self.admission.release(clock.elapsed())
+    
+    def _handle_request(self, request: Dict[str, Any], injection_detected: Optional[bool] = None,
+                        data_validations: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Process a request, optionally with its injection check and data point
+        validation already done for a whole batch
+        
+        Args:
+            request: Request dictionary
+            injection_detected: Result of a batch injection scan of the query, if available
+            data_validations: Result of a batch validation of the context's data points, if available
+            
+        Returns:
+            Response dictionary with validated content
+        """
+        clock = current_clock() or RequestClock()
+        deadline = clock.started + self.config.get("max_response_time_ms", 200) / 1000
         request_id = self._generate_request_id()
         
-        try:
-            logger.info(f"Processing request {request_id}")
+        with self.tracer.span("process_request", request_id=request_id) as span:
+            try:
+                logger.info("Processing request %s", request_id, extra=PER_REQUEST)
             
-            if not request:
-                logger.error(f"Empty request {request_id}")
-                return self._create_error_response("Empty request", request_id)
+                if not request:
+                    logger.error("Empty request %s", request_id)
+                    return self._create_error_response("Empty request", request_id)
             
-            # Pre-process and validate input
-            validated_input = self._preprocess_input(request)
+                # Pre-process and validate input
+                validated_input = self._preprocess_input(request, deadline, injection_detected)
             
-            if not validated_input["valid"]:
-                logger.warning(f"Input validation failed for {request_id}")
-                self.performance_metrics["failed_requests"] += 1
-                return self._create_error_response("Input validation failed", request_id, validated_input["errors"])
+                if not validated_input["valid"]:
+                    logger.warning("Input validation failed for %s", request_id)
+                    self._counters.add("failed_requests")
+                    return self._create_error_response("Input validation failed", request_id, validated_input["errors"])
             
-            # Generate response with hallucination prevention
-            response = self.response_generator.generate_response(validated_input["processed_request"])
+                processed_request = validated_input["processed_request"]
+                if data_validations is not None:
+                    processed_request["data_validations"] = data_validations
             
-            # Post-process response
-            final_response = self._postprocess_response(response, request_id)
+                # Generate response with hallucination prevention
+                response = self.response_generator.generate_response(processed_request)
             
-            # Track performance
-            response_time = time.time() - start_time
-            self._update_metrics(response_time, final_response["success"])
+                return self._finish_request(response, request_id, clock, processed_request["check_tier"])
             
-            # Check response time against threshold
-            if response_time > self.config.get("max_response_time_ms", 200) / 1000:
-                logger.warning(f"Response time {response_time:.3f}s exceeded threshold for {request_id}")
+            except Exception as e:
+                logger.error("Error processing request %s: %s", request_id, e)
+                self._counters.add("failed_requests")
+                span.set_attribute("error", str(e))
+                return self._create_error_response(f"Processing error: {str(e)}", request_id)
+    
+    async def process_request_async(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process a request with full hallucination prevention on an asyncio event loop
+        
+        Backend generation is awaited; input preprocessing, validation and logic
+        checks run on the handler's validation executor. Produces the same
+        responses and metrics as process_request.
+        
+        Args:
+            request: Request dictionary
             
-            logger.info(f"Request {request_id} processed successfully in {response_time:.3f}s")
+        Returns:
+            Response dictionary with validated content
+        """
+        rejection = await self.admission.acquire_async()
+        if rejection is not None:
+            return self._create_overloaded_response(rejection)
+        
+        with request_clock() as clock:
+            try:
+                return await self._handle_request_async(request)
+            finally:
+                self.admission.release(clock.elapsed())
+    
+    async def _handle_request_async(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process an admitted request on the event loop
+        
+        Args:
+            request: Request dictionary
             
-            return final_response
+        Returns:
+            Response dictionary with validated content
+        """
+        clock = current_clock() or RequestClock()
+        deadline = clock.started + self.config.get("max_response_time_ms", 200) / 1000
+        request_id = self._generate_request_id()
+        
+        with self.tracer.span("process_request", request_id=request_id) as span:
+            try:
+                logger.info("Processing request %s", request_id, extra=PER_REQUEST)
             
-        except Exception as e:
-            logger.error(f"Error processing request {request_id}: {str(e)}")
-            self.performance_metrics["failed_requests"] += 1
-            return self._create_error_response(f"Processing error: {str(e)}", request_id)
+                if not request:
+                    logger.error("Empty request %s", request_id)
+                    return self._create_error_response("Empty request", request_id)
+            
+                loop = asyncio.get_running_loop()
+                context = contextvars.copy_context()
+                validated_input = await loop.run_in_executor(
+                    self.executor, functools.partial(context.run, self._preprocess_input, request, deadline)
+                )
+            
+                if not validated_input["valid"]:
+                    logger.warning("Input validation failed for %s", request_id)
+                    self._counters.add("failed_requests")
+                    return self._create_error_response("Input validation failed", request_id, validated_input["errors"])
+            
+                response = await self.response_generator.generate_response_async(validated_input["processed_request"])
+            
+                return self._finish_request(response, request_id, clock,
+                                            validated_input["processed_request"]["check_tier"])
+            
+            except Exception as e:
+                logger.error("Error processing request %s: %s", request_id, e)
+                self._counters.add("failed_requests")
+                span.set_attribute("error", str(e))
+                return self._create_error_response(f"Processing error: {str(e)}", request_id)
+    
+    def _finish_request(self, response: Dict[str, Any], request_id: str, clock: RequestClock,
+                        check_tier: str = "full") -> Dict[str, Any]:
+        """
+        Post-process a generated response and record request metrics
+        
+        Args:
+            response: Generated response
+            request_id: Request identifier
+            clock: Clock started with the request
+            check_tier: Check tier applied to the request
+            
+        Returns:
+            Final response dictionary
+        """
+        # Post-process response
+        final_response = self._postprocess_response(response, request_id, check_tier)
+        
+        # Track performance
+        response_time = clock.elapsed()
+        self._update_metrics(response_time, final_response["success"])
+        self.degradation.observe(response_time)
+        
+        span = current_span()
+        span.set_attribute("success", final_response["success"])
+        span.set_attribute("content_length", len(final_response.get("content") or ""))
+        
+        # Check response time against threshold
+        if response_time > self.config.get("max_response_time_ms", 200) / 1000:
+            logger.warning("Response time %.3fs exceeded threshold for %s", response_time, request_id)
+        
+        logger.info("Request %s processed successfully in %.3fs", request_id, response_time, extra=PER_REQUEST)
+        
+        return final_response
     
-    def batch_process(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def batch_process(self, requests: List[Dict[str, Any]],
+                      on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
         """
         Process multiple requests in batch
         
         Args:
             requests: List of request dictionaries
+            on_result: Optional callback invoked with (index, response) as soon as each request finishes
             
         Returns:
             List of response dictionaries
@@ -117,21 +414,83 @@ class ModelHandler:
         if not requests:
             return []
         
-        logger.info(f"Processing batch of {len(requests)} requests")
+        logger.info("Processing batch of %s requests", len(requests))
+        
+        # Screen every query for injection in one scan; anything that is not a
+        # plain string query falls back to the per-request path
+        queries = [request.get("query") if isinstance(request, dict) else None for request in requests]
+        screened = [i for i, query in enumerate(queries) if isinstance(query, str)]
+        flags = self._detect_injection_batch([queries[i].strip() for i in screened])
+        injection = dict(zip(screened, flags))
+        
+        # Validate the data points of every dict context in one call, so the
+        # whole batch shares one pattern scan; serialized contexts are still
+        # streamed through validation per request
+        data_validations = {}
+        if "data_validation" in self.degradation.checks:
+            with_data = [i for i in screened if isinstance(requests[i].get("context"), dict) and requests[i]["context"]]
+            results = self.response_generator.validate_context_data([requests[i]["context"] for i in with_data])
+            data_validations = dict(zip(with_data, results))
         
         responses = []
-        for request in requests:
-            response = self.process_request(request)
+        for i, request in enumerate(requests):
+            response = self._process_request(request, injection.get(i), data_validations.get(i))
             responses.append(response)
+            if on_result is not None:
+                on_result(i, response)
         
         # Calculate batch statistics
         successful = sum(1 for r in responses if r.get("success", False))
         failed = len(responses) - successful
         
-        logger.info(f"Batch processing complete: {successful} successful, {failed} failed")
+        logger.info("Batch processing complete: %s successful, %s failed", successful, failed)
         
         return responses
     
+    async def batch_process_async(self, requests: List[Dict[str, Any]], max_concurrency: int = 16,
+                                  timeout_ms: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Process multiple requests concurrently on an asyncio event loop
+        
+        Args:
+            requests: List of request dictionaries
+            max_concurrency: Maximum number of requests processed at once
+            timeout_ms: Per-request timeout in milliseconds, measured from when the request starts
+            
+        Returns:
+            List of response dictionaries in input order
+        """
+        if max_concurrency <= 0:
+            raise ValueError("Max concurrency must be positive")
+        
+        if not requests:
+            return []
+        
+        logger.info("Processing async batch of %s requests", len(requests))
+        
+        slots = asyncio.Semaphore(max_concurrency)
+        
+        async def process(request):
+            async with slots:
+                if not timeout_ms:
+                    return await self.process_request_async(request)
+                
+                try:
+                    return await asyncio.wait_for(self.process_request_async(request), timeout_ms / 1000)
+                except asyncio.TimeoutError:
+                    logger.warning("Request timed out after %sms", timeout_ms)
+                    self._update_metrics(timeout_ms / 1000, False)
+                    return self._create_error_response("Request timed out", self._generate_request_id())
+        
+        responses = await asyncio.gather(*(process(request) for request in requests))
+        
+        successful = sum(1 for r in responses if r.get("success", False))
+        failed = len(responses) - successful
+        
+        logger.info("Async batch processing complete: %s successful, %s failed", successful, failed)
+        
+        return list(responses)
+    
     def detect_hallucination(self, content: str, context: Dict[str, Any] = None) -> Tuple[bool, float, str]:
         """
         Detect potential hallucination in content
@@ -147,45 +506,125 @@ class ModelHandler:
             if not content:
                 return True, 1.0, "Empty content"
             
-            # Check with data validator
-            source = context.get("source", "") if context else ""
-            is_valid, confidence, error = self.data_validator.validate_data_point(content, source)
-            
-            if not is_valid:
-                self._log_hallucination(content, "data_validation", error)
-                return True, 1.0 - confidence, error or "Failed data validation"
+            checks = self.degradation.checks
             
-            # Check logic consistency
-            is_consistent, contradictions = self.logic_checker.check_statement_consistency(content)
+            # Fast path: identical content that passed under the same validation state.
+            # A logic-checked verdict only holds while the statement is still in context.
+            fingerprint = None
+            if self.known_good is not None:
+                state = self._validation_state(checks)
+                fingerprint = KnownGoodIndex.fingerprint(content, context.get("source", "") if context else "")
+                verdict = self.known_good.get(fingerprint, state)
+                if verdict is not None and ("logic_consistency" not in checks or
+                                            self.logic_checker.reaffirm_statement(content)):
+                    return verdict
             
-            if not is_consistent:
-                reason = "; ".join(contradictions)
-                self._log_hallucination(content, "logic_inconsistency", reason)
-                return True, 0.9, reason
+            confidence = 1.0
             
-            # Pattern-based detection
-            hallucination_detected, pattern_confidence, pattern_reason = self._detect_hallucination_patterns(content)
+            # Run enabled checks cheapest-per-rejection first and stop at the first hit
+            for name in self.check_order.order(checks):
+                check_start = time.monotonic()
+                detected, score, reason = self._detection_checks[name](content, context)
+                self.check_order.record(name, time.monotonic() - check_start, detected)
+                
+                if detected:
+                    self._log_hallucination(content, DETECTION_TYPES[name], reason)
+                    return True, score, reason
+                
+                if name == "data_validation":
+                    confidence = score
             
-            if hallucination_detected:
-                self._log_hallucination(content, "pattern_match", pattern_reason)
-                return True, pattern_confidence, pattern_reason
+            verdict = (False, confidence, "No hallucination detected")
+            if fingerprint is not None:
+                self.known_good.put(fingerprint, state, verdict)
             
-            return False, confidence, "No hallucination detected"
+            return verdict
             
         except Exception as e:
-            logger.error(f"Hallucination detection error: {str(e)}")
+            logger.error("Hallucination detection error: %s", e)
             return True, 0.5, f"Detection error: {str(e)}"
     
-    def _preprocess_input(self, request: Dict[str, Any]) -> Dict[str, Any]:
+    def _validation_state(self, checks: Tuple[str, ...]) -> Tuple[Any, ...]:
+        """
+        Build the token identifying everything a cached verdict depends on
+        
+        Args:
+            checks: Checks enabled for the call
+            
+        Returns:
+            Tuple of threshold, fact, rule and source versions and enabled checks
+        """
+        return (self.data_validator.confidence_threshold, self.logic_checker.facts_version,
+                self.logic_checker.rules_version, self.data_validator.source_version, checks)
+    
+    def _check_data_validation(self, content: str, context: Optional[Dict[str, Any]]) -> Tuple[bool, float, str]:
+        """
+        Detection check: validate content against its source
+        
+        Args:
+            content: Content to check
+            context: Optional context providing the source
+            
+        Returns:
+            Tuple of (detected, confidence, reason); confidence is the validation score when not detected
+        """
+        source = context.get("source", "") if context else ""
+        is_valid, confidence, error = self.data_validator.validate_data_point(content, source)
+        
+        if not is_valid and error and error.startswith(SCAN_BUDGET_EXCEEDED):
+            return True, SCAN_ABORTED_CONFIDENCE, error
+        
+        if not is_valid:
+            return True, 1.0 - confidence, error or "Failed data validation"
+        
+        return False, confidence, ""
+    
+    def _check_logic_consistency(self, content: str, context: Optional[Dict[str, Any]]) -> Tuple[bool, float, str]:
+        """
+        Detection check: logical consistency with previous statements and facts
+        
+        Args:
+            content: Content to check
+            context: Unused; present for a uniform check signature
+            
+        Returns:
+            Tuple of (detected, confidence, reason)
+        """
+        is_consistent, contradictions = self.logic_checker.check_statement_consistency(content)
+        
+        if not is_consistent:
+            return True, 0.9, "; ".join(contradictions)
+        
+        return False, 1.0, ""
+    
+    def _check_patterns(self, content: str, context: Optional[Dict[str, Any]]) -> Tuple[bool, float, str]:
+        """
+        Detection check: known hallucination patterns
+        
+        Args:
+            content: Content to check
+            context: Unused; present for a uniform check signature
+            
+        Returns:
+            Tuple of (detected, confidence, reason)
+        """
+        return self._detect_hallucination_patterns(content)
+    
+    def _preprocess_input(self, request: Dict[str, Any], deadline: Optional[float] = None,
+                          injection_detected: Optional[bool] = None) -> Dict[str, Any]:
         """
         Preprocess and validate input request
         
         Args:
             request: Raw request
+            deadline: Absolute time.monotonic() deadline for the request
+            injection_detected: Precomputed injection check of the query (scanned here if None)
             
         Returns:
             Validation result with processed request
         """
+        stage_start = time.monotonic()
+        check_tier = self.degradation.tier
         errors = []
         
         # Extract and validate query
@@ -194,12 +633,20 @@ class ModelHandler:
             errors.append("Missing or empty query")
         
         # Validate query doesn't contain injection attempts
-        if self._detect_injection(query):
+        if injection_detected is None:
+            injection_detected = self._detect_injection(query)
+        if injection_detected:
             errors.append("Potential injection detected in query")
         
         # Extract and validate context
         context = request.get("context", {})
-        if context and not isinstance(context, dict):
+        if isinstance(context, (bytes, bytearray, memoryview)):
+            # Pre-serialized contexts are parsed lazily as the request walks them
+            try:
+                context = JsonContext(context)
+            except ValueError:
+                errors.append("Context must be a dictionary or a serialized JSON object")
+        elif context and not isinstance(context, (dict, JsonContext)):
             errors.append("Context must be a dictionary")
         
         # Build processed request
@@ -207,26 +654,35 @@ class ModelHandler:
             "query": query,
             "context": context,
             "metadata": request.get("metadata", {}),
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": request_timestamp(),
+            "deadline": deadline,
+            "check_tier": check_tier,
+            "checks": CHECK_TIERS[check_tier]
         }
         
+        self.latency.record("preprocess", time.monotonic() - stage_start)
+        
         return {
             "valid": len(errors) == 0,
             "errors": errors,
             "processed_request": processed_request if not errors else None
         }
     
-    def _postprocess_response(self, response: Dict[str, Any], request_id: str) -> Dict[str, Any]:
+    def _postprocess_response(self, response: Dict[str, Any], request_id: str,
+                              check_tier: str = "full") -> Dict[str, Any]:
         """
         Post-process response before returning
         
         Args:
             response: Generated response
             request_id: Request identifier
+            check_tier: Check tier applied to the request
             
         Returns:
             Final processed response
         """
+        stage_start = time.monotonic()
+        
         # Add request ID
         response["request_id"] = request_id
         
@@ -234,14 +690,17 @@ class ModelHandler:
         response["hallucination_prevention"] = {
             "enabled": True,
             "confidence_threshold": self.config.get("confidence_threshold", 0.85),
-            "checks_performed": ["data_validation", "logic_consistency", "pattern_detection"]
+            "check_tier": check_tier,
+            "checks_performed": self.response_generator.checks_performed(CHECK_TIERS[check_tier])
         }
         
         # Track if hallucination was prevented
         if not response.get("success", False):
             error = response.get("error", "")
             if "hallucination" in error.lower() or "validation" in error.lower():
-                self.performance_metrics["hallucinations_prevented"] += 1
+                self._counters.add("hallucinations_prevented")
+        
+        self.latency.record("postprocess", time.monotonic() - stage_start)
         
         return response
     
@@ -255,36 +714,18 @@ class ModelHandler:
         Returns:
             Tuple of (detected, confidence, reason)
         """
-        patterns = [
-            {
-                "pattern": r"(?i)as an ai|as a language model",
-                "confidence": 0.95,
-                "reason": "Self-referential AI pattern"
-            },
-            {
-                "pattern": r"(?i)i don't have access|cannot access",
-                "confidence": 0.9,
-                "reason": "Access limitation pattern"
-            },
-            {
-                "pattern": r"\[.*?\]|\{.*?\}",
-                "confidence": 0.8,
-                "reason": "Placeholder pattern"
-            },
-            {
-                "pattern": r"(?i)hypothetically|theoretically|in theory",
-                "confidence": 0.7,
-                "reason": "Speculative language pattern"
-            }
-        ]
-        
-        import re
+        try:
+            index = self.pattern_scanner.first_match(content)
+        except ScanBudgetExceeded as e:
+            # Content too costly to scan is treated as suspect rather than clean
+            logger.warning("Pattern detection aborted: %s", e)
+            return True, SCAN_ABORTED_CONFIDENCE, "Content scan exceeded its time budget"
         
-        for pattern_info in patterns:
-            if re.search(pattern_info["pattern"], content):
-                return True, pattern_info["confidence"], pattern_info["reason"]
+        if index is None:
+            return False, 0.0, ""
         
-        return False, 0.0, ""
+        _, confidence, reason = DETECTION_PATTERNS[index]
+        return True, confidence, reason
     
     def _detect_injection(self, text: str) -> bool:
         """
@@ -296,25 +737,43 @@ class ModelHandler:
         Returns:
             True if injection pattern detected
         """
-        injection_patterns = [
-            r"<script",
-            r"javascript:",
-            r"on\w+\s*=",
-            r"eval\s*\(",
-            r"DROP\s+TABLE",
-            r"DELETE\s+FROM",
-            r"INSERT\s+INTO"
-        ]
-        
-        import re
+        match = _INJECTION_RE.search(text)
         
-        for pattern in injection_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                logger.warning(f"Potential injection detected: {pattern}")
-                return True
+        if match:
+            logger.warning("Potential injection detected: %s", match.group(0))
+            return True
         
         return False
     
+    def _detect_injection_batch(self, texts: List[str]) -> List[bool]:
+        """
+        Detect potential injection attempts in many texts with one scan
+        
+        Args:
+            texts: Texts to check
+            
+        Returns:
+            List of flags, True where an injection pattern was detected
+        """
+        flagged = [False] * len(texts)
+        if not texts:
+            return flagged
+        
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+        
+        # No injection pattern can match across the NUL separator
+        for match in _INJECTION_RE.finditer("\0".join(texts)):
+            index = bisect.bisect_right(starts, match.start()) - 1
+            if not flagged[index]:
+                logger.warning("Potential injection detected: %s", match.group(0))
+                flagged[index] = True
+        
+        return flagged
+    
     def _log_hallucination(self, content: str, detection_type: str, reason: str):
         """
         Log detected hallucination
@@ -324,20 +783,19 @@ class ModelHandler:
             detection_type: Type of detection
             reason: Reason for detection
         """
-        log_entry = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "content_snippet": content[:100] if len(content) > 100 else content,
-            "detection_type": detection_type,
-            "reason": reason
-        }
+        log_entry = HallucinationRecord(request_time(), content[:100], detection_type, reason)
         
-        self.hallucination_logs.append(log_entry)
+        if self.audit_sink is not None:
+            self.audit_sink.write("hallucination", log_entry)
         
-        # Keep log size manageable
-        if len(self.hallucination_logs) > 1000:
-            self.hallucination_logs = self.hallucination_logs[-500:]
+        with self._logs_lock:
+            self.hallucination_logs.append(log_entry)
+            
+            # Keep log size manageable
+            if len(self.hallucination_logs) > 1000:
+                self.hallucination_logs = self.hallucination_logs[-500:]
         
-        logger.info(f"Hallucination detected and prevented: {detection_type} - {reason}")
+        logger.info("Hallucination detected and prevented: %s - %s", detection_type, reason, extra=PER_REQUEST)
     
     def _update_metrics(self, response_time: float, success: bool):
         """
@@ -347,13 +805,14 @@ class ModelHandler:
             response_time: Time taken to process request
             success: Whether request was successful
         """
-        self.performance_metrics["total_requests"] += 1
-        self.performance_metrics["total_response_time"] += response_time
+        self._counters.add("total_requests")
+        self._counters.add("total_response_time", response_time)
+        self.latency.record("total", response_time)
         
         if success:
-            self.performance_metrics["successful_requests"] += 1
+            self._counters.add("successful_requests")
         else:
-            self.performance_metrics["failed_requests"] += 1
+            self._counters.add("failed_requests")
     
     def _generate_request_id(self) -> str:
         """
@@ -363,9 +822,10 @@ class ModelHandler:
             Request ID string
         """
         import uuid
-        return f"req_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{str(uuid.uuid4())[:8]}"
+        return f"req_{time.strftime('%Y%m%d%H%M%S', time.gmtime(request_time()))}_{str(uuid.uuid4())[:8]}"
     
-    def _create_error_response(self, error_message: str, request_id: str, details: List[str] = None) -> Dict[str, Any]:
+    def _create_error_response(self, error_message: str, request_id: str, details: List[str] = None,
+                               error_code: str = "error") -> Dict[str, Any]:
         """
         Create error response
         
@@ -373,6 +833,7 @@ class ModelHandler:
             error_message: Main error message
             request_id: Request identifier
             details: Additional error details
+            error_code: Machine-readable error category
             
         Returns:
             Error response dictionary
@@ -384,12 +845,27 @@ class ModelHandler:
             "data": [],
             "confidence": 0.0,
             "error": error_message,
+            "error_code": error_code,
             "error_details": details or [],
             "metadata": {
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": request_timestamp()
             }
         }
     
+    def _create_overloaded_response(self, reason: str) -> Dict[str, Any]:
+        """
+        Create the fast-fail response for a request shed by admission control
+        
+        Args:
+            reason: Rejection reason from the admission controller
+            
+        Returns:
+            Error response dictionary with error_code "overloaded"
+        """
+        self._counters.add("rejected_requests")
+        return self._create_error_response("Service overloaded", self._generate_request_id(), [reason],
+                                           error_code="overloaded")
+    
     def _validate_config(self):
         """
         Validate configuration parameters
@@ -409,6 +885,55 @@ class ModelHandler:
         window = self.config.get("context_window", 100)
         if window <= 0:
             raise ValueError(f"Invalid context window: {window}")
+        
+        # Validate retry budget
+        max_retries = self.config.get("max_retries", 2)
+        if max_retries < 0:
+            raise ValueError(f"Invalid max retries: {max_retries}")
+        
+        # Validate async validation pool size
+        workers = self.config.get("validation_workers", 1)
+        if workers <= 0:
+            raise ValueError(f"Invalid validation workers: {workers}")
+        
+        # Validate concurrent check pool size
+        check_workers = self.config.get("check_workers", 0)
+        if check_workers < 0:
+            raise ValueError(f"Invalid check workers: {check_workers}")
+        
+        # Validate admission limits
+        max_concurrent = self.config.get("max_concurrent_requests", 64)
+        if max_concurrent <= 0:
+            raise ValueError(f"Invalid max concurrent requests: {max_concurrent}")
+        
+        max_queued = self.config.get("max_queued_requests", 256)
+        if max_queued < 0:
+            raise ValueError(f"Invalid max queued requests: {max_queued}")
+        
+        # Validate tracing sample rate
+        sample_rate = self.config.get("trace_sample_rate", 0.0)
+        if not 0 <= sample_rate <= 1:
+            raise ValueError(f"Invalid trace sample rate: {sample_rate}")
+    
+    def _create_tracer(self) -> Tracer:
+        """
+        Create the request tracer from configuration
+        
+        Spans are only recorded when trace_sample_rate is above zero and
+        written when trace_path is set.
+        
+        Returns:
+            Tracer shared by all components of this handler
+        """
+        sample_rate = self.config.get("trace_sample_rate", 0.0)
+        trace_path = self.config.get("trace_path")
+        exporter = None
+        
+        if sample_rate > 0 and trace_path:
+            exporter = JsonlSpanExporter(trace_path, self.config.get("trace_flush_interval_s", 1.0))
+            logger.info(f"Tracing {sample_rate:.0%} of requests to {trace_path}")
+        
+        return Tracer(sample_rate, exporter)
     
     def _get_default_config(self) -> Dict[str, Any]:
         """
@@ -421,11 +946,33 @@ class ModelHandler:
             "confidence_threshold": 0.85,
             "context_window": 100,
             "max_response_time_ms": 200,
+            "max_validation_overhead_ms": 50,
             "enable_caching": True,
             "cache_ttl_seconds": 300,
             "max_retries": 2
         }
     
+    @property
+    def performance_metrics(self) -> Dict[str, Any]:
+        """
+        Snapshot of the raw performance counters
+        """
+        return self._counters.snapshot()
+    
+    def _recent_hallucinations(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        Copy the most recent hallucination log entries
+        
+        Args:
+            limit: Maximum number of entries
+            
+        Returns:
+            List of log entries, oldest first
+        """
+        with self._logs_lock:
+            recent = self.hallucination_logs[-limit:]
+        return [entry.to_dict() for entry in recent]
+    
     def get_performance_metrics(self) -> Dict[str, Any]:
         """
         Get performance metrics
@@ -433,38 +980,171 @@ class ModelHandler:
         Returns:
             Performance metrics dictionary
         """
-        total = self.performance_metrics["total_requests"]
+        self._restore_metrics()
+        metrics = self._counters.snapshot()
+        total = metrics["total_requests"]
         
         if total == 0:
             avg_response_time = 0.0
             success_rate = 0.0
             hallucination_prevention_rate = 0.0
         else:
-            avg_response_time = self.performance_metrics["total_response_time"] / total
-            success_rate = self.performance_metrics["successful_requests"] / total
-            hallucination_prevention_rate = self.performance_metrics["hallucinations_prevented"] / total
+            avg_response_time = metrics["total_response_time"] / total
+            success_rate = metrics["successful_requests"] / total
+            hallucination_prevention_rate = metrics["hallucinations_prevented"] / total
         
         return {
             "total_requests": total,
-            "successful_requests": self.performance_metrics["successful_requests"],
-            "failed_requests": self.performance_metrics["failed_requests"],
-            "hallucinations_prevented": self.performance_metrics["hallucinations_prevented"],
+            "successful_requests": metrics["successful_requests"],
+            "failed_requests": metrics["failed_requests"],
+            "rejected_requests": metrics["rejected_requests"],
+            "hallucinations_prevented": metrics["hallucinations_prevented"],
             "average_response_time_ms": avg_response_time * 1000,
             "success_rate": success_rate,
             "hallucination_prevention_rate": hallucination_prevention_rate,
-            "recent_hallucinations": self.hallucination_logs[-10:]
+            "latency": self.latency.summary(),
+            "slo": self._slo_status(),
+            "admission": self.admission.get_stats(),
+            "degradation": self.degradation.get_stats(),
+            "check_order": self.check_order.get_stats(),
+            "known_good": self.known_good.get_stats() if self.known_good is not None else None,
+            "shared_store": self.shared_store.get_stats() if self.shared_store is not None else None,
+            "audit": self.audit_sink.get_stats() if self.audit_sink is not None else None,
+            "log_queue": self.log_queue.get_stats() if self.log_queue is not None else None,
+            "response_cache": (self.response_generator.response_cache.get_stats()
+                               if self.response_generator.response_cache is not None else None),
+            "recent_hallucinations": self._recent_hallucinations(10)
+        }
+    
+    def get_latency_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Export mergeable latency histogram snapshots for aggregation across workers
+        
+        Returns:
+            Dictionary of stage name to histogram snapshot
+        """
+        self._restore_metrics()
+        return self.latency.snapshot()
+    
+    def _slo_status(self) -> Dict[str, Any]:
+        """
+        Compare measured latency against the AMB spec targets
+        
+        Returns:
+            Dictionary with targets, measured values and whether they are met
+        """
+        total = self.latency.histograms["total"]
+        p95_ms = total.percentile(95) * 1000
+        target_ms = self.config.get("max_response_time_ms", 200)
+        validation_p95_ms = sum(
+            self.latency.histograms[stage].percentile(95) for stage in ("validation", "logic_check")
+        ) * 1000
+        
+        return {
+            "p95_target_ms": target_ms,
+            "p95_ms": p95_ms,
+            "p95_met": total.count == 0 or p95_ms <= target_ms,
+            "validation_overhead_target_ms": self.config.get("max_validation_overhead_ms", 50),
+            "validation_overhead_p95_ms": validation_p95_ms,
+            "validation_overhead_met": validation_p95_ms <= self.config.get("max_validation_overhead_ms", 50)
+        }
+    
+    def snapshot(self, path: str):
+        """
+        Save warm state for a later restore
+        
+        Writes the response cache, source-truth cache, LogicChecker context
+        and facts, and metrics as separate sections of one snapshot file.
+        
+        Args:
+            path: Snapshot file path
+        """
+        self._restore_metrics()
+        sections = {
+            "metrics": {"counters": self._counters.snapshot(), "latency": self.latency.snapshot()},
+            "source_cache": self.data_validator.export_state(),
+            "logic": self.logic_checker.export_state()
+        }
+        
+        response_cache = self.response_generator.response_cache
+        if response_cache is not None:
+            sections["response_cache"] = response_cache.export_state()
+        
+        write_snapshot(path, sections)
+    
+    def restore(self, path: str):
+        """
+        Warm-start from a snapshot written by snapshot()
+        
+        Only the section table is read now; each section is decompressed and
+        parsed when its component is first used. Restoring
+        replaces context and facts, and adds to caches and metrics.
+        
+        Args:
+            path: Snapshot file path
+        """
+        reader = SnapshotReader(path)
+        targets = {
+            "source_cache": self.data_validator,
+            "logic": self.logic_checker,
+            "response_cache": self.response_generator.response_cache
         }
+        
+        for section in reader.sections:
+            loader = functools.partial(reader.load, section)
+            if section == "metrics":
+                with self._metrics_lock:
+                    self._metrics_loader = loader
+            elif targets.get(section) is not None:
+                targets[section].defer_restore(loader)
+            else:
+                logger.warning(f"Snapshot section {section} skipped")
+                reader.skip(section)
+        
+        logger.info(f"Restoring from snapshot {path}: {', '.join(reader.sections)}")
+    
+    def _restore_metrics(self):
+        """
+        Merge deferred snapshot metrics once
+        """
+        if self._metrics_loader is None:
+            return
+        
+        with self._metrics_lock:
+            loader, self._metrics_loader = self._metrics_loader, None
+            if loader is None:
+                return
+            state = loader()
+            for name, value in state["counters"].items():
+                if name in self._counters.names:
+                    self._counters.add(name, value)
+            self.latency.merge(state["latency"])
+    
+    def close(self):
+        """
+        Release the executors, backend resources, trace exporter, audit sink, log queue and shared store
+        """
+        self.executor.shutdown(wait=True)
+        if self.check_executor is not None:
+            self.check_executor.shutdown(wait=True)
+        if self.scan_executor is not None:
+            self.scan_executor.shutdown(wait=True)
+        self.response_generator.backend.close()
+        self.tracer.close()
+        if self.audit_sink is not None:
+            self.audit_sink.close()
+        if self.log_queue is not None:
+            self.log_queue.stop()
+        if self.shared_store is not None:
+            self.shared_store.close()
     
     def reset_metrics(self):
         """
         Reset performance metrics
         """
-        self.performance_metrics = {
-            "total_requests": 0,
-            "successful_requests": 0,
-            "failed_requests": 0,
-            "hallucinations_prevented": 0,
-            "total_response_time": 0.0
-        }
+        self._metrics_loader = None
+        self._counters.reset()
+        self.latency.reset()
+        self.admission.reset_stats()
         
         logger.info("Performance metrics reset")
\ No newline at end of file
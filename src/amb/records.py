@@ -0,0 +1,126 @@
+"""
+Records Module for AMB Hallucination Prevention
+Compact slotted records for validation history, context memory, logs and data points
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+
+
+def format_timestamp(timestamp: float) -> str:
+    """
+    Format a time.time() value the way datetime.utcnow().isoformat() does
+    
+    Args:
+        timestamp: Seconds since the epoch
+    
+    Returns:
+        Naive ISO 8601 UTC string
+    """
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def parse_timestamp(value: str) -> float:
+    """
+    Invert format_timestamp
+    
+    Args:
+        value: Naive ISO 8601 UTC string
+    
+    Returns:
+        Seconds since the epoch
+    """
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+
+
+class ValidationRecord:
+    """
+    One data validation event
+    """
+    
+    __slots__ = ("timestamp", "data_hash", "source", "valid", "confidence")
+    
+    def __init__(self, timestamp: float, data_hash: bytes, source: str, valid: bool, confidence: float):
+        self.timestamp = timestamp
+        self.data_hash = data_hash
+        self.source = source
+        self.valid = valid
+        self.confidence = confidence
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "timestamp": format_timestamp(self.timestamp),
+            "data_hash": self.data_hash.hex(),
+            "source": self.source,
+            "valid": self.valid,
+            "confidence": self.confidence
+        }
+
+
+class ContextRecord:
+    """
+    One statement held in a LogicChecker's context memory
+    """
+    
+    __slots__ = ("statement", "timestamp", "metadata")
+    
+    def __init__(self, statement: str, timestamp: float, metadata: Dict[str, Any]):
+        self.statement = statement
+        self.timestamp = timestamp
+        self.metadata = metadata
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {"statement": self.statement, "timestamp": format_timestamp(self.timestamp), "metadata": self.metadata}
+    
+    @classmethod
+    def from_dict(cls, item: Dict[str, Any]) -> "ContextRecord":
+        return cls(item["statement"], parse_timestamp(item["timestamp"]), item.get("metadata") or {})
+
+
+class HallucinationRecord:
+    """
+    One detected hallucination
+    """
+    
+    __slots__ = ("timestamp", "content_snippet", "detection_type", "reason")
+    
+    def __init__(self, timestamp: float, content_snippet: str, detection_type: str, reason: str):
+        self.timestamp = timestamp
+        self.content_snippet = content_snippet
+        self.detection_type = detection_type
+        self.reason = reason
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "timestamp": format_timestamp(self.timestamp),
+            "content_snippet": self.content_snippet,
+            "detection_type": self.detection_type,
+            "reason": self.reason
+        }
+
+
+class DataPoint:
+    """
+    One context value carried through validation as a response data point
+    """
+    
+    __slots__ = ("key", "value", "source", "timestamp")
+    
+    def __init__(self, key: str, value: Any, source: str, timestamp: float):
+        self.key = key
+        self.value = value
+        self.source = source
+        self.timestamp = timestamp
+    
+    def to_dict(self, timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Export the point, reusing an already formatted timestamp if given
+        
+        Args:
+            timestamp: ISO form of self.timestamp, shared by every point of a response
+        
+        Returns:
+            Data point dictionary
+        """
+        return {"key": self.key, "value": self.value, "source": self.source,
+                "timestamp": timestamp if timestamp is not None else format_timestamp(self.timestamp)}
\ No newline at end of file
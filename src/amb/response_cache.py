@@ -0,0 +1,440 @@
+"""
+Response Cache Module for AMB Hallucination Prevention
+Near-duplicate response cache keyed by SimHash fingerprints of normalized queries
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Hashable, List, Optional, Tuple
+
+from .context_view import JsonContext
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+
+# Filler words that do not change what is being asked
+FILLER_WORDS = frozenset(["a", "an", "the", "please", "kindly", "just"])
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:[.'][a-z0-9]+)*")
+
+# Estimated bytes of a cached response beyond its content and data values
+RESPONSE_OVERHEAD = 256
+DATA_POINT_OVERHEAD = 96
+
+# Tokens that must match exactly: a one-bit SimHash difference can flip a number or a negation
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+_NEGATIONS = frozenset(["not", "no", "never", "none", "nor", "without"])
+
+
+def normalize_query(query: str) -> List[str]:
+    """
+    Normalize a query into comparison tokens
+    
+    Lowercases, drops punctuation and filler words and collapses whitespace.
+    
+    Args:
+        query: Raw query text
+    
+    Returns:
+        List of normalized tokens
+    """
+    return [token for token in _WORD_RE.findall(query.lower()) if token not in FILLER_WORDS]
+
+
+def simhash(tokens: List[str]) -> int:
+    """
+    Compute a 64-bit SimHash over word unigrams and bigrams
+    
+    Args:
+        tokens: Normalized tokens
+    
+    Returns:
+        64-bit fingerprint
+    """
+    features = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+    weights = [0] * FINGERPRINT_BITS
+    
+    for feature in features:
+        value = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    
+    return fingerprint
+
+
+def _thaw(value: Any) -> Any:
+    """
+    Convert a hashable scope into JSON-serializable form (tuples to lists, bytes tagged)
+    """
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    if isinstance(value, bytes):
+        return {"bytes": value.hex()}
+    return value
+
+
+def _freeze(value: Any) -> Any:
+    """
+    Invert _thaw, rebuilding the hashable scope
+    """
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return bytes.fromhex(value["bytes"])
+    return value
+
+
+class NearDuplicateCache:
+    """
+    Caches responses for queries within a Hamming distance of an earlier query
+    
+    Queries are normalized and fingerprinted with SimHash. Fingerprints are
+    split into max_distance + 1 bands and indexed by band value, so any
+    fingerprint within max_distance bits shares at least one band with the
+    query and only those bucket entries are compared. Numbers, negations,
+    the request context and the caller's state token must match exactly.
+    The default max_distance of 0 only treats queries as duplicates when
+    they differ in case, punctuation, whitespace or filler words; larger
+    distances also merge queries with different content words. Entries
+    expire after ttl_seconds and the least recently used ones are evicted
+    once the estimated size exceeds max_bytes.
+    """
+    
+    def __init__(self, max_distance: int = 0, ttl_seconds: float = 300, max_bytes: int = 16 * 1024 * 1024):
+        """
+        Initialize NearDuplicateCache
+        
+        Args:
+            max_distance: Maximum Hamming distance between fingerprints for a hit (0 = exact)
+            ttl_seconds: Entry lifetime in seconds
+            max_bytes: Approximate memory bound for cached responses
+        """
+        if not 0 <= max_distance < FINGERPRINT_BITS // 2:
+            raise ValueError(f"Max distance must be between 0 and {FINGERPRINT_BITS // 2 - 1}")
+        
+        if ttl_seconds <= 0:
+            raise ValueError("TTL must be positive")
+        
+        if max_bytes <= 0:
+            raise ValueError("Max bytes must be positive")
+        
+        self.max_distance = max_distance
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        # Band boundaries; the last band absorbs the remainder bits
+        band_count = max_distance + 1
+        width = FINGERPRINT_BITS // band_count
+        self._bands = [(i * width, width if i < band_count - 1 else FINGERPRINT_BITS - i * width)
+                       for i in range(band_count)]
+        
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._buckets: Dict[Tuple[Hashable, int, int], set] = {}
+        self._next_id = 0
+        self._restore_loader = None
+        self._lock = threading.Lock()
+    
+    def get(self, query: str, context: Optional[Dict[str, Any]] = None, token: Hashable = None,
+            key: Optional[Tuple[int, Hashable]] = None) -> Optional[Tuple[Dict[str, Any], int]]:
+        """
+        Look up a response cached for a near-duplicate query
+        
+        Args:
+            query: Raw query text
+            context: Request context (must match exactly)
+            token: Caller state the response depends on (must match exactly)
+            key: Precomputed key(query, context, token), reused by a later put()
+        
+        Returns:
+            Tuple of (response copy, Hamming distance), or None on a miss
+        """
+        fingerprint, scope = key or self.key(query, context, token)
+        now = time.monotonic()
+        
+        with self._lock:
+            self._restore_pending()
+            best_id, best_distance = None, None
+            for candidate in self._candidates(fingerprint, scope):
+                entry = self._entries[candidate]
+                if entry["expires"] <= now:
+                    self._remove(candidate)
+                    continue
+                distance = bin(entry["fingerprint"] ^ fingerprint).count("1")
+                if distance <= self.max_distance and (best_distance is None or distance < best_distance):
+                    best_id, best_distance = candidate, distance
+            
+            if best_id is None:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            response = self._entries[best_id]["response"]
+        
+        return copy.deepcopy(response), best_distance
+    
+    def put(self, query: str, response: Dict[str, Any], context: Optional[Dict[str, Any]] = None,
+            token: Hashable = None, key: Optional[Tuple[int, Hashable]] = None):
+        """
+        Cache a response for a query
+        
+        Args:
+            query: Raw query text
+            response: Response to cache (its containers are copied)
+            context: Request context
+            token: Caller state the response depends on
+            key: Precomputed key(query, context, token), such as the one get() was given
+        """
+        size = self._estimate_size(query, response)
+        if size > self.max_bytes:
+            return
+        
+        fingerprint, scope = key or self.key(query, context, token)
+        response = self._detach(response)
+        
+        with self._lock:
+            self._restore_pending()
+            self._insert(fingerprint, scope, response, size, time.monotonic() + self.ttl_seconds)
+    
+    def export_state(self) -> List[Dict[str, Any]]:
+        """
+        Export live entries for a snapshot, least recently used first
+        
+        Returns:
+            List of JSON-serializable entries with their remaining lifetime
+        """
+        now = time.monotonic()
+        
+        with self._lock:
+            self._restore_pending()
+            return [
+                {
+                    "fingerprint": entry["fingerprint"],
+                    "scope": _thaw(entry["scope"]),
+                    "response": entry["response"],
+                    "size": entry["size"],
+                    "ttl": entry["expires"] - now
+                }
+                for entry in self._entries.values() if entry["expires"] > now
+            ]
+    
+    def load_state(self, entries: List[Dict[str, Any]]):
+        """
+        Insert entries exported by export_state
+        
+        Args:
+            entries: Exported entries
+        """
+        with self._lock:
+            self._load_entries(entries)
+    
+    def defer_restore(self, loader: Callable[[], List[Dict[str, Any]]]):
+        """
+        Load exported entries on first use instead of now
+        
+        Args:
+            loader: Callable returning entries exported by export_state
+        """
+        with self._lock:
+            self._restore_loader = loader
+    
+    def clear(self):
+        """
+        Drop every cached response
+        """
+        with self._lock:
+            self._restore_loader = None
+            self._entries.clear()
+            self._buckets.clear()
+            self.bytes_used = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with size, memory use, hits, misses and evictions
+        """
+        with self._lock:
+            self._restore_pending()
+            return {
+                "size": len(self._entries),
+                "bytes_used": self.bytes_used,
+                "max_bytes": self.max_bytes,
+                "max_distance": self.max_distance,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+    
+    def _restore_pending(self):
+        """
+        Load deferred snapshot entries (caller holds the lock)
+        """
+        loader, self._restore_loader = self._restore_loader, None
+        if loader is not None:
+            self._load_entries(loader())
+    
+    def _load_entries(self, entries: List[Dict[str, Any]]):
+        """
+        Insert exported entries (caller holds the lock)
+        
+        Args:
+            entries: Entries exported by export_state
+        """
+        now = time.monotonic()
+        for entry in entries:
+            if entry["ttl"] > 0 and entry["size"] <= self.max_bytes:
+                self._insert(entry["fingerprint"], _freeze(entry["scope"]), entry["response"],
+                             entry["size"], now + min(entry["ttl"], self.ttl_seconds))
+    
+    def _insert(self, fingerprint: int, scope: Hashable, response: Dict[str, Any], size: int, expires: float):
+        """
+        Store an entry and evict down to the memory bound (caller holds the lock)
+        
+        Args:
+            fingerprint: Query fingerprint
+            scope: Exact-match scope
+            response: Response to store (already copied)
+            size: Estimated size in bytes
+            expires: time.monotonic() expiry
+        """
+        # Replace an entry for the same fingerprint rather than storing both
+        for candidate in self._candidates(fingerprint, scope):
+            if self._entries[candidate]["fingerprint"] == fingerprint:
+                self._remove(candidate)
+        
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = {
+            "fingerprint": fingerprint,
+            "scope": scope,
+            "response": response,
+            "size": size,
+            "expires": expires
+        }
+        for bucket in self._bucket_keys(fingerprint, scope):
+            self._buckets.setdefault(bucket, set()).add(entry_id)
+        self.bytes_used += size
+        
+        while self.bytes_used > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+    
+    def key(self, query: str, context: Optional[Dict[str, Any]] = None, token: Hashable = None) -> Tuple[int, Hashable]:
+        """
+        Split a query into its SimHash fingerprint and its exact-match scope
+        
+        Hashing the context is the costly part for a large context, so a
+        caller that looks a request up and then caches its response computes
+        the key once and passes it to both get() and put().
+        
+        Args:
+            query: Raw query text
+            context: Request context
+            token: Caller state token
+        
+        Returns:
+            Tuple of (fingerprint, scope)
+        """
+        tokens = normalize_query(query)
+        numbers = tuple(_NUMBER_RE.findall(query))
+        negations = sum(1 for word in tokens if word in _NEGATIONS or word.endswith("n't"))
+        if isinstance(context, JsonContext):
+            # Hash the serialized form as sent instead of decoding every member
+            serialized = context.text
+        else:
+            serialized = json.dumps(context or {}, sort_keys=True, default=str)
+        context_hash = hashlib.blake2b(serialized.encode(), digest_size=16).digest()
+        return simhash(tokens), (numbers, negations, context_hash, token)
+    
+    @staticmethod
+    def _estimate_size(query: str, response: Dict[str, Any]) -> int:
+        """
+        Estimate a response's memory use from its content and data values without serializing it
+        
+        Args:
+            query: Raw query text
+            response: Response to estimate
+        
+        Returns:
+            Estimated size in bytes
+        """
+        size = RESPONSE_OVERHEAD + len(query) + len(response.get("content") or "")
+        for point in response.get("data") or ():
+            value = point.get("value") if isinstance(point, dict) else None
+            size += DATA_POINT_OVERHEAD + (len(value) if isinstance(value, (str, bytes)) else 0)
+        return size
+    
+    @staticmethod
+    def _detach(response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copy a response's dictionaries and lists, so that changes the caller
+        makes to its response later do not reach the cache
+        
+        Args:
+            response: Response to copy
+        
+        Returns:
+            Copy sharing only the leaf values, which are never changed in place
+        """
+        detached = {}
+        for name, value in response.items():
+            if isinstance(value, dict):
+                value = dict(value)
+            elif isinstance(value, list):
+                value = [dict(item) if isinstance(item, dict) else item for item in value]
+            detached[name] = value
+        return detached
+    
+    def _bucket_keys(self, fingerprint: int, scope: Hashable) -> List[Tuple[Hashable, int, int]]:
+        return [(scope, index, fingerprint >> start & ((1 << width) - 1))
+                for index, (start, width) in enumerate(self._bands)]
+    
+    def _candidates(self, fingerprint: int, scope: Hashable) -> set:
+        """
+        Collect entries sharing at least one band with the fingerprint (caller holds the lock)
+        
+        Args:
+            fingerprint: Query fingerprint
+            scope: Exact-match scope
+        
+        Returns:
+            Set of entry ids
+        """
+        candidates = set()
+        for bucket in self._bucket_keys(fingerprint, scope):
+            candidates.update(self._buckets.get(bucket, ()))
+        return candidates
+    
+    def _remove(self, entry_id: int):
+        """
+        Remove an entry and its bucket references (caller holds the lock)
+        
+        Args:
+            entry_id: Entry to remove
+        """
+        entry = self._entries.pop(entry_id)
+        self.bytes_used -= entry["size"]
+        for bucket in self._bucket_keys(entry["fingerprint"], entry["scope"]):
+            ids = self._buckets.get(bucket)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._buckets[bucket]
\ No newline at end of file
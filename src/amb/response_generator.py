@@ -3,37 +3,95 @@ Response Generator Module for AMB Hallucination Prevention
 Generates validated, hallucination-free responses
 """
 
+import asyncio
+import contextvars
+import functools
+import itertools
 import logging
-from typing import Dict, Any, List, Optional, Tuple
-from datetime import datetime
+from concurrent.futures import Executor
+from typing import Dict, Any, List, Optional, Tuple, Iterator, AsyncIterator, Callable
 import json
+import time
 
+from .check_graph import CheckGraph, CheckNode
+from .clock import request_time, request_timestamp
+from .context_view import DataPointView
 from .data_validator import DataValidator
+from .degradation import CHECK_TIERS
+from .log_pipeline import PER_REQUEST
 from .logic_checker import LogicChecker
+from .metrics import ShardedCounters
+from .model_backend import ModelBackend, DeterministicBackend
+from .response_cache import NearDuplicateCache
+from .retry_policy import RetryPolicy, RetryBudget
+from .streaming import StreamingValidator
+from .text_filters import PhraseFilter, DEFAULT_HALLUCINATION_PHRASES, DEFAULT_UNCERTAIN_PHRASES
+from .tracing import Tracer, NOOP_TRACER
 
 logger = logging.getLogger(__name__)
 
+# Data points screened per validate_data_points call while streaming a context
+DATA_POINT_BATCH = 512
+
 
 class ResponseGenerator:
     """
     Generates responses with built-in hallucination prevention
     """
     
-    def __init__(self, confidence_threshold: float = 0.85):
+    def __init__(self, confidence_threshold: float = 0.85, backend: Optional[ModelBackend] = None,
+                 stream_window_size: int = 512, retry_policy: Optional[RetryPolicy] = None,
+                 hallucination_phrases: Optional[List[str]] = None,
+                 uncertain_phrases: Optional[List[str]] = None,
+                 executor: Optional[Executor] = None,
+                 stage_recorder: Optional[Callable[[str, float], None]] = None,
+                 tracer: Optional[Tracer] = None,
+                 data_validator: Optional[DataValidator] = None,
+                 logic_checker: Optional[LogicChecker] = None,
+                 check_executor: Optional[Executor] = None,
+                 response_cache: Optional[NearDuplicateCache] = None):
         """
         Initialize ResponseGenerator
         
         Args:
             confidence_threshold: Minimum confidence for acceptable responses
+            backend: Model backend used for generation (defaults to DeterministicBackend)
+            stream_window_size: Rolling window size used to validate streamed output
+            retry_policy: Deadline-aware regeneration policy (defaults to RetryPolicy())
+            hallucination_phrases: Phrases removed from every response
+            uncertain_phrases: Phrases removed by strict filtering on regeneration
+            executor: Executor for CPU-bound validation in async paths (defaults to the loop's)
+            stage_recorder: Optional callback receiving (stage, seconds) for generation,
+                validation and logic_check timings
+            tracer: Tracer recording generation and validation spans (disabled by default)
+            data_validator: Shared data validator (a private one is created if omitted)
+            logic_checker: Shared logic checker (a private one is created if omitted)
+            check_executor: Executor running independent checks concurrently (sequential if None)
+            response_cache: Near-duplicate cache of successful responses (no caching if None)
         """
         if not 0 <= confidence_threshold <= 1:
             raise ValueError("Confidence threshold must be between 0 and 1")
         
         self.confidence_threshold = confidence_threshold
-        self.data_validator = DataValidator(confidence_threshold)
-        self.logic_checker = LogicChecker()
-        self.response_cache = {}
-        self.generation_stats = {"total": 0, "successful": 0, "rejected": 0}
+        self.backend = backend or DeterministicBackend()
+        self.stream_window_size = stream_window_size
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.executor = executor
+        self.stage_recorder = stage_recorder
+        self.hallucination_filter = PhraseFilter(
+            DEFAULT_HALLUCINATION_PHRASES if hallucination_phrases is None else hallucination_phrases
+        )
+        self.uncertainty_filter = PhraseFilter(
+            DEFAULT_UNCERTAIN_PHRASES if uncertain_phrases is None else uncertain_phrases
+        )
+        self.tracer = tracer or NOOP_TRACER
+        self.data_validator = data_validator or DataValidator(confidence_threshold, tracer=self.tracer)
+        self.logic_checker = logic_checker or LogicChecker(tracer=self.tracer)
+        self.check_executor = check_executor
+        self.check_graph = self._build_check_graph()
+        self.response_cache = response_cache
+        self._stats = ShardedCounters(["total", "successful", "rejected", "retries", "retries_skipped",
+                                       "cache_hits"])
         logger.info(f"ResponseGenerator initialized with threshold: {confidence_threshold}")
     
     def generate_response(self, request: Dict[str, Any]) -> Dict[str, Any]:
@@ -46,57 +104,454 @@ class ResponseGenerator:
         Returns:
             Response dictionary with content and metadata
         """
-        try:
-            if not request:
-                logger.error("Empty request received")
-                return self._create_error_response("Empty request")
-            
-            query = request.get("query", "")
-            context = request.get("context", {})
-            
-            if not query:
-                logger.warning("No query in request")
-                return self._create_error_response("No query provided")
-            
-            # Generate raw response
-            raw_response = self._generate_raw_response(query, context)
-            
-            # Validate response
-            validation_result = self._validate_response(raw_response)
-            
-            if not validation_result["valid"]:
-                logger.warning(f"Response validation failed: {validation_result['errors']}")
-                self.generation_stats["rejected"] += 1
-                
-                # Attempt regeneration with stricter constraints
-                raw_response = self._regenerate_with_constraints(query, context, validation_result["errors"])
-                validation_result = self._validate_response(raw_response)
-                
+        with self.tracer.span("generate_response") as span:
+            try:
+                if not request:
+                    logger.error("Empty request received")
+                    return self._create_error_response("Empty request")
+            
+                query = request.get("query", "")
+                context = request.get("context", {})
+            
+                if not query:
+                    logger.warning("No query in request")
+                    return self._create_error_response("No query provided")
+            
+                budget = self.retry_policy.start(request.get("deadline"))
+                checks = request.get("checks", CHECK_TIERS["full"])
+                data_validations = request.get("data_validations")
+            
+                cache_key = self._cache_key(query, context, checks)
+                cached = self._cached_response(query, cache_key, checks)
+                if cached is not None:
+                    return cached
+            
+                # Generate and validate raw response
+                attempt_start = time.monotonic()
+                raw_response = self._generate_raw_response(query, context)
+                validation_result = self._validate_response(raw_response, checks, data_validations)
+                budget.record(time.monotonic() - attempt_start)
+            
+                if not validation_result["valid"]:
+                    logger.warning("Response validation failed: %s", validation_result["errors"])
+                    self._stats.add("rejected")
+            
+                # Regenerate with stricter constraints while the deadline allows it
+                while not validation_result["valid"] and budget.can_retry():
+                    self._stats.add("retries")
+                    attempt_start = time.monotonic()
+                    raw_response = self._regenerate_with_constraints(query, context, validation_result["errors"],
+                                                                     budget.attempts)
+                    validation_result = self._validate_response(raw_response, checks, data_validations)
+                    budget.record(time.monotonic() - attempt_start)
+            
+                response = self._complete_response(raw_response, validation_result, budget, checks)
+                self._cache_response(query, cache_key, response)
+                self._annotate_span(span, query, response, budget)
+                return response
+            
+            except Exception as e:
+                logger.error("Response generation error: %s", e)
+                self._stats.add("total")
+                return self._create_error_response(f"Generation error: {str(e)}")
+    
+    async def generate_response_async(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Generate a validated response, awaiting the backend instead of blocking
+        
+        CPU-bound validation and logic checks run on the generator's executor.
+        
+        Args:
+            request: Request dictionary containing query and context
+            
+        Returns:
+            Response dictionary with content and metadata
+        """
+        with self.tracer.span("generate_response") as span:
+            try:
+                if not request:
+                    logger.error("Empty request received")
+                    return self._create_error_response("Empty request")
+            
+                query = request.get("query", "")
+                context = request.get("context", {})
+            
+                if not query:
+                    logger.warning("No query in request")
+                    return self._create_error_response("No query provided")
+            
+                budget = self.retry_policy.start(request.get("deadline"))
+                checks = request.get("checks", CHECK_TIERS["full"])
+                data_validations = request.get("data_validations")
+            
+                cache_key = self._cache_key(query, context, checks)
+                cached = self._cached_response(query, cache_key, checks)
+                if cached is not None:
+                    return cached
+            
+                attempt_start = time.monotonic()
+                raw_response = await self._generate_raw_response_async(query, context)
+                validation_result = await self._run_blocking(self._validate_response, raw_response, checks,
+                                                             data_validations)
+                budget.record(time.monotonic() - attempt_start)
+            
                 if not validation_result["valid"]:
-                    return self._create_error_response("Could not generate valid response", validation_result["errors"])
+                    logger.warning("Response validation failed: %s", validation_result["errors"])
+                    self._stats.add("rejected")
             
-            # Check logic consistency
-            logic_result = self.logic_checker.check_response_logic(raw_response)
+                while not validation_result["valid"] and budget.can_retry():
+                    self._stats.add("retries")
+                    attempt_start = time.monotonic()
+                    constraints = self._build_constraints(validation_result["errors"], budget.attempts)
+                    raw_response = await self._generate_raw_response_async(query, context, constraints)
+                    raw_response["content"] = self._apply_strict_filtering(raw_response.get("content", ""))
+                    validation_result = await self._run_blocking(self._validate_response, raw_response, checks,
+                                                                 data_validations)
+                    budget.record(time.monotonic() - attempt_start)
             
-            if not logic_result["valid"]:
-                logger.warning(f"Logic check failed: {logic_result['errors']}")
-                self.generation_stats["rejected"] += 1
-                return self._create_error_response("Logic inconsistency detected", logic_result["errors"])
+                response = await self._run_blocking(self._complete_response, raw_response, validation_result,
+                                                    budget, checks)
+                self._cache_response(query, cache_key, response)
+                self._annotate_span(span, query, response, budget)
+                return response
+            
+            except Exception as e:
+                logger.error("Response generation error: %s", e)
+                self._stats.add("total")
+                return self._create_error_response(f"Generation error: {str(e)}")
+    
+    def _cache_key(self, query: str, context: Dict[str, Any], checks: Tuple[str, ...]) -> Optional[Tuple[int, Any]]:
+        """
+        Compute the response cache key of a request once for its lookup and its store
+        
+        Args:
+            query: Request query
+            context: Request context
+            checks: Enabled checks
+            
+        Returns:
+            Cache key, or None without a response cache
+        """
+        if self.response_cache is None:
+            return None
+        
+        return self.response_cache.key(query, context, self._cache_token(checks))
+    
+    def _cached_response(self, query: str, cache_key: Optional[Tuple[int, Any]],
+                         checks: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        """
+        Look up a response generated for a near-duplicate query
+        
+        Args:
+            query: Request query
+            cache_key: Request cache key from _cache_key
+            checks: Enabled checks
             
-            # Build final response
-            final_response = self._build_final_response(raw_response, validation_result, logic_result)
+        Returns:
+            Copy of the cached response marked as a cache hit, or None to generate
+        """
+        if cache_key is None:
+            return None
+        
+        hit = self.response_cache.get(query, key=cache_key)
+        if hit is None:
+            return None
+        
+        response, distance = hit
+        
+        # Context memory is not part of the cache token, so the cached answer
+        # must still be consistent with what has been said since
+        values = {"filtered_content": response.get("content", ""), "validated_data": response.get("data", []),
+                  "checks": checks}
+        logic_result = self.check_graph.run(values, ("logic_result",))["logic_result"]
+        if logic_result is not None and not logic_result["valid"]:
+            logger.debug("Cached response no longer consistent: %s", logic_result['errors'])
+            return None
+        
+        response["cache"] = {"hit": True, "distance": distance}
+        self._stats.add("cache_hits")
+        logger.debug("Served near-duplicate response (distance %s)", distance)
+        return response
+    
+    def _cache_response(self, query: str, cache_key: Optional[Tuple[int, Any]], response: Dict[str, Any]):
+        """
+        Cache a successful response for near-duplicate queries
+        
+        Args:
+            query: Request query
+            cache_key: Request cache key from _cache_key
+            response: Generated response
+        """
+        if cache_key is not None and response.get("success"):
+            self.response_cache.put(query, response, key=cache_key)
+    
+    def _cache_token(self, checks: Tuple[str, ...]) -> Tuple[Any, ...]:
+        """
+        Build the token identifying the validation state a cached response was checked under
+        
+        Args:
+            checks: Enabled checks
             
-            self.generation_stats["successful"] += 1
-            self.generation_stats["total"] += 1
+        Returns:
+            Tuple of threshold, fact, rule and source versions and enabled checks
+        """
+        return (self.data_validator.confidence_threshold, self.logic_checker.facts_version,
+                self.logic_checker.rules_version, self.data_validator.source_version, tuple(checks))
+    
+    def generate_response_stream(self, request: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Generate a response as a stream of validated chunks
+        
+        Yields {"event": "chunk", "content": ...} for every validated piece of
+        whitespace-normalized content, then exactly one terminal event:
+        {"event": "complete", "response": ...} with the fully validated response,
+        or {"event": "aborted", "response": ...} when a hard hallucination pattern
+        or contradiction is seen, in which case generation is cancelled.
+        Streamed chunks must be discarded if the final response is unsuccessful.
+        Streaming mode never regenerates.
+        
+        Args:
+            request: Request dictionary containing query and context
             
-            logger.info(f"Response generated successfully with confidence: {final_response['confidence']:.2f}")
+        Returns:
+            Iterator over stream events
+        """
+        error_event = self._check_stream_request(request)
+        if error_event:
+            yield error_event
+            return
+        
+        query = request["query"]
+        context = request.get("context", {})
+        validator = self._create_stream_validator()
+        
+        try:
+            chunks = self.backend.stream(query, context)
+            try:
+                for chunk in chunks:
+                    released = validator.feed(chunk)
+                    if validator.violation:
+                        yield self._abort_stream(validator)
+                        return
+                    if released:
+                        yield {"event": "chunk", "content": released}
+            finally:
+                chunks.close()
             
-            return final_response
+            yield from self._finish_stream(validator, query, context)
             
         except Exception as e:
-            logger.error(f"Response generation error: {str(e)}")
-            self.generation_stats["total"] += 1
-            return self._create_error_response(f"Generation error: {str(e)}")
+            logger.error("Streaming generation error: %s", e)
+            self._stats.add("total")
+            yield {"event": "complete", "response": self._create_error_response(f"Generation error: {str(e)}")}
+    
+    async def generate_response_stream_async(self, request: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate a response as an async stream of validated chunks
+        
+        Emits the same events as generate_response_stream.
+        
+        Args:
+            request: Request dictionary containing query and context
+            
+        Returns:
+            Async iterator over stream events
+        """
+        error_event = self._check_stream_request(request)
+        if error_event:
+            yield error_event
+            return
+        
+        query = request["query"]
+        context = request.get("context", {})
+        validator = self._create_stream_validator()
+        
+        try:
+            chunks = self.backend.astream(query, context)
+            try:
+                async for chunk in chunks:
+                    released = validator.feed(chunk)
+                    if validator.violation:
+                        yield self._abort_stream(validator)
+                        return
+                    if released:
+                        yield {"event": "chunk", "content": released}
+            finally:
+                await chunks.aclose()
+            
+            for event in self._finish_stream(validator, query, context):
+                yield event
+            
+        except Exception as e:
+            logger.error("Streaming generation error: %s", e)
+            self._stats.add("total")
+            yield {"event": "complete", "response": self._create_error_response(f"Generation error: {str(e)}")}
+    
+    def _check_stream_request(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Check a streaming request, returning a terminal event if it is unusable
+        
+        Args:
+            request: Request dictionary
+            
+        Returns:
+            Terminal error event or None
+        """
+        if not request:
+            logger.error("Empty request received")
+            return {"event": "complete", "response": self._create_error_response("Empty request")}
+        
+        if not request.get("query", ""):
+            logger.warning("No query in request")
+            return {"event": "complete", "response": self._create_error_response("No query provided")}
+        
+        return None
+    
+    def _create_stream_validator(self) -> StreamingValidator:
+        """
+        Create a rolling-window validator for one streamed response
+        
+        Returns:
+            StreamingValidator instance
+        """
+        return StreamingValidator(self.data_validator, self.logic_checker, self.stream_window_size)
+    
+    def _abort_stream(self, validator: StreamingValidator) -> Dict[str, Any]:
+        """
+        Build the terminal event for a stream cancelled by a violation
+        
+        Args:
+            validator: Validator holding the violation
+            
+        Returns:
+            Aborted event
+        """
+        self._stats.add("rejected")
+        
+        return {
+            "event": "aborted",
+            "response": self._create_error_response("Hallucination detected during streaming",
+                                                    [validator.violation])
+        }
+    
+    def _finish_stream(self, validator: StreamingValidator, query: str,
+                       context: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Release held-back text and run full validation on the streamed content
+        
+        Args:
+            validator: Validator holding the streamed content
+            query: User query
+            context: Context information
+            
+        Returns:
+            Iterator over the final chunk and complete events
+        """
+        remaining = validator.finish()
+        if remaining:
+            yield {"event": "chunk", "content": remaining}
+        
+        raw_response = self._build_raw_response(query, context, validator.content)
+        validation_result = self._validate_response(raw_response)
+        
+        yield {"event": "complete", "response": self._complete_response(raw_response, validation_result)}
+    
+    def _record_stage(self, stage: str, start: float):
+        """
+        Report a stage duration to the stage recorder, if one is attached
+        
+        Args:
+            stage: Stage name
+            start: Stage start time from time.monotonic()
+        """
+        if self.stage_recorder is not None:
+            self.stage_recorder(stage, time.monotonic() - start)
+    
+    async def _run_blocking(self, func, *args):
+        """
+        Run a CPU-bound step on the executor so the event loop stays responsive
+        
+        Args:
+            func: Callable to run
+            *args: Positional arguments for the callable
+            
+        Returns:
+            Result of the callable
+        """
+        loop = asyncio.get_running_loop()
+        # Carry the caller's context so spans opened on the executor keep their parent
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, functools.partial(context.run, func, *args))
+    
+    def _annotate_span(self, span, query: str, response: Dict[str, Any], budget: RetryBudget):
+        """
+        Attach request size and outcome attributes to a generation span
+        
+        Args:
+            span: Active span (no-op when not sampled)
+            query: Request query
+            response: Final response
+            budget: Retry budget of the request
+        """
+        if not span.sampled:
+            return
+        
+        span.set_attribute("query_length", len(query))
+        span.set_attribute("content_length", len(response.get("content") or ""))
+        span.set_attribute("attempts", budget.attempts)
+        span.set_attribute("success", response.get("success", False))
+        span.set_attribute("confidence", response.get("confidence", 0.0))
+    
+    def _complete_response(self, raw_response: Dict[str, Any], validation_result: Dict[str, Any],
+                           budget: Optional[RetryBudget] = None,
+                           checks: Tuple[str, ...] = CHECK_TIERS["full"]) -> Dict[str, Any]:
+        """
+        Run logic checks on a validated raw response and build the final response
+        
+        Args:
+            raw_response: Raw response after validation
+            validation_result: Result of the last validation pass
+            budget: Attempt tracker for the request, if retries were managed
+            checks: Enabled checks; logic checks only run with "logic_consistency"
+            
+        Returns:
+            Final or error response dictionary
+        """
+        if not validation_result["valid"]:
+            details = list(validation_result["errors"])
+            if budget is not None and budget.skip_reason:
+                if budget.skip_reason.startswith("Retry skipped"):
+                    self._stats.add("retries_skipped")
+                details.append(budget.skip_reason)
+            return self._create_error_response("Could not generate valid response", details)
+        
+        # Check logic consistency (skipped by degraded tiers; confidence then rests on validation alone)
+        start = time.monotonic()
+        values = {"filtered_content": raw_response.get("content", ""), "validated_data": raw_response.get("data", []),
+                  "checks": checks}
+        logic_result = self.check_graph.run(values, ("logic_result",))["logic_result"]
+        
+        if logic_result is None:
+            logic_result = {"valid": True, "errors": [], "warnings": [],
+                            "consistency_score": validation_result.get("confidence", 0)}
+        else:
+            self._record_stage("logic_check", start)
+        
+        if not logic_result["valid"]:
+            logger.warning("Logic check failed: %s", logic_result['errors'])
+            self._stats.add("rejected")
+            return self._create_error_response("Logic inconsistency detected", logic_result["errors"])
+        
+        # Build final response
+        final_response = self._build_final_response(raw_response, validation_result, logic_result, budget)
+        
+        self._stats.add("successful")
+        self._stats.add("total")
+        
+        logger.info("Response generated successfully with confidence: %.2f", final_response["confidence"],
+                    extra=PER_REQUEST)
+        
+        return final_response
     
     def generate_batch_responses(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -117,10 +572,104 @@ class ResponseGenerator:
             response = self.generate_response(request)
             responses.append(response)
         
-        logger.info(f"Batch generation complete: {len(responses)} responses")
+        logger.info("Batch generation complete: %s responses", len(responses))
         
         return responses
     
+    async def generate_batch_responses_async(self, requests: List[Dict[str, Any]], max_concurrency: int = 16,
+                                             item_timeout_ms: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Generate responses for multiple requests concurrently
+        
+        Args:
+            requests: List of request dictionaries
+            max_concurrency: Maximum number of requests generated at once
+            item_timeout_ms: Per-item deadline in milliseconds, measured from when the item starts
+            
+        Returns:
+            List of response dictionaries in input order
+        """
+        if not requests:
+            return []
+        
+        responses = [None] * len(requests)
+        
+        async for index, response in self.iter_batch_responses_as_completed(requests, max_concurrency,
+                                                                           item_timeout_ms):
+            responses[index] = response
+        
+        logger.info("Batch generation complete: %s responses", len(responses))
+        
+        return responses
+    
+    async def iter_batch_responses_as_completed(self, requests: List[Dict[str, Any]], max_concurrency: int = 16,
+                                                item_timeout_ms: Optional[float] = None
+                                                ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Generate responses concurrently, yielding each one as soon as it completes
+        
+        Outstanding items are cancelled if the consumer stops iterating early.
+        
+        Args:
+            requests: List of request dictionaries
+            max_concurrency: Maximum number of requests generated at once
+            item_timeout_ms: Per-item deadline in milliseconds, measured from when the item starts
+            
+        Returns:
+            Async iterator over (input_index, response) pairs in completion order
+        """
+        if max_concurrency <= 0:
+            raise ValueError("Max concurrency must be positive")
+        
+        if not requests:
+            return
+        
+        slots = asyncio.Semaphore(max_concurrency)
+        timeout = item_timeout_ms / 1000 if item_timeout_ms else None
+        tasks = [
+            asyncio.ensure_future(self._generate_batch_item(slots, index, request, timeout))
+            for index, request in enumerate(requests)
+        ]
+        
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _generate_batch_item(self, slots: asyncio.Semaphore, index: int, request: Dict[str, Any],
+                                   timeout: Optional[float]) -> Tuple[int, Dict[str, Any]]:
+        """
+        Generate one batch item under the batch concurrency limit and its deadline
+        
+        Args:
+            slots: Semaphore bounding batch concurrency
+            index: Position of the request in the batch
+            request: Request dictionary
+            timeout: Per-item deadline in seconds, or None
+            
+        Returns:
+            Tuple of (index, response)
+        """
+        async with slots:
+            if timeout is None or not request:
+                return index, await self.generate_response_async(request)
+            
+            deadline = time.monotonic() + timeout
+            if request.get("deadline") is not None:
+                deadline = min(deadline, request["deadline"])
+            
+            try:
+                return index, await asyncio.wait_for(
+                    self.generate_response_async(dict(request, deadline=deadline)),
+                    max(0.0, deadline - time.monotonic())
+                )
+            except asyncio.TimeoutError:
+                logger.warning("Batch item %s exceeded its deadline", index)
+                self._stats.add("total")
+                return index, self._create_error_response("Generation timed out")
+    
     def validate_and_filter(self, content: str, source: str = "") -> Tuple[bool, str, float]:
         """
         Validate and filter content for hallucinations
@@ -140,7 +689,7 @@ class ResponseGenerator:
             is_valid, confidence, error = self.data_validator.validate_data_point(content, source)
             
             if not is_valid:
-                logger.debug(f"Content validation failed: {error}")
+                logger.debug("Content validation failed: %s", error)
                 return False, "", confidence
             
             # Filter hallucination patterns
@@ -154,26 +703,62 @@ class ResponseGenerator:
             return True, filtered_content, confidence
             
         except Exception as e:
-            logger.error(f"Validation and filtering error: {str(e)}")
+            logger.error("Validation and filtering error: %s", e)
             return False, "", 0.0
     
-    def _generate_raw_response(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_raw_response(self, query: str, context: Dict[str, Any],
+                               constraints: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Generate raw response before validation
         
         Args:
             query: User query
             context: Context information
+            constraints: Optional generation constraints passed to the backend
+            
+        Returns:
+            Raw response dictionary
+        """
+        start = time.monotonic()
+        content = self.backend.generate(query, context, constraints)
+        self._record_stage("generation", start)
+        return self._build_raw_response(query, context, content)
+    
+    async def _generate_raw_response_async(self, query: str, context: Dict[str, Any],
+                                           constraints: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Generate raw response before validation without blocking the event loop
+        
+        Args:
+            query: User query
+            context: Context information
+            constraints: Optional generation constraints passed to the backend
+            
+        Returns:
+            Raw response dictionary
+        """
+        start = time.monotonic()
+        content = await self.backend.agenerate(query, context, constraints)
+        self._record_stage("generation", start)
+        return self._build_raw_response(query, context, content)
+    
+    def _build_raw_response(self, query: str, context: Dict[str, Any], content: str) -> Dict[str, Any]:
+        """
+        Wrap backend content in a raw response dictionary
+        
+        Args:
+            query: User query
+            context: Context information
+            content: Content produced by the backend
             
         Returns:
             Raw response dictionary
         """
-        # Simulate response generation (replace with actual model)
         response = {
-            "content": f"Response to: {query}",
+            "content": content,
             "data": [],
             "metadata": {
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": request_timestamp(),
                 "query": query,
                 "context_provided": bool(context)
             }
@@ -185,54 +770,210 @@ class ResponseGenerator:
         
         return response
     
-    def _validate_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+    def _validate_response(self, response: Dict[str, Any],
+                           checks: Tuple[str, ...] = CHECK_TIERS["full"],
+                           data_validations: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Validate response for hallucinations
         
         Args:
             response: Response to validate
+            checks: Enabled checks; data points are only validated with "data_validation"
+            data_validations: Validations of the context's data points from validate_context_data
             
         Returns:
             Validation result dictionary
         """
-        errors = []
-        warnings = []
+        start = time.monotonic()
+        values = self.check_graph.run({"response": response, "checks": checks, "data_validations": data_validations},
+                                      ("content_valid", "validated_data"), self.check_executor)
         
-        # Validate content
+        errors = []
         content = response.get("content", "")
-        if content:
-            is_valid, filtered, confidence = self.validate_and_filter(content, "response_content")
-            
-            if not is_valid:
-                errors.append(f"Content validation failed (confidence: {confidence:.2f})")
-            else:
-                response["content"] = filtered
+        confidence = values["content_confidence"]
         
-        # Validate data points
-        data_points = response.get("data", [])
-        validated_data = []
+        if not values["content_valid"]:
+            errors.append(f"Content validation failed (confidence: {confidence:.2f})")
+        elif content:
+            response["content"] = values["filtered_content"]
         
-        for point in data_points:
-            validation = self.data_validator.validate_data_point(
-                point.get("value"),
-                point.get("source", "")
-            )
-            
-            if validation[0]:  # is_valid
-                validated_data.append(point)
-            else:
-                warnings.append(f"Data point rejected: {validation[2]}")
-        
-        response["data"] = validated_data
+        response["data"] = values["validated_data"]
+        self._record_stage("validation", start)
         
         return {
             "valid": len(errors) == 0,
             "errors": errors,
-            "warnings": warnings,
-            "confidence": confidence if content else 1.0
+            "warnings": values["data_warnings"],
+            "confidence": confidence
         }
     
-    def _regenerate_with_constraints(self, query: str, context: Dict[str, Any], errors: List[str]) -> Dict[str, Any]:
+    def _build_check_graph(self) -> CheckGraph:
+        """
+        Declare the response checks and their dependencies
+        
+        Content and data point validation are independent; the logic check
+        reads their outputs.
+        
+        Returns:
+            Check graph for one response
+        """
+        return CheckGraph([
+            CheckNode("content_validation", self._check_content, ["response"],
+                      ["content_valid", "filtered_content", "content_confidence"]),
+            CheckNode("data_validation", self._check_data_points, ["response", "checks", "data_validations"],
+                      ["validated_data", "data_warnings"]),
+            CheckNode("logic_check", self._check_logic, ["filtered_content", "validated_data", "checks"],
+                      ["logic_result"])
+        ])
+    
+    @staticmethod
+    def checks_performed(checks: Tuple[str, ...]) -> List[str]:
+        """
+        Name the response checks that run for a set of enabled checks
+        
+        Content validation always runs; data point validation and the logic
+        check follow the enabled checks. Pattern detection is a
+        detect_hallucination check and never runs on generated responses.
+        
+        Args:
+            checks: Enabled checks
+            
+        Returns:
+            List of check names in the order they run
+        """
+        return ["content_validation"] + [name for name in ("data_validation", "logic_consistency") if name in checks]
+    
+    def _check_content(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Check node: validate and filter the response content
+        
+        Args:
+            response: Response to validate
+            
+        Returns:
+            Dictionary with content_valid, filtered_content and content_confidence
+        """
+        content = response.get("content", "")
+        
+        if not content:
+            return {"content_valid": True, "filtered_content": content, "content_confidence": 1.0}
+        
+        is_valid, filtered, confidence = self.validate_and_filter(content, "response_content")
+        
+        return {"content_valid": is_valid, "filtered_content": filtered, "content_confidence": confidence}
+    
+    def _check_data_points(self, response: Dict[str, Any], checks: Tuple[str, ...],
+                           data_validations: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Check node: validate the response data points
+        
+        Args:
+            response: Response to validate
+            checks: Enabled checks; data points are only validated with "data_validation"
+            data_validations: Validations of the context's data points from validate_context_data,
+                used while the validation state they were made under is unchanged
+            
+        Returns:
+            Dictionary with validated_data and data_warnings
+        """
+        data_points = iter(response.get("data", []))
+        validated_data = []
+        warnings = []
+        
+        if "data_validation" not in checks:
+            return {"validated_data": list(data_points), "data_warnings": warnings}
+        
+        if data_validations is not None and data_validations["token"] == self._data_validation_token():
+            batches = [(data_points, data_validations["results"])]
+        else:
+            batches = self._validate_data_batches(data_points)
+        
+        for batch, validations in batches:
+            for point, validation in zip(batch, validations):
+                if validation[0]:  # is_valid
+                    validated_data.append(point)
+                else:
+                    warnings.append(f"Data point rejected: {validation[2]}")
+        
+        return {"validated_data": validated_data, "data_warnings": warnings}
+    
+    def _validate_data_batches(self, data_points: Iterator[Any]) -> Iterator[Tuple[List[Any], List[Tuple]]]:
+        """
+        Validate data points in bounded batches so only the accepted ones are ever collected
+        
+        Args:
+            data_points: Data points to validate
+            
+        Returns:
+            Iterator over (points, validations) pairs
+        """
+        while True:
+            batch = list(itertools.islice(data_points, DATA_POINT_BATCH))
+            if not batch:
+                return
+            
+            yield batch, self.data_validator.validate_data_points([(point.value, point.source) for point in batch])
+    
+    def validate_context_data(self, contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Validate the data points of many contexts with one validate_data_points call
+        
+        A micro-batch uses this to screen all of its data points in one
+        combined pattern scan. Each result is passed as a request's
+        "data_validations" and replaces the per-request validation of that
+        context's data points, unless the confidence threshold or source
+        fingerprints have changed since it was made.
+        
+        Args:
+            contexts: Request contexts
+            
+        Returns:
+            Per context, a dictionary with the validation state token and the
+            (is_valid, confidence, error) result of each data point in order
+        """
+        token = self._data_validation_token()
+        points = []
+        bounds = []
+        for context in contexts:
+            start = len(points)
+            points.extend((point.value, point.source) for point in DataPointView(context, 0.0))
+            bounds.append((start, len(points)))
+        
+        validations = self.data_validator.validate_data_points(points)
+        
+        return [{"token": token, "results": validations[start:end]} for start, end in bounds]
+    
+    def _data_validation_token(self) -> Tuple[Any, ...]:
+        """
+        Identify the validator state data point validations depend on
+        
+        Returns:
+            Tuple of confidence threshold and source fingerprint version
+        """
+        return self.data_validator.confidence_threshold, self.data_validator.source_version
+    
+    def _check_logic(self, filtered_content: str, validated_data: List[Dict[str, Any]],
+                     checks: Tuple[str, ...]) -> Dict[str, Any]:
+        """
+        Check node: logic consistency of the validated content and data
+        
+        Args:
+            filtered_content: Content after validation and filtering
+            validated_data: Data points that passed validation
+            checks: Enabled checks; skipped unless "logic_consistency" is enabled
+            
+        Returns:
+            Dictionary with logic_result (None when skipped)
+        """
+        if "logic_consistency" not in checks:
+            return {"logic_result": None}
+        
+        return {"logic_result": self.logic_checker.check_response_logic(
+            {"content": filtered_content, "data": validated_data}
+        )}
+    
+    def _regenerate_with_constraints(self, query: str, context: Dict[str, Any], errors: List[str],
+                                     attempt: int = 1) -> Dict[str, Any]:
         """
         Regenerate response with additional constraints
         
@@ -240,27 +981,39 @@ class ResponseGenerator:
             query: Original query
             context: Context information
             errors: Previous validation errors
+            attempt: Number of attempts already made
             
         Returns:
             Regenerated response
         """
         logger.info("Regenerating response with stricter constraints")
         
-        # Add constraints based on errors
-        constraints = {
-            "avoid_patterns": self._extract_error_patterns(errors),
-            "require_sources": True,
-            "max_length": 500
-        }
-        
         # Generate new response with constraints
-        response = self._generate_raw_response(query, context)
+        response = self._generate_raw_response(query, context, self._build_constraints(errors, attempt))
         
         # Apply additional filtering
         response["content"] = self._apply_strict_filtering(response.get("content", ""))
         
         return response
     
+    def _build_constraints(self, errors: List[str], attempt: int = 1) -> Dict[str, Any]:
+        """
+        Build backend generation constraints from validation errors
+        
+        Args:
+            errors: Previous validation errors
+            attempt: Number of attempts already made
+            
+        Returns:
+            Constraints dictionary
+        """
+        return {
+            "avoid_patterns": self._extract_error_patterns(errors),
+            "require_sources": True,
+            "max_length": 500,
+            "attempt": attempt + 1
+        }
+    
     def _filter_hallucination_patterns(self, content: str) -> str:
         """
         Filter known hallucination patterns from content
@@ -271,50 +1024,20 @@ class ResponseGenerator:
         Returns:
             Filtered content
         """
-        if not content:
-            return ""
-        
-        filtered = content
-        
-        # Remove common hallucination phrases
-        hallucination_phrases = [
-            "As an AI assistant",
-            "I don't have access to",
-            "I cannot provide",
-            "[PLACEHOLDER]",
-            "[INSERT HERE]"
-        ]
-        
-        for phrase in hallucination_phrases:
-            filtered = filtered.replace(phrase, "")
-        
-        # Clean up extra whitespace
-        filtered = " ".join(filtered.split())
-        
-        return filtered
+        # Remove hallucination phrases and collapse whitespace in a single pass
+        return self.hallucination_filter.apply(content)
     
-    def _extract_data_points(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _extract_data_points(self, context: Dict[str, Any]) -> DataPointView:
         """
         Extract data points from context
         
         Args:
-            context: Context dictionary
+            context: Context mapping (a dict or JsonContext)
             
         Returns:
-            List of data point dictionaries
+            Lazy view of the data points; validation keeps the accepted ones
         """
-        data_points = []
-        
-        for key, value in context.items():
-            if value is not None:
-                data_points.append({
-                    "key": key,
-                    "value": value,
-                    "source": "context",
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-        
-        return data_points
+        return DataPointView(context, request_time())
     
     def _extract_error_patterns(self, errors: List[str]) -> List[str]:
         """
@@ -348,28 +1071,13 @@ class ResponseGenerator:
         Returns:
             Strictly filtered content
         """
-        if not content:
-            return ""
-        
         # Remove any uncertain language
-        uncertain_phrases = [
-            "might be",
-            "could be",
-            "possibly",
-            "maybe",
-            "I think",
-            "I believe"
-        ]
-        
-        filtered = content
-        for phrase in uncertain_phrases:
-            filtered = filtered.replace(phrase, "")
-        
-        return filtered.strip()
+        return self.uncertainty_filter.apply(content)
     
     def _build_final_response(self, raw_response: Dict[str, Any], 
                             validation_result: Dict[str, Any],
-                            logic_result: Dict[str, Any]) -> Dict[str, Any]:
+                            logic_result: Dict[str, Any],
+                            budget: Optional[RetryBudget] = None) -> Dict[str, Any]:
         """
         Build final response with metadata
         
@@ -377,6 +1085,7 @@ class ResponseGenerator:
             raw_response: Validated raw response
             validation_result: Validation results
             logic_result: Logic check results
+            budget: Attempt tracker for the request, if retries were managed
             
         Returns:
             Final response dictionary
@@ -386,17 +1095,24 @@ class ResponseGenerator:
             logic_result.get("consistency_score", 0) * 0.5
         )
         
+        # Data points carry the request's timestamp, so it is formatted once for all of them
+        timestamp = request_timestamp()
+        metadata = {
+            "timestamp": timestamp,
+            "validation_warnings": validation_result.get("warnings", []),
+            "logic_warnings": logic_result.get("warnings", []),
+            "generation_attempt": 1
+        }
+        
+        if budget is not None:
+            metadata.update(budget.to_metadata())
+        
         return {
             "success": True,
             "content": raw_response.get("content", ""),
-            "data": raw_response.get("data", []),
+            "data": [point.to_dict(timestamp) for point in raw_response.get("data", [])],
             "confidence": confidence_score,
-            "metadata": {
-                "timestamp": datetime.utcnow().isoformat(),
-                "validation_warnings": validation_result.get("warnings", []),
-                "logic_warnings": logic_result.get("warnings", []),
-                "generation_attempt": 1 if validation_result["valid"] else 2
-            }
+            "metadata": metadata
         }
     
     def _create_error_response(self, error_message: str, details: List[str] = None) -> Dict[str, Any]:
@@ -418,10 +1134,17 @@ class ResponseGenerator:
             "error": error_message,
             "error_details": details or [],
             "metadata": {
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": request_timestamp()
             }
         }
     
+    @property
+    def generation_stats(self) -> Dict[str, int]:
+        """
+        Snapshot of the raw generation counters
+        """
+        return self._stats.snapshot()
+    
     def get_generation_stats(self) -> Dict[str, Any]:
         """
         Get response generation statistics
@@ -429,19 +1152,22 @@ class ResponseGenerator:
         Returns:
             Dictionary with generation statistics
         """
-        total = self.generation_stats["total"]
+        stats = self._stats.snapshot()
+        total = stats["total"]
         
         if total == 0:
             success_rate = 0.0
             rejection_rate = 0.0
         else:
-            success_rate = self.generation_stats["successful"] / total
-            rejection_rate = self.generation_stats["rejected"] / total
+            success_rate = stats["successful"] / total
+            rejection_rate = stats["rejected"] / total
         
         return {
             "total_requests": total,
-            "successful": self.generation_stats["successful"],
-            "rejected": self.generation_stats["rejected"],
+            "successful": stats["successful"],
+            "rejected": stats["rejected"],
+            "retries": stats["retries"],
+            "retries_skipped": stats["retries_skipped"],
             "success_rate": success_rate,
             "rejection_rate": rejection_rate
         }
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+Retry Policy Module for AMB Hallucination Prevention
+Deadline-aware regeneration decisions driven by max_retries
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed generation may be retried within the request deadline
+    
+    The policy keeps an exponentially weighted average of observed attempt
+    durations (generation plus validation) and only allows a regeneration if
+    the predicted attempt time fits in the remaining budget.
+    """
+    
+    def __init__(self, max_retries: int = 2, max_response_time_ms: float = 200, smoothing: float = 0.2):
+        """
+        Initialize RetryPolicy
+        
+        Args:
+            max_retries: Maximum regenerations after the first attempt
+            max_response_time_ms: Default per-request budget in milliseconds
+            smoothing: Weight of the newest observation in the attempt time average (0-1]
+        """
+        if max_retries < 0:
+            raise ValueError("Max retries must be non-negative")
+        
+        if max_response_time_ms <= 0:
+            raise ValueError("Max response time must be positive")
+        
+        if not 0 < smoothing <= 1:
+            raise ValueError("Smoothing must be in (0, 1]")
+        
+        self.max_retries = max_retries
+        self.max_response_time_ms = max_response_time_ms
+        self.smoothing = smoothing
+        self._predicted_attempt_time = None
+        self._lock = threading.Lock()
+    
+    @property
+    def predicted_attempt_time(self) -> float:
+        """
+        Predicted duration of one attempt in seconds (0 until observed)
+        """
+        return self._predicted_attempt_time or 0.0
+    
+    def start(self, deadline: Optional[float] = None) -> "RetryBudget":
+        """
+        Start tracking attempts for one request
+        
+        Args:
+            deadline: Absolute time.monotonic() deadline; derived from max_response_time_ms if omitted
+        
+        Returns:
+            Budget for the request
+        """
+        if deadline is None:
+            deadline = time.monotonic() + self.max_response_time_ms / 1000
+        
+        return RetryBudget(self, deadline)
+    
+    def observe(self, seconds: float):
+        """
+        Record the duration of a completed attempt
+        
+        Args:
+            seconds: Attempt duration in seconds
+        """
+        with self._lock:
+            if self._predicted_attempt_time is None:
+                self._predicted_attempt_time = seconds
+            else:
+                self._predicted_attempt_time += self.smoothing * (seconds - self._predicted_attempt_time)
+
+
+class RetryBudget:
+    """
+    Per-request attempt tracker bound to a deadline
+    """
+    
+    def __init__(self, policy: RetryPolicy, deadline: float):
+        """
+        Initialize RetryBudget
+        
+        Args:
+            policy: Owning retry policy
+            deadline: Absolute time.monotonic() deadline
+        """
+        self.policy = policy
+        self.deadline = deadline
+        self.attempt_times: List[float] = []
+        self.skip_reason: Optional[str] = None
+    
+    @property
+    def attempts(self) -> int:
+        return len(self.attempt_times)
+    
+    def remaining(self) -> float:
+        """
+        Seconds left before the deadline (negative once missed)
+        
+        Returns:
+            Remaining time in seconds
+        """
+        return self.deadline - time.monotonic()
+    
+    def record(self, seconds: float):
+        """
+        Record a finished attempt
+        
+        Args:
+            seconds: Attempt duration in seconds
+        """
+        self.attempt_times.append(seconds)
+        self.policy.observe(seconds)
+    
+    def can_retry(self) -> bool:
+        """
+        Check whether another attempt is allowed
+        
+        Returns:
+            True if retries remain and the predicted attempt fits the deadline
+        """
+        if self.attempts > self.policy.max_retries:
+            self.skip_reason = f"Retry limit reached ({self.policy.max_retries})"
+            return False
+        
+        remaining = self.remaining()
+        predicted = self.policy.predicted_attempt_time
+        
+        if predicted > remaining:
+            self.skip_reason = (f"Retry skipped: predicted {predicted * 1000:.1f}ms "
+                                f"exceeds remaining {max(remaining, 0.0) * 1000:.1f}ms")
+            logger.info(self.skip_reason)
+            return False
+        
+        return True
+    
+    def to_metadata(self) -> Dict[str, Any]:
+        """
+        Export attempt statistics for response metadata
+        
+        Returns:
+            Dictionary with attempt count and per-attempt times
+        """
+        return {
+            "generation_attempt": self.attempts,
+            "attempt_times_ms": [t * 1000 for t in self.attempt_times]
+        }
\ No newline at end of file
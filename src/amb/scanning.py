@@ -0,0 +1,320 @@
+"""
+Scanning Module for AMB Hallucination Prevention
+Linear-time rule scanning of large content in overlapping chunks under a time budget
+"""
+
+import logging
+import re
+import time
+from concurrent.futures import Executor, TimeoutError as FutureTimeout
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .clock import current_clock
+
+logger = logging.getLogger(__name__)
+
+# Content longer than this is scanned in chunks
+CHUNK_SIZE = 1 << 18
+# Characters each chunk extends into the next, so matches on a chunk boundary are found
+CHUNK_OVERLAP = 4096
+
+_INLINE_FLAGS = re.compile(r"^\(\?[aiLmsux]+\)")
+_GAP = re.compile(r"\.\*\??")
+_LITERAL = re.compile(r"(?:[^\\.^$*+?{}\[\]|()]|\\[^A-Za-z0-9])+")
+_ESCAPE = re.compile(r"\\(.)")
+
+
+class ScanBudgetExceeded(TimeoutError):
+    """
+    Raised when scanning content would overrun the request's scan time budget
+    """
+
+
+def _can_overlap(opener: str, closer: str, ignore_case: bool) -> bool:
+    """
+    Whether an opener can start inside the opener-length run just before a closer and overlap it
+    """
+    if ignore_case:
+        opener, closer = opener.lower(), closer.lower()
+    return any(opener[shift:shift + len(closer)] == closer[:len(opener) - shift] for shift in range(1, len(opener)))
+
+
+def _split_pattern(pattern: str) -> Tuple[str, List[Tuple[str, Optional[Tuple[str, str]]]]]:
+    """
+    Split a flat alternation into its alternatives and their "<literal>.*<literal>" gaps
+    
+    Args:
+        pattern: Regular expression, optionally starting with inline flags
+    
+    Returns:
+        Tuple of (inline flags, [(alternative, (opener, closer) or None)]); no
+        alternatives if the pattern has groups or classes, which could hide a "|"
+    """
+    flags = _INLINE_FLAGS.match(pattern)
+    prefix = flags.group(0) if flags else ""
+    body = pattern[len(prefix):]
+    
+    if re.search(r"(?<!\\)[(\[]", body):
+        return prefix, []
+    
+    alternatives = []
+    for alternative in re.split(r"(?<!\\)\|", body):
+        parts = _GAP.split(alternative)
+        gap = tuple(parts) if len(parts) == 2 and all(_LITERAL.fullmatch(part) for part in parts) else None
+        alternatives.append((alternative, gap))
+    
+    return prefix, alternatives
+
+
+def linear_pattern(pattern: str) -> str:
+    """
+    Rewrite "<literal>.*<literal>" alternatives into a form that cannot backtrack
+    
+    "A.*B" retries every occurrence of A up to the end of its line, which
+    is quadratic on a long line full of A. "A(?:(?!A|B)[^\\n])*B" stops at
+    the next A, so each character is visited by one attempt, and it matches
+    exactly when the original does: a line holding A before B always has an
+    A followed by B with no A between them, provided an A cannot overlap
+    the start of a B. Single-character A and B stop at a plain character
+    class. Alternatives of other shapes are left as they are.
+    
+    Args:
+        pattern: Regular expression, optionally starting with inline flags
+    
+    Returns:
+        Equivalent pattern for match detection
+    """
+    prefix, alternatives = _split_pattern(pattern)
+    if not alternatives:
+        return pattern
+    
+    rewritten = []
+    for alternative, gap in alternatives:
+        if gap is not None:
+            opener, closer = gap
+            opener_text, closer_text = _ESCAPE.sub(r"\1", opener), _ESCAPE.sub(r"\1", closer)
+            if len(opener_text) == len(closer_text) == 1:
+                alternative = f"{opener}[^{re.escape(opener_text + closer_text)}\\n]*{closer}"
+            elif not _can_overlap(opener_text, closer_text, "i" in prefix):
+                alternative = f"{opener}(?:(?!{opener}|{closer})[^\\n])*{closer}"
+        rewritten.append(alternative)
+    
+    return prefix + "|".join(rewritten)
+
+
+class ContentScanner:
+    """
+    Finds which of an ordered list of rules match content in linear time
+    
+    Rules are compiled with linear_pattern. Content longer than chunk_size
+    is searched in chunks that extend overlap characters into the next one,
+    in place with the compiled pattern's pos and endpos, and in parallel
+    when an executor is given (the re module holds the GIL, so a thread
+    pool only pays off on a free-threaded build). A gap alternative can
+    span chunks on a long line, so each chunk also reports the openers left
+    open on its last line, and the chunks are then walked in order looking
+    for a closer before the line ends.
+    
+    Scanning is linear in the content, so there is no time limit by
+    default. With a time_budget, all scans made while handling one request
+    share it through the request clock, and a scan that runs out raises
+    ScanBudgetExceeded after at most one more chunk, so callers can report
+    the content as unscanned instead of stalling on it.
+    """
+    
+    def __init__(self, patterns: Iterable[str], chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP,
+                 time_budget: Optional[float] = None, executor: Optional[Executor] = None):
+        """
+        Initialize ContentScanner
+        
+        Args:
+            patterns: Rules in priority order
+            chunk_size: Characters per chunk, excluding the overlap
+            overlap: Characters each chunk extends into the next (longer than any literal in a rule)
+            time_budget: Scan seconds allowed per request (unlimited if None)
+            executor: Executor scanning chunks in parallel (sequential if None)
+        """
+        if overlap < 0 or chunk_size <= overlap:
+            raise ValueError("Chunk size must exceed a non-negative overlap")
+        
+        if time_budget is not None and time_budget <= 0:
+            raise ValueError("Scan time budget must be positive")
+        
+        self.patterns = list(patterns)
+        self.rules = []
+        # Per rule, compiled (opener, closer) of each gap alternative
+        self.gaps = []
+        for pattern in self.patterns:
+            prefix, alternatives = _split_pattern(pattern)
+            self.rules.append(re.compile(linear_pattern(pattern)))
+            self.gaps.append([(re.compile(prefix + gap[0]), re.compile(prefix + gap[1]))
+                              for _, gap in alternatives if gap is not None])
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.time_budget = time_budget
+        self.executor = executor
+    
+    def first_match(self, text: str) -> Optional[int]:
+        """
+        Find the first rule, in priority order, that matches anywhere in the text
+        
+        Args:
+            text: Content to scan
+        
+        Returns:
+            Rule index, or None if no rule matches
+        
+        Raises:
+            ScanBudgetExceeded: If the scan time budget runs out
+        """
+        hits = self._scan(text, first=True)
+        return min(hits) if hits else None
+    
+    def matches(self, text: str) -> List[int]:
+        """
+        Find every rule that matches anywhere in the text
+        
+        Args:
+            text: Content to scan
+        
+        Returns:
+            Sorted rule indices
+        
+        Raises:
+            ScanBudgetExceeded: If the scan time budget runs out
+        """
+        return sorted(self._scan(text, first=False))
+    
+    def chunks(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Split text into overlapping chunk bounds
+        
+        Args:
+            text: Content to scan
+        
+        Returns:
+            List of (start, end) offsets; each chunk runs overlap characters into the next
+        """
+        length = len(text)
+        return [(start, min(start + self.chunk_size + self.overlap, length))
+                for start in range(0, max(length, 1), self.chunk_size)]
+    
+    def _scan(self, text: str, first: bool) -> Set[int]:
+        clock = current_clock()
+        started = time.monotonic()
+        deadline = None
+        if self.time_budget is not None:
+            deadline = started + self.time_budget - (clock.scan_time if clock is not None else 0.0)
+        
+        try:
+            if self.executor is None or len(text) <= self.chunk_size:
+                return self._scan_sequential(text, first, deadline)
+            return self._scan_parallel(text, first, deadline)
+        finally:
+            if clock is not None:
+                clock.scan_time += time.monotonic() - started
+    
+    def _scan_sequential(self, text: str, first: bool, deadline: Optional[float]) -> Set[int]:
+        hits = set()
+        carried = {}
+        
+        for start, end in self.chunks(text):
+            if deadline is not None and time.monotonic() > deadline:
+                raise ScanBudgetExceeded(f"Scan of {len(text)} characters exceeded its time budget")
+            
+            # Once a rule matched, later chunks only matter for rules ahead of it
+            limit = min(hits) if first and hits else len(self.rules)
+            if limit == 0:
+                break
+            
+            found, openers = self._scan_chunk(text, start, end, limit, first)
+            hits.update(found)
+            self._carry(text, end, carried, openers, hits)
+        
+        return hits
+    
+    def _scan_parallel(self, text: str, first: bool, deadline: Optional[float]) -> Set[int]:
+        if deadline is not None and time.monotonic() > deadline:
+            raise ScanBudgetExceeded(f"Scan of {len(text)} characters exceeded its time budget")
+        
+        bounds = self.chunks(text)
+        futures = [self.executor.submit(self._scan_chunk, text, start, end, len(self.rules), first)
+                   for start, end in bounds]
+        hits = set()
+        carried = {}
+        
+        try:
+            for (_, end), future in zip(bounds, futures):
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                found, openers = future.result(timeout=timeout)
+                hits.update(found)
+                self._carry(text, end, carried, openers, hits)
+                if first and 0 in hits:
+                    break
+        except FutureTimeout:
+            raise ScanBudgetExceeded(f"Scan of {len(text)} characters exceeded its time budget") from None
+        finally:
+            for future in futures:
+                future.cancel()
+        
+        return hits
+    
+    def _scan_chunk(self, text: str, start: int, end: int, limit: int,
+                    first: bool) -> Tuple[List[int], Dict[Tuple[int, int], int]]:
+        """
+        Search one chunk for the first limit rules
+        
+        Args:
+            text: Whole content
+            start: Chunk start offset
+            end: Chunk end offset, overlap included
+            limit: Number of leading rules to try
+            first: Stop at the first matching rule
+        
+        Returns:
+            Tuple of (matching rule indices in order, end offset of the first
+            opener after the chunk's last newline per unmatched (rule, gap))
+        """
+        found = []
+        for index in range(limit):
+            if self.rules[index].search(text, start, end):
+                found.append(index)
+                if first:
+                    break
+        
+        newline = text.rfind("\n", start, end)
+        line_start = start if newline == -1 else newline + 1
+        openers = {}
+        for index in range(found[0] if first and found else limit):
+            if index in found:
+                continue
+            for gap, (opener, _) in enumerate(self.gaps[index]):
+                match = opener.search(text, line_start, end)
+                if match:
+                    openers[index, gap] = match.end()
+        
+        return found, openers
+    
+    def _carry(self, text: str, end: int, carried: Dict[Tuple[int, int], int],
+               openers: Dict[Tuple[int, int], int], hits: Set[int]):
+        """
+        Look for closers of openers still open from earlier chunks, in chunk order
+        
+        Args:
+            text: Whole content
+            end: End offset of the chunk just scanned
+            carried: Earliest open opener end per (rule, gap), updated in place
+            openers: Openers the chunk left open on its last line
+            hits: Matched rule indices, updated in place
+        """
+        for key, opener_end in list(carried.items()):
+            newline = text.find("\n", opener_end, end)
+            if self.gaps[key[0]][key[1]][1].search(text, opener_end, end if newline == -1 else newline):
+                hits.add(key[0])
+                del carried[key]
+            elif newline != -1:
+                del carried[key]
+        
+        for key, opener_end in openers.items():
+            if key[0] not in hits:
+                carried.setdefault(key, opener_end)
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""
+Scheduler Module for AMB Hallucination Prevention
+Micro-batching of concurrent requests in front of ModelHandler
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional, Tuple
+
+from .model_handler import ModelHandler
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatchScheduler:
+    """
+    Collects requests over a short window and processes them as one batch
+    
+    Callers submit single requests and get a Future back. A background thread
+    waits for the first request, keeps collecting until max_batch_size
+    requests are pending or max_wait_ms has passed since the first one, then
+    runs the batch through ModelHandler.batch_process and resolves each
+    caller's Future as soon as its own response is ready. Batching amortizes
+    per-call overhead: the batch's queries share one injection scan and the
+    data points of its dict contexts are validated in one call, with one
+    combined hallucination pattern scan. Content checks and logic checks of
+    the generated responses still run per request.
+    """
+    
+    def __init__(self, handler: ModelHandler, max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        """
+        Initialize MicroBatchScheduler
+        
+        Args:
+            handler: Handler that processes the batches
+            max_batch_size: Maximum requests per batch
+            max_wait_ms: Maximum time the first request of a batch waits for others
+        """
+        if max_batch_size <= 0:
+            raise ValueError("Max batch size must be positive")
+        
+        if max_wait_ms < 0:
+            raise ValueError("Max wait must be non-negative")
+        
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.batches = 0
+        self.requests = 0
+        self._queue: "queue.Queue[Optional[Tuple[Dict[str, Any], Future]]]" = queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="amb-micro-batch", daemon=True)
+        self._thread.start()
+        
+        logger.info(f"MicroBatchScheduler started: batch size {max_batch_size}, window {max_wait_ms}ms")
+    
+    def submit(self, request: Dict[str, Any]) -> Future:
+        """
+        Queue a request for the next batch
+        
+        Args:
+            request: Request dictionary
+        
+        Returns:
+            Future resolved with the response dictionary
+        """
+        future = Future()
+        
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("Scheduler is closed")
+            self._queue.put((request, future))
+        
+        return future
+    
+    def process_request(self, request: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Submit a request and wait for its response
+        
+        Args:
+            request: Request dictionary
+            timeout: Maximum seconds to wait (None waits indefinitely)
+        
+        Returns:
+            Response dictionary
+        """
+        return self.submit(request).result(timeout)
+    
+    async def process_request_async(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Submit a request and await its response on the running event loop
+        
+        Args:
+            request: Request dictionary
+        
+        Returns:
+            Response dictionary
+        """
+        return await asyncio.wrap_future(self.submit(request))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get batching statistics
+        
+        Returns:
+            Dictionary with batch count, request count and average batch size
+        """
+        batches = self.batches
+        
+        return {
+            "batches": batches,
+            "requests": self.requests,
+            "average_batch_size": self.requests / batches if batches else 0.0,
+            "pending": self._queue.qsize()
+        }
+    
+    def close(self):
+        """
+        Process the requests already queued and stop the scheduler thread
+        """
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        
+        self._thread.join()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+    
+    def _run(self):
+        stopping = False
+        
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            
+            batch = [item]
+            window_end = time.monotonic() + self.max_wait_ms / 1000
+            
+            while len(batch) < self.max_batch_size:
+                remaining = window_end - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            self._dispatch(batch)
+    
+    def _dispatch(self, batch: List[Tuple[Dict[str, Any], Future]]):
+        """
+        Process a batch and fan the responses out to the waiting callers
+        
+        Args:
+            batch: List of (request, future) pairs
+        """
+        # Drop requests whose callers cancelled while waiting for the window
+        live = [(request, future) for request, future in batch if future.set_running_or_notify_cancel()]
+        
+        if not live:
+            return
+        
+        requests = [request for request, _ in live]
+        futures = [future for _, future in live]
+        
+        self.batches += 1
+        self.requests += len(requests)
+        
+        # Resolve each caller as soon as its own request finishes rather than
+        # holding every caller until the whole batch is done
+        try:
+            self.handler.batch_process(requests, on_result=lambda i, response: futures[i].set_result(response))
+        except Exception as e:
+            logger.error(f"Micro-batch of {len(requests)} requests failed: {str(e)}")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
\ No newline at end of file
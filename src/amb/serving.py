@@ -0,0 +1,534 @@
+"""
+Serving Module for AMB Hallucination Prevention
+Multi-process sharded serving with session affinity and merged metrics
+"""
+
+import asyncio
+import bisect
+import hashlib
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Callable, Iterable, Optional, Tuple
+
+from .metrics import StageLatency
+from .model_backend import ModelBackend
+from .model_handler import ModelHandler
+
+logger = logging.getLogger(__name__)
+
+# Counters summed across workers by get_performance_metrics
+SUMMED_METRICS = ("total_requests", "successful_requests", "failed_requests", "rejected_requests",
+                  "hallucinations_prevented")
+
+# Seconds between worker liveness checks
+LIVENESS_INTERVAL = 0.5
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping keys to worker indexes
+    
+    Each worker owns replicas points on the ring, so keys spread evenly and
+    adding or removing a worker only moves the keys of that worker.
+    """
+    
+    def __init__(self, nodes: Iterable[int], replicas: int = 64):
+        """
+        Initialize HashRing
+        
+        Args:
+            nodes: Worker indexes
+            replicas: Ring points per worker
+        """
+        if replicas <= 0:
+            raise ValueError("Replicas must be positive")
+        
+        points = sorted((self._hash(f"{node}:{replica}"), node) for node in nodes for replica in range(replicas))
+        if not points:
+            raise ValueError("Hash ring needs at least one node")
+        
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+    
+    def node_for(self, key: str) -> int:
+        """
+        Find the worker owning a key
+        
+        Args:
+            key: Routing key
+        
+        Returns:
+            Worker index
+        """
+        index = bisect.bisect(self._hashes, self._hash(key)) % len(self._hashes)
+        return self._nodes[index]
+    
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+def _worker_main(index: int, config: Optional[Dict[str, Any]],
+                 backend_factory: Optional[Callable[[], ModelBackend]],
+                 inbox: "multiprocessing.Queue", outbox: "multiprocessing.Queue"):
+    """
+    Worker process loop: serve messages from the inbox until told to stop
+    
+    Args:
+        index: Worker index
+        config: ModelHandler configuration
+        backend_factory: Callable creating the worker's backend (default backend if None)
+        inbox: Queue of (message_id, kind, payload) messages
+        outbox: Queue receiving (message_id, ok, payload) replies
+    """
+    handler = ModelHandler(config, backend_factory() if backend_factory else None)
+    logger.info(f"Serving worker {index} started (pid {os.getpid()})")
+    
+    try:
+        while True:
+            message_id, kind, payload = inbox.get()
+            
+            if kind == "stop":
+                break
+            
+            try:
+                if kind == "process":
+                    result = handler.process_request(payload)
+                elif kind == "metrics":
+                    result = {"metrics": handler.get_performance_metrics(),
+                              "latency": handler.get_latency_snapshot()}
+                else:
+                    raise ValueError(f"Unknown message kind: {kind}")
+                outbox.put((message_id, True, result))
+            except Exception as e:
+                outbox.put((message_id, False, f"{type(e).__name__}: {e}"))
+    finally:
+        handler.close()
+        logger.info(f"Serving worker {index} stopped")
+
+
+class _WorkerSlot:
+    """
+    A worker position on the ring and the process currently serving it
+    
+    The generation increases with every process spawned for the slot, so
+    requests are tied to the process that accepted them.
+    """
+    
+    def __init__(self, index: int):
+        self.index = index
+        self.process = None
+        self.inbox = None
+        self.generation = 0
+        self.restarts = 0
+        self.stopping = False
+        self.lock = threading.Lock()
+
+
+class ShardedServer:
+    """
+    Runs N worker processes, each with its own ModelHandler, behind a session-affine router
+    
+    Requests carrying a session_id (top level or in metadata) are routed by
+    consistent hash, so a session always reaches the same worker and its
+    LogicChecker context stays local. Requests without one are spread
+    round-robin. Each worker serves its inbox in order, so separate processes
+    give the regex- and string-heavy pipeline one core each.
+    
+    A worker that exits unexpectedly fails its in-flight requests and is
+    respawned. restart_worker replaces a worker gracefully: new requests go to
+    the replacement at once while the old process drains what it already
+    accepted. Session context held by a replaced worker is lost.
+    """
+    
+    def __init__(self, num_workers: Optional[int] = None, config: Optional[Dict[str, Any]] = None,
+                 backend_factory: Optional[Callable[[], ModelBackend]] = None, replicas: int = 64,
+                 start_method: str = "spawn", restart_on_failure: bool = True):
+        """
+        Initialize ShardedServer and start the workers
+        
+        Args:
+            num_workers: Worker processes (defaults to the CPU count)
+            config: ModelHandler configuration for every worker (shared_store_name attaches
+                every worker to one SharedReferenceStore)
+            backend_factory: Picklable callable creating each worker's backend
+            replicas: Hash ring points per worker
+            start_method: multiprocessing start method
+            restart_on_failure: Whether to respawn workers that exit unexpectedly
+        """
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        if num_workers <= 0:
+            raise ValueError("Number of workers must be positive")
+        
+        self.num_workers = num_workers
+        self.config = config
+        self.backend_factory = backend_factory
+        self.restart_on_failure = restart_on_failure
+        self.ring = HashRing(range(num_workers), replicas)
+        self._mp = multiprocessing.get_context(start_method)
+        self._outbox = self._mp.Queue()
+        self._pending: Dict[int, Future] = {}
+        self._pending_workers: Dict[int, Tuple[int, int]] = {}
+        self._pending_lock = threading.Lock()
+        self._message_ids = itertools.count()
+        self._round_robin = itertools.count()
+        self._closed = False
+        
+        self._slots = [_WorkerSlot(index) for index in range(num_workers)]
+        for slot in self._slots:
+            self._spawn(slot)
+        
+        self._collector = threading.Thread(target=self._collect, name="amb-serving-collector", daemon=True)
+        self._collector.start()
+        
+        logger.info(f"ShardedServer started with {num_workers} workers")
+    
+    def worker_for(self, request: Dict[str, Any]) -> int:
+        """
+        Pick the worker for a request
+        
+        Args:
+            request: Request dictionary
+        
+        Returns:
+            Worker index
+        """
+        session_id = self._session_id(request)
+        if session_id is None:
+            return next(self._round_robin) % self.num_workers
+        return self.ring.node_for(session_id)
+    
+    def submit(self, request: Dict[str, Any]) -> Future:
+        """
+        Route a request to its worker
+        
+        Args:
+            request: Request dictionary
+        
+        Returns:
+            Future resolved with the response dictionary
+        """
+        return self._send(self.worker_for(request), "process", request)
+    
+    def process_request(self, request: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Process a request on its worker and wait for the response
+        
+        Args:
+            request: Request dictionary
+            timeout: Maximum seconds to wait (None waits indefinitely)
+        
+        Returns:
+            Response dictionary
+        """
+        return self.submit(request).result(timeout)
+    
+    async def process_request_async(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process a request on its worker and await the response
+        
+        Args:
+            request: Request dictionary
+        
+        Returns:
+            Response dictionary
+        """
+        return await asyncio.wrap_future(self.submit(request))
+    
+    def restart_worker(self, index: int, timeout: Optional[float] = None):
+        """
+        Replace a worker gracefully
+        
+        The replacement starts receiving requests immediately; the old process
+        finishes the requests already queued to it and then exits. If it has
+        to be terminated after the timeout, its unfinished requests fail.
+        
+        Args:
+            index: Worker index
+            timeout: Maximum seconds to wait for the old process to drain
+        """
+        slot = self._slots[index]
+        
+        with slot.lock:
+            old_process, old_inbox, old_generation = slot.process, slot.inbox, slot.generation
+            self._spawn(slot)
+            slot.restarts += 1
+            old_inbox.put((None, "stop", None))
+        
+        old_process.join(timeout)
+        if old_process.is_alive():
+            logger.warning(f"Worker {index} did not drain within {timeout}s; terminating")
+            old_process.terminate()
+            old_process.join()
+            self._fail_pending((index, old_generation), f"Worker {index} terminated before draining")
+        
+        logger.info(f"Worker {index} restarted (pid {slot.process.pid})")
+    
+    def get_performance_metrics(self, timeout: Optional[float] = 10.0) -> Dict[str, Any]:
+        """
+        Collect and merge performance metrics from every worker
+        
+        Counters are summed and latency percentiles come from merged
+        histogram snapshots, so they are exact across workers.
+        
+        Args:
+            timeout: Maximum seconds to wait for each worker
+        
+        Returns:
+            Merged metrics dictionary with a per-worker breakdown
+        """
+        futures = [self._send(slot.index, "metrics", None) for slot in self._slots]
+        reports = [future.result(timeout) for future in futures]
+        
+        totals = {name: sum(report["metrics"][name] for report in reports) for name in SUMMED_METRICS}
+        latency = StageLatency()
+        for report in reports:
+            latency.merge(report["latency"])
+        
+        total = totals["total_requests"]
+        total_ms = sum(report["metrics"]["average_response_time_ms"] * report["metrics"]["total_requests"]
+                       for report in reports)
+        
+        return {
+            **totals,
+            "average_response_time_ms": total_ms / total if total else 0.0,
+            "success_rate": totals["successful_requests"] / total if total else 0.0,
+            "hallucination_prevention_rate": totals["hallucinations_prevented"] / total if total else 0.0,
+            "latency": latency.summary(),
+            "workers": [
+                {
+                    "index": slot.index,
+                    "pid": slot.process.pid,
+                    "restarts": slot.restarts,
+                    "total_requests": report["metrics"]["total_requests"]
+                }
+                for slot, report in zip(self._slots, reports)
+            ]
+        }
+    
+    def close(self, timeout: Optional[float] = None):
+        """
+        Drain every worker and stop the server
+        
+        Args:
+            timeout: Maximum seconds to wait for each worker
+        """
+        if self._closed:
+            return
+        self._closed = True
+        
+        for slot in self._slots:
+            with slot.lock:
+                slot.stopping = True
+                slot.inbox.put((None, "stop", None))
+        
+        for slot in self._slots:
+            slot.process.join(timeout)
+            if slot.process.is_alive():
+                slot.process.terminate()
+                slot.process.join()
+        
+        # Workers flush their replies before exiting, so the sentinel arrives last
+        self._outbox.put(None)
+        self._collector.join()
+        self._fail_pending(None, "Server closed")
+        
+        logger.info("ShardedServer stopped")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+    
+    @staticmethod
+    def _session_id(request: Dict[str, Any]) -> Optional[str]:
+        session_id = request.get("session_id") or (request.get("metadata") or {}).get("session_id")
+        return None if session_id is None else str(session_id)
+    
+    def _spawn(self, slot: _WorkerSlot):
+        """
+        Start a process for a slot (caller holds the slot lock or owns the slot)
+        
+        Args:
+            slot: Worker slot
+        """
+        slot.generation += 1
+        slot.inbox = self._mp.Queue()
+        slot.process = self._mp.Process(
+            target=_worker_main,
+            args=(slot.index, self.config, self.backend_factory, slot.inbox, self._outbox),
+            name=f"amb-worker-{slot.index}",
+            daemon=True
+        )
+        slot.process.start()
+    
+    def _send(self, index: int, kind: str, payload: Any) -> Future:
+        """
+        Send a message to a worker
+        
+        Args:
+            index: Worker index
+            kind: Message kind
+            payload: Message payload
+        
+        Returns:
+            Future resolved with the worker's reply
+        """
+        if self._closed:
+            raise RuntimeError("Server is closed")
+        
+        future = Future()
+        message_id = next(self._message_ids)
+        
+        slot = self._slots[index]
+        with slot.lock:
+            with self._pending_lock:
+                self._pending[message_id] = future
+                self._pending_workers[message_id] = (index, slot.generation)
+            slot.inbox.put((message_id, kind, payload))
+        
+        return future
+    
+    def _collect(self):
+        """
+        Resolve replies from every worker and respawn workers that died
+        
+        Liveness is checked on a fixed schedule, so a dead worker is noticed
+        even while other workers keep the outbox busy.
+        """
+        next_check = time.monotonic() + LIVENESS_INTERVAL
+        
+        while True:
+            if time.monotonic() >= next_check:
+                self._check_workers()
+                next_check = time.monotonic() + LIVENESS_INTERVAL
+            
+            try:
+                item = self._outbox.get(timeout=max(0.0, next_check - time.monotonic()))
+            except queue.Empty:
+                continue
+            
+            if item is None:
+                return
+            
+            message_id, ok, payload = item
+            with self._pending_lock:
+                future = self._pending.pop(message_id, None)
+                self._pending_workers.pop(message_id, None)
+            
+            if future is None:
+                continue
+            if ok:
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(payload))
+    
+    def _check_workers(self):
+        """
+        Fail the requests of workers that exited unexpectedly and respawn them
+        """
+        for slot in self._slots:
+            with slot.lock:
+                if slot.stopping or slot.process.is_alive():
+                    continue
+                
+                logger.error(f"Worker {slot.index} exited with code {slot.process.exitcode}")
+                self._fail_pending((slot.index, slot.generation), f"Worker {slot.index} exited")
+                
+                if self.restart_on_failure:
+                    self._spawn(slot)
+                    slot.restarts += 1
+                else:
+                    slot.stopping = True
+    
+    def _fail_pending(self, worker: Optional[Tuple[int, int]], message: str):
+        """
+        Fail pending requests
+        
+        Args:
+            worker: (index, generation) of the process whose requests fail (all if None)
+            message: Error message
+        """
+        with self._pending_lock:
+            failed = [message_id for message_id, owner in self._pending_workers.items()
+                      if worker is None or owner == worker]
+            futures = [self._pending.pop(message_id) for message_id in failed]
+            for message_id in failed:
+                del self._pending_workers[message_id]
+        
+        for future in futures:
+            future.set_exception(RuntimeError(message))
+
+
+def serve_http(server: ShardedServer, host: str = "127.0.0.1", port: int = 8080) -> ThreadingHTTPServer:
+    """
+    Create an HTTP front end for a ShardedServer
+    
+    POST /process takes a JSON object request and returns the JSON response
+    (400 for a malformed request, 502 when the worker fails it, 500 for any
+    other error); GET /metrics returns merged metrics. Call serve_forever()
+    on the result.
+    
+    Args:
+        server: Sharded server handling the requests
+        host: Bind address
+        port: Bind port (0 picks a free port)
+    
+    Returns:
+        HTTP server, not yet serving
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/process":
+                self._reply(404, {"error": "Not found"})
+                return
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            except ValueError as e:
+                self._reply(400, {"error": f"Invalid JSON: {e}"})
+                return
+            if not isinstance(request, dict):
+                self._reply(400, {"error": "Request must be a JSON object"})
+                return
+            try:
+                response = server.process_request(request)
+            except RuntimeError as e:
+                self._reply(502, {"error": str(e)})
+                return
+            except Exception as e:
+                logger.error(f"HTTP request failed: {str(e)}")
+                self._reply(500, {"error": "Internal server error"})
+                return
+            self._reply(200, response)
+        
+        def do_GET(self):
+            if self.path == "/metrics":
+                self._reply(200, server.get_performance_metrics())
+            elif self.path == "/health":
+                self._reply(200, {"status": "ok", "workers": server.num_workers})
+            else:
+                self._reply(404, {"error": "Not found"})
+        
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+        
+        def _reply(self, status: int, body: Dict[str, Any]):
+            data = json.dumps(body, default=str).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+    
+    return ThreadingHTTPServer((host, port), Handler)
\ No newline at end of file
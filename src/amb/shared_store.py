@@ -0,0 +1,357 @@
+"""
+Shared Store Module for AMB Hallucination Prevention
+Read-mostly shared-memory tables of reference facts and source fingerprints
+"""
+
+import hashlib
+import json
+import logging
+import struct
+import sys
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Any, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"AMBS"
+FORMAT_VERSION = 1
+
+# magic, format, seq, version, fact count, fingerprint count, blob length
+_HEADER = struct.Struct("<4sIQQQQQ")
+_SEQ_OFFSET = 8
+_DATA_OFFSET = 64
+
+# key digest, key offset, key length, value offset, value length (offsets into the blob)
+_FACT = struct.Struct("<16sIIII")
+# source digest, content digest
+_FINGERPRINT = struct.Struct("<16s16s")
+
+# Seconds a read keeps retrying before it treats the writer as stalled
+READ_TIMEOUT = 1.0
+
+# Serializes the resource tracker patch in _open_untracked
+_TRACKER_LOCK = threading.Lock()
+
+
+def _digest(key: str) -> bytes:
+    return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+
+def _open_untracked(name: str) -> shared_memory.SharedMemory:
+    """
+    Open an existing block without registering it with the resource tracker
+    
+    A registered block is unlinked when the registering process exits, and
+    unregistering it afterwards would also drop the writer's entry when both
+    share a tracker. Python 3.13 can skip registration; older versions
+    briefly replace the register call instead.
+    
+    Args:
+        name: Shared memory name
+    
+    Returns:
+        Attached shared memory block
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    
+    with _TRACKER_LOCK:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedReferenceStore:
+    """
+    Versioned fact and source-fingerprint tables in one shared memory block
+    
+    One writer process creates the block and publishes complete snapshots;
+    any number of processes attach by name and read in place. Both tables
+    are sorted by a 16-byte key digest, so lookups binary-search the shared
+    buffer without copying it. Writes follow a seqlock: the sequence number
+    is odd while a snapshot is being written, and readers retry if it was
+    odd or changed while they read, for at most read_timeout seconds. Every
+    publish bumps the version, which callers fold into their cache
+    invalidation tokens.
+    """
+    
+    def __init__(self, memory: shared_memory.SharedMemory, owner: bool):
+        """
+        Initialize SharedReferenceStore (use create() or attach())
+        
+        Args:
+            memory: Shared memory block
+            owner: Whether this process is the writer
+        """
+        self._memory = memory
+        self._buf = memory.buf
+        self.owner = owner
+        self.read_timeout = READ_TIMEOUT
+        # (version, decoded fact pairs), refreshed when a new snapshot is published
+        self._facts_cache: Optional[Tuple[int, Tuple[Tuple[str, Any], ...]]] = None
+    
+    @classmethod
+    def create(cls, size: int = 1 << 20, name: Optional[str] = None) -> "SharedReferenceStore":
+        """
+        Create an empty store as its writer
+        
+        Args:
+            size: Block size in bytes
+            name: Shared memory name (generated if None)
+        
+        Returns:
+            Writer store
+        """
+        if size <= _DATA_OFFSET:
+            raise ValueError(f"Shared store size must exceed {_DATA_OFFSET} bytes")
+        
+        memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _HEADER.pack_into(memory.buf, 0, MAGIC, FORMAT_VERSION, 0, 0, 0, 0, 0)
+        logger.info(f"Shared reference store {memory.name} created ({size} bytes)")
+        return cls(memory, owner=True)
+    
+    @classmethod
+    def attach(cls, name: str) -> "SharedReferenceStore":
+        """
+        Attach to an existing store as a reader
+        
+        Args:
+            name: Shared memory name
+        
+        Returns:
+            Reader store
+        """
+        # Readers must not unlink the block when they exit; only the writer owns it
+        memory = _open_untracked(name)
+        
+        magic, fmt = _HEADER.unpack_from(memory.buf, 0)[:2]
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            memory.close()
+            raise ValueError(f"{name} is not a version {FORMAT_VERSION} AMB shared store")
+        
+        return cls(memory, owner=False)
+    
+    @property
+    def name(self) -> str:
+        """
+        Shared memory name to attach with
+        """
+        return self._memory.name
+    
+    @property
+    def version(self) -> int:
+        """
+        Number of snapshots published so far
+        """
+        return self._read(lambda header: header[3])
+    
+    def publish(self, facts: Dict[str, Any], source_fingerprints: Dict[str, str]):
+        """
+        Replace both tables with a new snapshot
+        
+        Args:
+            facts: Fact key to JSON-serializable value
+            source_fingerprints: Source reference to MD5 hex digest of its content
+        """
+        if not self.owner:
+            raise RuntimeError("Only the creating process may publish to the shared store")
+        
+        blob = bytearray()
+        fact_rows = []
+        for key, value in facts.items():
+            key_bytes = key.encode()
+            value_bytes = json.dumps(value).encode()
+            fact_rows.append((_digest(key), len(blob), len(key_bytes), len(blob) + len(key_bytes), len(value_bytes)))
+            blob += key_bytes + value_bytes
+        fact_rows.sort()
+        
+        fingerprint_rows = sorted((_digest(source), bytes.fromhex(digest))
+                                  for source, digest in source_fingerprints.items())
+        
+        payload = b"".join([
+            *(_FACT.pack(*row) for row in fact_rows),
+            *(_FINGERPRINT.pack(*row) for row in fingerprint_rows),
+            bytes(blob)
+        ])
+        if _DATA_OFFSET + len(payload) > len(self._buf):
+            raise ValueError(f"Snapshot of {len(payload)} bytes does not fit the shared store")
+        
+        _, _, seq, version = _HEADER.unpack_from(self._buf, 0)[:4]
+        struct.pack_into("<Q", self._buf, _SEQ_OFFSET, seq + 1)
+        self._buf[_DATA_OFFSET:_DATA_OFFSET + len(payload)] = payload
+        _HEADER.pack_into(self._buf, 0, MAGIC, FORMAT_VERSION, seq + 1, version + 1,
+                          len(fact_rows), len(fingerprint_rows), len(blob))
+        struct.pack_into("<Q", self._buf, _SEQ_OFFSET, seq + 2)
+        
+        logger.info(f"Shared store version {version + 1}: {len(fact_rows)} facts, "
+                    f"{len(fingerprint_rows)} source fingerprints")
+    
+    def get_fact(self, key: str) -> Optional[Any]:
+        """
+        Look up a fact
+        
+        Args:
+            key: Fact key
+        
+        Returns:
+            Fact value, or None if absent
+        """
+        digest = _digest(key)
+        
+        def lookup(header: Tuple) -> Optional[Any]:
+            index = self._search(_DATA_OFFSET, _FACT.size, header[4], digest)
+            if index is None:
+                return None
+            _, _, _, value_offset, value_length = _FACT.unpack_from(self._buf, _DATA_OFFSET + index * _FACT.size)
+            start = self._blob_offset(header) + value_offset
+            return json.loads(bytes(self._buf[start:start + value_length]))
+        
+        return self._read(lookup)
+    
+    def facts(self) -> Tuple[Tuple[str, Any], ...]:
+        """
+        Get every fact, decoded once per published version
+        
+        Returns:
+            Tuple of (key, value) pairs, shared between calls and not to be modified
+        """
+        cached = self._facts_cache
+        
+        def decode(header: Tuple) -> Tuple[int, Tuple[Tuple[str, Any], ...]]:
+            if cached is not None and cached[0] == header[3]:
+                return cached
+            blob = self._blob_offset(header)
+            pairs = []
+            for _, key_offset, key_length, value_offset, value_length in _FACT.iter_unpack(
+                    self._buf[_DATA_OFFSET:_DATA_OFFSET + header[4] * _FACT.size]):
+                key = bytes(self._buf[blob + key_offset:blob + key_offset + key_length]).decode()
+                value = json.loads(bytes(self._buf[blob + value_offset:blob + value_offset + value_length]))
+                pairs.append((key, value))
+            return header[3], tuple(pairs)
+        
+        self._facts_cache = self._read(decode)
+        return self._facts_cache[1]
+    
+    def source_fingerprint(self, source: str) -> Optional[str]:
+        """
+        Look up the published content digest of a source
+        
+        Args:
+            source: Source reference
+        
+        Returns:
+            MD5 hex digest, or None if the source is not published
+        """
+        digest = _digest(source)
+        
+        def lookup(header: Tuple) -> Optional[str]:
+            table = _DATA_OFFSET + header[4] * _FACT.size
+            index = self._search(table, _FINGERPRINT.size, header[5], digest)
+            if index is None:
+                return None
+            return _FINGERPRINT.unpack_from(self._buf, table + index * _FINGERPRINT.size)[1].hex()
+        
+        return self._read(lookup)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics
+        
+        Returns:
+            Dictionary with name, version, table sizes and bytes used
+        """
+        def stats(header: Tuple) -> Dict[str, Any]:
+            return {
+                "name": self.name,
+                "version": header[3],
+                "facts": header[4],
+                "source_fingerprints": header[5],
+                "bytes_used": self._blob_offset(header) + header[6],
+                "size": len(self._buf)
+            }
+        
+        return self._read(stats)
+    
+    def close(self):
+        """
+        Detach from the shared memory block
+        """
+        self._buf = None
+        self._memory.close()
+    
+    def unlink(self):
+        """
+        Destroy the shared memory block (writer only, after readers detach)
+        """
+        if not self.owner:
+            raise RuntimeError("Only the creating process may unlink the shared store")
+        self._memory.unlink()
+    
+    def _read(self, reader: Callable[[Tuple], Any]) -> Any:
+        """
+        Run a read against a consistent snapshot, retrying around concurrent publishes
+        
+        Args:
+            reader: Callable taking the unpacked header
+        
+        Returns:
+            The reader's result
+        """
+        deadline = time.monotonic() + self.read_timeout
+        
+        while True:
+            header = _HEADER.unpack_from(self._buf, 0)
+            seq = header[2]
+            if seq % 2:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Shared store {self.name} writer stalled mid-publish")
+                time.sleep(0)
+                continue
+            
+            try:
+                result = reader(header)
+            except (ValueError, UnicodeDecodeError, struct.error):
+                # Torn read; the sequence check below decides whether it was real
+                result = None
+                if struct.unpack_from("<Q", self._buf, _SEQ_OFFSET)[0] == seq:
+                    raise
+            
+            if struct.unpack_from("<Q", self._buf, _SEQ_OFFSET)[0] == seq:
+                return result
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Shared store {self.name} kept changing during a read")
+    
+    def _search(self, table: int, record_size: int, count: int, digest: bytes) -> Optional[int]:
+        """
+        Binary-search a table sorted by its leading 16-byte digest
+        
+        Args:
+            table: Table offset in the buffer
+            record_size: Record size in bytes
+            count: Number of records
+            digest: Digest to find
+        
+        Returns:
+            Record index, or None if absent
+        """
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            start = table + middle * record_size
+            key = bytes(self._buf[start:start + 16])
+            if key < digest:
+                low = middle + 1
+            elif key > digest:
+                high = middle
+            else:
+                return middle
+        return None
+    
+    @staticmethod
+    def _blob_offset(header: Tuple) -> int:
+        return _DATA_OFFSET + header[4] * _FACT.size + header[5] * _FINGERPRINT.size
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""
+Snapshot Module for AMB Hallucination Prevention
+Versioned snapshot files with lazily decoded sections
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"AMBSNAP\0"
+SNAPSHOT_VERSION = 1
+
+# magic, format version, section count
+_HEADER = struct.Struct("<8sII")
+# name, offset, length, crc32 of the stored bytes
+_SECTION = struct.Struct("<16sQQI")
+
+
+def write_snapshot(path: str, sections: Dict[str, Any]):
+    """
+    Write a snapshot file atomically
+    
+    Each section is stored as zlib-compressed JSON behind a section table,
+    so a reader can locate and decode one section without touching the rest.
+    
+    Args:
+        path: Destination path
+        sections: Section name (at most 16 bytes) to JSON-serializable state
+    """
+    payloads = []
+    for name, state in sections.items():
+        if len(name.encode()) > 16:
+            raise ValueError(f"Section name too long: {name}")
+        payloads.append((name, zlib.compress(json.dumps(state, separators=(",", ":"), default=str).encode())))
+    
+    offset = _HEADER.size + _SECTION.size * len(payloads)
+    table = []
+    for name, payload in payloads:
+        table.append(_SECTION.pack(name.encode(), offset, len(payload), zlib.crc32(payload)))
+        offset += len(payload)
+    
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, SNAPSHOT_VERSION, len(payloads)))
+        f.writelines(table)
+        f.writelines(payload for _, payload in payloads)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    
+    logger.info(f"Snapshot written to {path}: {', '.join(sections)} ({offset} bytes)")
+
+
+class SnapshotReader:
+    """
+    Memory-maps a snapshot file and decodes sections on demand
+    
+    Opening a snapshot only reads the header and section table. Each
+    section is decompressed, checksummed and parsed the first time it is
+    loaded; the mapping only saves reading sections that are never used,
+    since decoding copies the section into Python objects. The mapping is
+    released once every section has been loaded or skipped, or close() is
+    called.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Initialize SnapshotReader
+        
+        Args:
+            path: Snapshot file path
+        """
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        try:
+            magic, version, count = _HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not an AMB snapshot")
+            if version != SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported snapshot version {version} (expected {SNAPSHOT_VERSION})")
+            
+            self._table = {}
+            for index in range(count):
+                name, offset, length, crc = _SECTION.unpack_from(self._map, _HEADER.size + index * _SECTION.size)
+                self._table[name.rstrip(b"\0").decode()] = (offset, length, crc)
+        except Exception:
+            self._map.close()
+            raise
+        
+        self.path = path
+        self._unloaded = set(self._table)
+        self._lock = threading.Lock()
+    
+    @property
+    def sections(self) -> List[str]:
+        """
+        Names of the sections in the snapshot
+        """
+        return list(self._table)
+    
+    def load(self, name: str) -> Any:
+        """
+        Decode one section
+        
+        Args:
+            name: Section name
+        
+        Returns:
+            The section's state
+        """
+        with self._lock:
+            if self._map is None:
+                raise ValueError(f"Snapshot {self.path} is closed")
+            
+            offset, length, crc = self._table[name]
+            payload = self._map[offset:offset + length]
+            if zlib.crc32(payload) != crc:
+                raise ValueError(f"Snapshot section {name} is corrupt")
+            
+            self._unloaded.discard(name)
+            if not self._unloaded:
+                self._close()
+        
+        logger.debug(f"Snapshot section {name} loaded ({length} bytes)")
+        return json.loads(zlib.decompress(payload))
+    
+    def skip(self, name: str):
+        """
+        Mark a section as not needed without decoding it
+        
+        Args:
+            name: Section name
+        """
+        with self._lock:
+            self._unloaded.discard(name)
+            if not self._unloaded:
+                self._close()
+    
+    def close(self):
+        """
+        Release the mapping
+        """
+        with self._lock:
+            self._close()
+    
+    def _close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""
+Streaming Module for AMB Hallucination Prevention
+Incremental validation of streamed model output with early abort
+"""
+
+import logging
+from typing import List, Optional
+
+from .data_validator import DataValidator
+from .logic_checker import LogicChecker
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingValidator:
+    """
+    Validates streamed content on a rolling window and releases checked text
+    
+    Incoming chunks are whitespace-normalized the same way the final filter
+    normalizes content. Each chunk is scanned together with the trailing
+    window of already-seen text, so patterns spanning chunk boundaries are
+    caught. Only substring-based checks run on the window, which means a
+    violation found here is guaranteed to fail full validation as well.
+    """
+    
+    def __init__(self, data_validator: DataValidator, logic_checker: LogicChecker,
+                 window_size: int = 512, holdback: int = 32):
+        """
+        Initialize StreamingValidator
+        
+        Args:
+            data_validator: Validator providing hard hallucination patterns
+            logic_checker: Checker providing fragment consistency checks
+            window_size: Characters of previous text rescanned with each chunk
+            holdback: Characters kept back from release until more text arrives
+        """
+        if window_size <= 0:
+            raise ValueError("Window size must be positive")
+        
+        if holdback < 0:
+            raise ValueError("Holdback must be non-negative")
+        
+        self.data_validator = data_validator
+        self.logic_checker = logic_checker
+        self.window_size = window_size
+        self.holdback = holdback
+        self.violation: Optional[str] = None
+        self._raw_parts: List[str] = []
+        self._window = ""
+        self._pending = ""
+        self._pending_space = False
+        self._started = False
+    
+    @property
+    def content(self) -> str:
+        """
+        Full raw content received so far
+        """
+        return "".join(self._raw_parts)
+    
+    def feed(self, chunk: str) -> str:
+        """
+        Validate a chunk and return the text that is safe to release
+        
+        Args:
+            chunk: Raw chunk from the backend
+        
+        Returns:
+            Released text (empty once a violation has been found)
+        """
+        if self.violation or not chunk:
+            return ""
+        
+        self._raw_parts.append(chunk)
+        normalized = self._normalize(chunk)
+        
+        if not normalized:
+            return ""
+        
+        scan_text = self._window + normalized
+        self.violation = self._find_violation(scan_text)
+        
+        if self.violation:
+            logger.warning(f"Streaming violation detected: {self.violation}")
+            return ""
+        
+        self._window = scan_text[-self.window_size:]
+        self._pending += normalized
+        
+        if len(self._pending) <= self.holdback:
+            return ""
+        
+        cut = len(self._pending) - self.holdback
+        released, self._pending = self._pending[:cut], self._pending[cut:]
+        return released
+    
+    def finish(self) -> str:
+        """
+        Release any held-back text once the stream has ended
+        
+        Returns:
+            Remaining text (empty if a violation was found)
+        """
+        if self.violation:
+            return ""
+        
+        released, self._pending = self._pending, ""
+        return released
+    
+    def _normalize(self, chunk: str) -> str:
+        """
+        Collapse whitespace incrementally, matching " ".join(content.split())
+        
+        Args:
+            chunk: Raw chunk
+        
+        Returns:
+            Normalized text to append to the stream
+        """
+        words = chunk.split()
+        
+        if not words:
+            self._pending_space = self._started
+            return ""
+        
+        prefix = " " if self._started and (self._pending_space or chunk[0].isspace()) else ""
+        self._started = True
+        self._pending_space = chunk[-1].isspace()
+        
+        return prefix + " ".join(words)
+    
+    def _find_violation(self, text: str) -> Optional[str]:
+        """
+        Run hard pattern and fragment consistency checks on a window
+        
+        Args:
+            text: Window text
+        
+        Returns:
+            Violation description or None
+        """
+        patterns = self.data_validator.detect_hard_patterns(text)
+        if patterns:
+            return f"Hallucination pattern detected: {patterns[0]}"
+        
+        contradictions = self.logic_checker.check_fragment(text)
+        if contradictions:
+            return contradictions[0]
+        
+        return None
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+Text Filters Module for AMB Hallucination Prevention
+Compiled single-pass phrase removal with whitespace normalization
+"""
+
+import logging
+import re
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# Phrases removed from generated content by default
+DEFAULT_HALLUCINATION_PHRASES = [
+    "As an AI assistant",
+    "I don't have access to",
+    "I cannot provide",
+    "[PLACEHOLDER]",
+    "[INSERT HERE]"
+]
+
+# Uncertain language removed by strict filtering by default
+DEFAULT_UNCERTAIN_PHRASES = [
+    "might be",
+    "could be",
+    "possibly",
+    "maybe",
+    "I think",
+    "I believe"
+]
+
+
+class PhraseFilter:
+    """
+    Removes a set of phrases and normalizes whitespace in one regex pass
+    
+    The output matches removing every phrase and then collapsing whitespace
+    with " ".join(text.split()), but only one new string is built. Phrase
+    matching is case-insensitive unless requested otherwise.
+    """
+    
+    def __init__(self, phrases: List[str], case_sensitive: bool = False):
+        """
+        Initialize PhraseFilter
+        
+        Args:
+            phrases: Phrases to remove
+            case_sensitive: Whether phrase matching is case-sensitive
+        """
+        self.phrases = [phrase for phrase in phrases if phrase]
+        self.case_sensitive = case_sensitive
+        
+        flags = 0 if case_sensitive else re.IGNORECASE
+        alternatives = []
+        self._phrases_only = None
+        
+        if self.phrases:
+            # Longest first so overlapping phrases remove the longest match
+            escaped = "|".join(re.escape(p) for p in sorted(set(self.phrases), key=len, reverse=True))
+            alternatives.append(rf"(?:\s*(?:{escaped}))+\s*")
+            self._phrases_only = re.compile(rf"(?:{escaped})+", flags)
+        
+        # Whitespace that " ".join(split()) would change: runs and non-space characters
+        alternatives.append(r"\s{2,}|[^\S ]")
+        
+        self._pattern = re.compile("|".join(alternatives), flags)
+    
+    def apply(self, content: str) -> str:
+        """
+        Remove phrases and normalize whitespace
+        
+        Args:
+            content: Content to filter
+        
+        Returns:
+            Filtered content
+        """
+        if not content:
+            return ""
+        
+        return self._pattern.sub(self._replace, content).strip()
+    
+    def _replace(self, match: "re.Match") -> str:
+        text = match.group(0)
+        
+        # Removed phrases only leave a separator if whitespace surrounded them
+        if self._phrases_only is not None and self._phrases_only.fullmatch(text):
+            return ""
+        
+        return " "
\ No newline at end of file
@@ -0,0 +1,327 @@
+"""
+Tracing Module for AMB Hallucination Prevention
+Lightweight sampled spans with a background JSONL exporter
+"""
+
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_span = contextvars.ContextVar("amb_current_span", default=None)
+
+
+class _NoopSpan:
+    """
+    Span stand-in used when tracing is disabled or the trace is not sampled
+    """
+    
+    sampled = False
+    
+    def set_attribute(self, key: str, value: Any):
+        pass
+    
+    def add(self, key: str, amount: float = 1):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _UnsampledScope(_NoopSpan):
+    """
+    Marks the current context as unsampled so child spans are skipped as well
+    """
+    
+    def __init__(self):
+        self._token = None
+    
+    def __enter__(self):
+        self._token = _current_span.set(NOOP_SPAN)
+        return NOOP_SPAN
+    
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        return False
+
+
+class Span:
+    """
+    A timed operation within a trace
+    """
+    
+    sampled = True
+    
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_id: Optional[str],
+                 attributes: Dict[str, Any]):
+        """
+        Initialize Span
+        
+        Args:
+            tracer: Tracer that exports the span
+            name: Operation name
+            trace_id: Identifier shared by all spans of a request
+            parent_id: Identifier of the parent span, if any
+            attributes: Initial attributes
+        """
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_time = 0.0
+        self.duration = 0.0
+        self._start_monotonic = 0.0
+        self._token = None
+    
+    def set_attribute(self, key: str, value: Any):
+        """
+        Set an attribute on the span
+        
+        Args:
+            key: Attribute name
+            value: Attribute value (JSON-serializable)
+        """
+        self.attributes[key] = value
+    
+    def add(self, key: str, amount: float = 1):
+        """
+        Increment a numeric attribute
+        
+        Args:
+            key: Attribute name
+            amount: Amount to add
+        """
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+    
+    def __enter__(self):
+        self.start_time = time.time()
+        self._start_monotonic = time.monotonic()
+        self._token = _current_span.set(self)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.monotonic() - self._start_monotonic
+        _current_span.reset(self._token)
+        
+        if exc_type is not None:
+            self.attributes["error"] = f"{exc_type.__name__}: {exc}"
+        
+        self.tracer.finish(self)
+        return False
+    
+    def to_event(self) -> Dict[str, Any]:
+        """
+        Convert to a Chrome trace-event ("X" complete event)
+        
+        Returns:
+            Trace event dictionary
+        """
+        args = dict(self.attributes)
+        args["trace_id"] = self.trace_id
+        args["span_id"] = self.span_id
+        args["parent_id"] = self.parent_id
+        
+        return {
+            "name": self.name,
+            "cat": "amb",
+            "ph": "X",
+            "ts": int(self.start_time * 1_000_000),
+            "dur": int(self.duration * 1_000_000),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args
+        }
+
+
+class Tracer:
+    """
+    Creates spans, samples traces at the root and hands finished spans to an exporter
+    
+    A span opened with no active parent starts a new trace, which is kept with
+    probability sample_rate. Children follow their root's sampling decision,
+    so an unsampled request costs one random() call per root.
+    """
+    
+    def __init__(self, sample_rate: float = 0.0, exporter: Optional["JsonlSpanExporter"] = None):
+        """
+        Initialize Tracer
+        
+        Args:
+            sample_rate: Fraction of traces recorded (0-1)
+            exporter: Destination for finished spans (spans are dropped if None)
+        """
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("Sample rate must be between 0 and 1")
+        
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+    
+    def span(self, name: str, **attributes):
+        """
+        Open a span as a context manager
+        
+        Args:
+            name: Operation name
+            **attributes: Initial attributes
+        
+        Returns:
+            Context manager yielding the span (a no-op span when not sampled)
+        """
+        parent = _current_span.get()
+        
+        if parent is None:
+            if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+                return _UnsampledScope()
+            return Span(self, name, uuid.uuid4().hex, None, attributes)
+        
+        if not parent.sampled:
+            return NOOP_SPAN
+        
+        return Span(self, name, parent.trace_id, parent.span_id, attributes)
+    
+    def finish(self, span: Span):
+        """
+        Hand a finished span to the exporter
+        
+        Args:
+            span: Finished span
+        """
+        if self.exporter is not None:
+            self.exporter.export(span)
+    
+    def close(self):
+        """
+        Flush and close the exporter
+        """
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+NOOP_TRACER = Tracer(0.0)
+
+
+def current_span():
+    """
+    Get the active span in this context
+    
+    Returns:
+        Active span, or a no-op span if none is active
+    """
+    return _current_span.get() or NOOP_SPAN
+
+
+class JsonlSpanExporter:
+    """
+    Writes finished spans as Chrome trace-event JSON lines from a background thread
+    
+    export() only enqueues; a daemon thread appends batches to the file every
+    flush_interval seconds. When the queue is full new spans are dropped and
+    counted rather than blocking the request path. Use to_chrome_trace() to
+    wrap a file for chrome://tracing or Perfetto.
+    """
+    
+    def __init__(self, path: str, flush_interval: float = 1.0, max_queue: int = 10000):
+        """
+        Initialize JsonlSpanExporter
+        
+        Args:
+            path: Output file (appended to)
+            flush_interval: Seconds between background flushes
+            max_queue: Maximum spans buffered before dropping
+        """
+        if flush_interval <= 0:
+            raise ValueError("Flush interval must be positive")
+        
+        self.path = path
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="amb-span-exporter", daemon=True)
+        self._thread.start()
+    
+    def export(self, span: Span):
+        """
+        Queue a finished span for writing
+        
+        Args:
+            span: Finished span
+        """
+        try:
+            self._queue.put_nowait(span.to_event())
+        except queue.Full:
+            self.dropped += 1
+    
+    def flush(self):
+        """
+        Write all queued spans now
+        """
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        if not events:
+            return
+        
+        try:
+            with open(self.path, "a", encoding="utf-8") as trace_file:
+                trace_file.write("".join(json.dumps(event, default=str) + "\n" for event in events))
+        except OSError as e:
+            logger.error(f"Span export failed: {str(e)}")
+    
+    def close(self):
+        """
+        Stop the background thread and write remaining spans
+        """
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+    
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+
+def read_spans(path: str) -> List[Dict[str, Any]]:
+    """
+    Read trace events from a JSONL span file
+    
+    Args:
+        path: Span file written by JsonlSpanExporter
+    
+    Returns:
+        List of trace event dictionaries
+    """
+    with open(path, encoding="utf-8") as trace_file:
+        return [json.loads(line) for line in trace_file if line.strip()]
+
+
+def to_chrome_trace(path: str, output_path: str):
+    """
+    Convert a JSONL span file into a Chrome trace JSON file
+    
+    Args:
+        path: Span file written by JsonlSpanExporter
+        output_path: Destination loadable in chrome://tracing or Perfetto
+    """
+    with open(output_path, "w", encoding="utf-8") as output_file:
+        json.dump({"traceEvents": read_spans(path), "displayTimeUnit": "ms"}, output_file)
\ No newline at end of file
@@ -16,6 +16,30 @@ from amb.data_validator import DataValidator
 from amb.logic_checker import LogicChecker
 from amb.response_generator import ResponseGenerator
 from amb.model_handler import ModelHandler
+from amb.scanning import ContentScanner, ScanBudgetExceeded, linear_pattern
+from amb.context_view import JsonContext, DataPointView, iter_json_object
+from amb.clock import current_clock, request_clock, request_timestamp
+from amb.records import ContextRecord, ValidationRecord, format_timestamp
+from amb.audit import SegmentAuditSink, read_audit, segment_paths
+from amb.log_pipeline import QueueLogging, RequestLogSampler, PER_REQUEST
+
+from amb.snapshot import SnapshotReader, write_snapshot
+from amb.shared_store import SharedReferenceStore
+from amb.serving import HashRing, ShardedServer, serve_http
+from amb.response_cache import NearDuplicateCache, normalize_query, simhash
+from amb.known_good import KnownGoodIndex
+from amb.check_graph import CheckGraph, CheckNode
+from amb.check_order import AdaptiveCheckOrder
+from amb.degradation import DegradationController
+from amb.admission import AdmissionController
+from amb.scheduler import MicroBatchScheduler
+from amb.tracing import Tracer, JsonlSpanExporter, read_spans
+from amb.metrics import LatencyHistogram
+from amb.metrics import ShardedCounters
+from amb.text_filters import PhraseFilter
+from amb.retry_policy import RetryPolicy
+from amb.streaming import StreamingValidator
+from amb.model_backend import ModelBackend, DeterministicBackend, HTTPBackend, LocalModelServer
 
 
 class TestDataValidator(unittest.TestCase):
@@ -551,6 +575,1717 @@ class TestIntegration(unittest.TestCase):
             self.assertIn("success", response)
 
 
+class TestModelBackend(unittest.TestCase):
+    """Test cases for pluggable model backends"""
+    
+    def test_deterministic_backend_default_content(self):
+        """Test deterministic backend reproduces the legacy stub content"""
+        backend = DeterministicBackend()
+        self.assertEqual(backend.generate("Hello", {}), "Response to: Hello")
+        self.assertEqual(backend.calls, 1)
+    
+    def test_deterministic_backend_constraints(self):
+        """Test constraints are honoured by the backend"""
+        backend = DeterministicBackend({"q": "abcdef"})
+        self.assertEqual(backend.generate("q", {}, {"max_length": 3}), "abc")
+    
+    def test_invalid_concurrency(self):
+        """Test backend rejects non-positive concurrency limits"""
+        with self.assertRaises(ValueError):
+            DeterministicBackend(max_concurrency=0)
+    
+    def test_async_concurrency_limit(self):
+        """Test async generation respects the per-backend concurrency limit"""
+        import asyncio
+        
+        class CountingBackend(ModelBackend):
+            def __init__(self):
+                super().__init__(max_concurrency=2)
+                self.active = 0
+                self.peak = 0
+            
+            def _generate(self, query, context, constraints):
+                return query
+            
+            async def _agenerate(self, query, context, constraints):
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+                await asyncio.sleep(0.01)
+                self.active -= 1
+                return query
+        
+        backend = CountingBackend()
+        
+        async def run():
+            return await asyncio.gather(*(backend.agenerate(str(i), {}) for i in range(6)))
+        
+        results = asyncio.run(run())
+        self.assertEqual(results, [str(i) for i in range(6)])
+        self.assertEqual(backend.peak, 2)
+    
+    def test_http_backend_reuses_connections(self):
+        """Test HTTP backend round-trips through the local stand-in and reuses its connection"""
+        with LocalModelServer(DeterministicBackend({"q": "from server"})) as server:
+            with HTTPBackend(server.url) as backend:
+                for _ in range(3):
+                    self.assertEqual(backend.generate("q", {"k": "v"}), "from server")
+                self.assertEqual(backend.connections_opened, 1)
+                self.assertEqual(server.connections_accepted, 1)
+    
+    def test_http_backend_forwards_serialized_context(self):
+        """Test a JSON bytes context reaches an HTTP model endpoint intact"""
+        class RecordingBackend(ModelBackend):
+            def __init__(self):
+                super().__init__()
+                self.contexts = []
+            
+            def _generate(self, query, context, constraints):
+                self.contexts.append(context)
+                return "Recorded answer"
+        
+        recorder = RecordingBackend()
+        with LocalModelServer(recorder) as server:
+            handler = ModelHandler(backend=HTTPBackend(server.url))
+            response = handler.process_request({"query": "Test query", "context": b'{"a": 1, "b": {"c": [2]}}'})
+            handler.close()
+        
+        self.assertTrue(response["success"])
+        self.assertEqual(recorder.contexts, [{"a": 1, "b": {"c": [2]}}])
+    
+    def test_generator_uses_backend(self):
+        """Test ResponseGenerator generates through the configured backend"""
+        generator = ResponseGenerator(0.85, DeterministicBackend({"q": "Backend answer"}))
+        response = generator.generate_response({"query": "q"})
+        self.assertTrue(response["success"])
+        self.assertEqual(response["content"], "Backend answer")
+    
+    def test_generate_response_async_matches_sync(self):
+        """Test async generation produces the same content as the sync path"""
+        import asyncio
+        
+        generator = ResponseGenerator(0.85)
+        request = {"query": "Async query", "context": {"key": "value"}}
+        
+        sync_response = generator.generate_response(request)
+        async_response = asyncio.run(generator.generate_response_async(request))
+        
+        self.assertEqual(async_response["success"], sync_response["success"])
+        self.assertEqual(async_response["content"], sync_response["content"])
+        self.assertEqual(async_response["data"][0]["value"], "value")
+
+
+class TestStreamingGeneration(unittest.TestCase):
+    """Test cases for streaming generation with incremental validation"""
+    
+    def _collect(self, generator, request):
+        events = list(generator.generate_response_stream(request))
+        chunks = "".join(e["content"] for e in events if e["event"] == "chunk")
+        return events, chunks
+    
+    def test_stream_valid_response(self):
+        """Test streamed chunks reassemble into the validated content"""
+        content = "The   quarterly report shows steady growth in every region we track."
+        backend = DeterministicBackend({"q": content}, chunk_size=7)
+        generator = ResponseGenerator(0.85, backend)
+        
+        events, chunks = self._collect(generator, {"query": "q"})
+        
+        self.assertEqual(events[-1]["event"], "complete")
+        self.assertTrue(events[-1]["response"]["success"])
+        self.assertEqual(chunks, events[-1]["response"]["content"])
+        self.assertGreater(sum(1 for e in events if e["event"] == "chunk"), 1)
+    
+    def test_stream_aborts_on_hard_pattern(self):
+        """Test generation is cancelled as soon as a hard pattern appears"""
+        content = "Here is the answer. As an AI I guess. " + "filler text " * 200
+        backend = DeterministicBackend({"q": content}, chunk_size=10)
+        generator = ResponseGenerator(0.85, backend)
+        
+        events, chunks = self._collect(generator, {"query": "q"})
+        
+        self.assertEqual(events[-1]["event"], "aborted")
+        self.assertFalse(events[-1]["response"]["success"])
+        self.assertNotIn("As an AI", chunks)
+        self.assertLess(backend.chunks_streamed, 10)
+    
+    def test_stream_pattern_across_chunk_boundary(self):
+        """Test patterns split across chunks are caught by the rolling window"""
+        validator = StreamingValidator(DataValidator(0.85), LogicChecker(), window_size=64, holdback=0)
+        validator.feed("Valid start [PLACE")
+        self.assertIsNone(validator.violation)
+        validator.feed("HOLDER] rest")
+        self.assertIsNotNone(validator.violation)
+    
+    def test_stream_empty_request(self):
+        """Test streaming an empty request yields a single terminal error"""
+        events = list(ResponseGenerator().generate_response_stream({}))
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["response"]["error"], "Empty request")
+    
+    def test_stream_async_aborts(self):
+        """Test the async stream aborts on a contradiction"""
+        import asyncio
+        
+        content = "It is always sunny and never sunny here. " + "more words " * 50
+        backend = DeterministicBackend({"q": content}, chunk_size=8)
+        generator = ResponseGenerator(0.85, backend)
+        
+        async def run():
+            return [e async for e in generator.generate_response_stream_async({"query": "q"})]
+        
+        events = asyncio.run(run())
+        self.assertEqual(events[-1]["event"], "aborted")
+        self.assertLess(backend.chunks_streamed, 20)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Test cases for deadline-aware regeneration"""
+    
+    def _rejecting_generator(self, policy, latency_ms=0.0):
+        backend = DeterministicBackend({"q": "As an AI I cannot answer"}, latency_ms=latency_ms)
+        return ResponseGenerator(0.85, backend, retry_policy=policy), backend
+    
+    def test_invalid_policy(self):
+        """Test policy parameter validation"""
+        with self.assertRaises(ValueError):
+            RetryPolicy(max_retries=-1)
+        with self.assertRaises(ValueError):
+            RetryPolicy(max_response_time_ms=0)
+    
+    def test_retries_up_to_max_retries(self):
+        """Test regeneration honours max_retries when the budget allows"""
+        generator, backend = self._rejecting_generator(RetryPolicy(max_retries=3, max_response_time_ms=10000))
+        response = generator.generate_response({"query": "q"})
+        
+        self.assertFalse(response["success"])
+        self.assertEqual(backend.calls, 4)
+        self.assertEqual(generator.get_generation_stats()["retries"], 3)
+    
+    def test_retry_skipped_when_deadline_cannot_be_met(self):
+        """Test no regeneration is attempted once the predicted attempt exceeds the budget"""
+        generator, backend = self._rejecting_generator(RetryPolicy(max_retries=3, max_response_time_ms=30),
+                                                       latency_ms=20)
+        response = generator.generate_response({"query": "q"})
+        
+        self.assertEqual(backend.calls, 1)
+        self.assertTrue(any("Retry skipped" in d for d in response["error_details"]))
+        self.assertEqual(generator.get_generation_stats()["retries_skipped"], 1)
+    
+    def test_constraints_passed_to_backend(self):
+        """Test regeneration constraints reach the backend"""
+        seen = []
+        
+        class RecordingBackend(DeterministicBackend):
+            def _generate(self, query, context, constraints):
+                seen.append(constraints)
+                return "As an AI" if not constraints else "Constrained answer"
+        
+        generator = ResponseGenerator(0.85, RecordingBackend(), retry_policy=RetryPolicy(max_retries=2,
+                                                                                         max_response_time_ms=10000))
+        response = generator.generate_response({"query": "q"})
+        
+        self.assertTrue(response["success"])
+        self.assertEqual(seen[1]["max_length"], 500)
+        self.assertEqual(response["metadata"]["generation_attempt"], 2)
+        self.assertEqual(len(response["metadata"]["attempt_times_ms"]), 2)
+    
+    def test_model_handler_uses_max_retries(self):
+        """Test ModelHandler wires max_retries into the generator"""
+        handler = ModelHandler({"confidence_threshold": 0.85, "context_window": 10,
+                                "max_response_time_ms": 200, "max_retries": 0})
+        self.assertEqual(handler.response_generator.retry_policy.max_retries, 0)
+
+
+class TestAsyncBatchGeneration(unittest.TestCase):
+    """Test cases for concurrent batch generation"""
+    
+    def test_results_in_input_order(self):
+        """Test results are returned in input order even when completed out of order"""
+        import asyncio
+        
+        class VariableLatencyBackend(DeterministicBackend):
+            async def _agenerate(self, query, context, constraints):
+                await asyncio.sleep(0.03 if query == "slow" else 0.0)
+                return f"Response to: {query}"
+        
+        generator = ResponseGenerator(0.85, VariableLatencyBackend())
+        requests = [{"query": "slow"}, {"query": "fast"}, {"query": "other"}]
+        
+        responses = asyncio.run(generator.generate_batch_responses_async(requests, max_concurrency=3))
+        self.assertEqual([r["content"] for r in responses],
+                         ["Response to: slow", "Response to: fast", "Response to: other"])
+    
+    def test_batch_runs_concurrently(self):
+        """Test I/O-bound items overlap instead of running serially"""
+        import asyncio
+        import time
+        
+        generator = ResponseGenerator(0.85, DeterministicBackend(latency_ms=20))
+        requests = [{"query": f"Query {i}"} for i in range(20)]
+        
+        start = time.monotonic()
+        responses = asyncio.run(generator.generate_batch_responses_async(requests, max_concurrency=20))
+        elapsed = time.monotonic() - start
+        
+        self.assertEqual(len(responses), 20)
+        self.assertTrue(all(r["success"] for r in responses))
+        self.assertLess(elapsed, 0.2)
+    
+    def test_item_timeout(self):
+        """Test items exceeding their deadline get a timeout error"""
+        import asyncio
+        
+        generator = ResponseGenerator(0.85, DeterministicBackend(latency_ms=200))
+        responses = asyncio.run(generator.generate_batch_responses_async([{"query": "q"}], item_timeout_ms=10))
+        self.assertEqual(responses[0]["error"], "Generation timed out")
+    
+    def test_as_completed_streaming(self):
+        """Test as-completed iteration yields every index exactly once"""
+        import asyncio
+        
+        generator = ResponseGenerator(0.85)
+        requests = [{"query": f"Query {i}"} for i in range(5)] + [{}]
+        
+        async def run():
+            return [item async for item in generator.iter_batch_responses_as_completed(requests, 2)]
+        
+        results = asyncio.run(run())
+        self.assertEqual(sorted(index for index, _ in results), list(range(6)))
+        self.assertEqual(dict(results)[5]["error"], "Empty request")
+
+
+class TestPhraseFilter(unittest.TestCase):
+    """Test cases for single-pass phrase filtering"""
+    
+    def test_matches_sequential_replace(self):
+        """Test output matches chained replace plus whitespace normalization"""
+        phrases = ["[PLACEHOLDER]", "As an AI assistant"]
+        content = "  Start  As an AI assistant said\n[PLACEHOLDER]x[PLACEHOLDER] end\t "
+        
+        expected = content
+        for phrase in phrases:
+            expected = expected.replace(phrase, "")
+        expected = " ".join(expected.split())
+        
+        self.assertEqual(PhraseFilter(phrases).apply(content), expected)
+    
+    def test_case_insensitive(self):
+        """Test phrases are removed regardless of case"""
+        self.assertEqual(PhraseFilter(["I think"]).apply("i THINK it works"), "it works")
+    
+    def test_case_sensitive_option(self):
+        """Test case-sensitive matching can be requested"""
+        self.assertEqual(PhraseFilter(["I think"], case_sensitive=True).apply("i think so"), "i think so")
+    
+    def test_adjacent_phrases_without_whitespace(self):
+        """Test phrases glued to words leave no separator behind"""
+        self.assertEqual(PhraseFilter(["maybe"]).apply("amaybeb c"), "ab c")
+    
+    def test_configurable_generator_phrases(self):
+        """Test ResponseGenerator accepts custom phrase lists"""
+        generator = ResponseGenerator(0.85, hallucination_phrases=["secret"], uncertain_phrases=["perhaps"])
+        self.assertEqual(generator._filter_hallucination_patterns("a SECRET b"), "a b")
+        self.assertEqual(generator._apply_strict_filtering("perhaps yes"), "yes")
+
+
+class TestModelHandlerAsync(unittest.TestCase):
+    """Test cases for asyncio ModelHandler entry points"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.config = {
+            "confidence_threshold": 0.85,
+            "context_window": 50,
+            "max_response_time_ms": 200
+        }
+    
+    def test_process_request_async_matches_sync(self):
+        """Test async and sync paths produce the same response and metrics"""
+        import asyncio
+        
+        request = {"query": "Test query", "context": {"key": "value"}}
+        sync_handler = ModelHandler(self.config)
+        async_handler = ModelHandler(self.config)
+        
+        sync_response = sync_handler.process_request(request)
+        async_response = asyncio.run(async_handler.process_request_async(request))
+        
+        for key in ("success", "content", "confidence", "hallucination_prevention"):
+            self.assertEqual(async_response[key], sync_response[key])
+        self.assertEqual([p["value"] for p in async_response["data"]], [p["value"] for p in sync_response["data"]])
+        
+        sync_metrics = sync_handler.get_performance_metrics()
+        async_metrics = async_handler.get_performance_metrics()
+        for key in ("total_requests", "successful_requests", "failed_requests", "hallucinations_prevented"):
+            self.assertEqual(async_metrics[key], sync_metrics[key])
+        
+        async_handler.close()
+    
+    def test_process_request_async_injection(self):
+        """Test input validation failures are reported on the async path"""
+        import asyncio
+        
+        handler = ModelHandler(self.config)
+        response = asyncio.run(handler.process_request_async({"query": "'; DROP TABLE users; --"}))
+        self.assertFalse(response["success"])
+        self.assertEqual(handler.get_performance_metrics()["failed_requests"], 1)
+    
+    def test_batch_process_async_order_and_concurrency(self):
+        """Test async batches keep input order and overlap backend latency"""
+        import asyncio
+        import time
+        
+        handler = ModelHandler(self.config, DeterministicBackend(latency_ms=20))
+        requests = [{"query": f"Query {i}"} for i in range(10)]
+        
+        start = time.monotonic()
+        responses = asyncio.run(handler.batch_process_async(requests, max_concurrency=10))
+        elapsed = time.monotonic() - start
+        
+        self.assertEqual([r["content"] for r in responses], [f"Response to: Query {i}" for i in range(10)])
+        self.assertLess(elapsed, 0.15)
+        self.assertEqual(handler.get_performance_metrics()["total_requests"], 10)
+    
+    def test_batch_process_async_timeout(self):
+        """Test per-request timeouts produce timeout errors"""
+        import asyncio
+        
+        handler = ModelHandler(self.config, DeterministicBackend(latency_ms=200))
+        responses = asyncio.run(handler.batch_process_async([{"query": "q"}], timeout_ms=10))
+        
+        self.assertEqual(responses[0]["error"], "Request timed out")
+        self.assertEqual(handler.get_performance_metrics()["failed_requests"], 1)
+
+
+class TestThreadSafety(unittest.TestCase):
+    """Stress tests for sharing one ModelHandler across a thread pool"""
+    
+    def test_sharded_counters_merge_and_reset(self):
+        """Test counters from many threads merge without lost updates"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        counters = ShardedCounters(["hits"])
+        
+        def work(_):
+            for _ in range(1000):
+                counters.add("hits")
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(work, range(16)))
+        
+        self.assertEqual(counters.snapshot()["hits"], 16000)
+        counters.reset()
+        self.assertEqual(counters.snapshot()["hits"], 0)
+        counters.add("hits", 2)
+        self.assertEqual(counters.snapshot()["hits"], 2)
+    
+    def test_shared_handler_under_thread_pool(self):
+        """Test metrics and shared stores stay exact under concurrent requests"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        handler = ModelHandler({"confidence_threshold": 0.85, "context_window": 1000,
+                                "max_response_time_ms": 5000})
+        requests = [{"query": f"Query {i}", "context": {"index": i}} for i in range(300)]
+        requests += [{"query": "'; DROP TABLE users; --"} for _ in range(20)]
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            responses = list(pool.map(handler.process_request, requests))
+            list(pool.map(lambda i: handler.detect_hallucination(f"As an AI {i}", {"source": "s"}), range(200)))
+            list(pool.map(lambda i: handler.logic_checker.register_fact(f"fact{i}", i), range(200)))
+        
+        metrics = handler.get_performance_metrics()
+        self.assertEqual(len(responses), 320)
+        self.assertEqual(metrics["total_requests"], 300)
+        self.assertEqual(metrics["successful_requests"], sum(1 for r in responses if r["success"]))
+        self.assertEqual(metrics["failed_requests"], 20 + 300 - metrics["successful_requests"])
+        self.assertEqual(len(handler.hallucination_logs), 200)
+        # The generator shares the handler's validator: content and one data point per request
+        self.assertEqual(handler.data_validator.get_validation_stats()["total_validations"], 200 + 300 * 2)
+        self.assertEqual(len(handler.logic_checker.session_facts), 200)
+        self.assertEqual(handler.response_generator.get_generation_stats()["total_requests"], 300)
+
+
+class TestLatencyHistograms(unittest.TestCase):
+    """Test cases for log-bucketed latency histograms"""
+    
+    def test_percentiles_within_precision(self):
+        """Test percentiles are reported within the bucket precision"""
+        histogram = LatencyHistogram(precision=0.01)
+        for ms in range(1, 1001):
+            histogram.record(ms / 1000)
+        
+        self.assertAlmostEqual(histogram.percentile(50), 0.5, delta=0.5 * 0.011)
+        self.assertAlmostEqual(histogram.percentile(95), 0.95, delta=0.95 * 0.011)
+        self.assertAlmostEqual(histogram.percentile(99), 0.99, delta=0.99 * 0.011)
+        self.assertEqual(histogram.percentile(100), 1.0)
+    
+    def test_fixed_memory(self):
+        """Test bucket storage does not grow with samples"""
+        histogram = LatencyHistogram()
+        buckets = len(histogram._counts)
+        for i in range(10000):
+            histogram.record(i * 1e-4)
+        histogram.record(1e6)
+        self.assertEqual(len(histogram._counts), buckets)
+    
+    def test_snapshot_merge(self):
+        """Test snapshots from several workers merge into one distribution"""
+        import json
+        
+        first, second = LatencyHistogram(), LatencyHistogram()
+        for ms in range(1, 101):
+            (first if ms % 2 else second).record(ms / 1000)
+        
+        merged = LatencyHistogram.from_snapshot(json.loads(json.dumps(first.snapshot())))
+        merged.merge(second.snapshot())
+        
+        self.assertEqual(merged.count, 100)
+        self.assertAlmostEqual(merged.percentile(50), 0.05, delta=0.05 * 0.011)
+        self.assertEqual(merged.max, 0.1)
+        
+        with self.assertRaises(ValueError):
+            merged.merge(LatencyHistogram(precision=0.05).snapshot())
+    
+    def test_handler_reports_stage_percentiles(self):
+        """Test get_performance_metrics reports per-stage percentiles and SLO status"""
+        handler = ModelHandler()
+        for i in range(5):
+            handler.process_request({"query": f"Query {i}", "context": {"i": i}})
+        
+        metrics = handler.get_performance_metrics()
+        for stage in ("total", "preprocess", "generation", "validation", "logic_check", "postprocess"):
+            self.assertEqual(metrics["latency"][stage]["count"], 5)
+            self.assertGreaterEqual(metrics["latency"][stage]["p99_ms"], metrics["latency"][stage]["p50_ms"])
+        self.assertTrue(metrics["slo"]["p95_met"])
+        
+        handler.reset_metrics()
+        self.assertEqual(handler.get_performance_metrics()["latency"]["total"]["count"], 0)
+
+
+class TestTracing(unittest.TestCase):
+    """Test cases for request tracing"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        import tempfile
+        self.tmpdir = tempfile.mkdtemp()
+        self.trace_path = os.path.join(self.tmpdir, "spans.jsonl")
+    
+    def tearDown(self):
+        """Clean up trace files"""
+        import shutil
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+    
+    def test_sampled_request_exports_nested_spans(self):
+        """Test that a sampled request exports parented spans in trace-event format"""
+        handler = ModelHandler({"trace_sample_rate": 1.0, "trace_path": self.trace_path})
+        handler.process_request({"query": "What is the price?", "context": {"price": 10, "source": "db"}})
+        handler.close()
+        
+        spans = read_spans(self.trace_path)
+        by_name = {span["name"]: span for span in spans}
+        
+        self.assertIn("process_request", by_name)
+        self.assertIn("generate_response", by_name)
+        self.assertIn("validate_data_point", by_name)
+        self.assertIn("check_statement_consistency", by_name)
+        
+        root = by_name["process_request"]
+        generate = by_name["generate_response"]
+        self.assertIsNone(root["args"]["parent_id"])
+        self.assertEqual(generate["args"]["parent_id"], root["args"]["span_id"])
+        self.assertEqual({span["args"]["trace_id"] for span in spans}, {root["args"]["trace_id"]})
+        self.assertEqual(root["ph"], "X")
+        self.assertIn("content_length", generate["args"])
+        self.assertIn("cache_hit", by_name["validate_data_point"]["args"])
+    
+    def test_unsampled_request_exports_nothing(self):
+        """Test that children of an unsampled root are not recorded"""
+        tracer = Tracer(0.0, JsonlSpanExporter(self.trace_path))
+        
+        with tracer.span("root") as root:
+            with tracer.span("child") as child:
+                child.set_attribute("size", 1)
+        tracer.close()
+        
+        self.assertFalse(root.sampled)
+        self.assertFalse(os.path.exists(self.trace_path))
+    
+    def test_async_request_keeps_parent_across_executor(self):
+        """Test that spans opened on the validation executor keep their parent"""
+        import asyncio
+        handler = ModelHandler({"trace_sample_rate": 1.0, "trace_path": self.trace_path})
+        asyncio.run(handler.process_request_async({"query": "Test", "context": {"value": 1, "source": "s"}}))
+        handler.close()
+        
+        spans = read_spans(self.trace_path)
+        roots = [span for span in spans if span["args"]["parent_id"] is None]
+        
+        self.assertEqual([span["name"] for span in roots], ["process_request"])
+    
+    def test_invalid_sample_rate(self):
+        """Test invalid trace sample rate"""
+        with self.assertRaises(ValueError):
+            ModelHandler({"trace_sample_rate": 1.5})
+
+
+class TestMicroBatching(unittest.TestCase):
+    """Test cases for micro-batched request processing"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.handler = ModelHandler()
+    
+    def tearDown(self):
+        """Release handler resources"""
+        self.handler.close()
+    
+    def test_scheduler_batches_concurrent_requests(self):
+        """Test that concurrent submissions are grouped and fanned back out"""
+        with MicroBatchScheduler(self.handler, max_batch_size=8, max_wait_ms=50) as scheduler:
+            futures = [scheduler.submit({"query": f"Query {i}", "context": {}}) for i in range(8)]
+            responses = [future.result(5) for future in futures]
+            stats = scheduler.get_stats()
+        
+        self.assertEqual(stats["requests"], 8)
+        self.assertLess(stats["batches"], 8)
+        for i, response in enumerate(responses):
+            self.assertTrue(response["success"])
+            self.assertIn(f"Query {i}", response["content"])
+    
+    def test_batch_process_reports_each_result(self):
+        """Test that batch_process hands each response to the callback as it finishes"""
+        seen = []
+        responses = self.handler.batch_process([{"query": "One"}, {"query": "Two"}],
+                                               on_result=lambda i, response: seen.append((i, response)))
+        
+        self.assertEqual(seen, list(enumerate(responses)))
+    
+    def test_scheduler_rejects_after_close(self):
+        """Test that a closed scheduler refuses new requests"""
+        scheduler = MicroBatchScheduler(self.handler)
+        scheduler.close()
+        
+        with self.assertRaises(RuntimeError):
+            scheduler.submit({"query": "Test"})
+    
+    def test_batch_injection_scan_matches_single(self):
+        """Test that the batch injection scan flags the same queries as the single scan"""
+        texts = ["normal", "<script>alert(1)</script>", "", "onload = x", "drop  table users", "evaluate"]
+        
+        self.assertEqual(self.handler._detect_injection_batch(texts),
+                         [self.handler._detect_injection(text) for text in texts])
+    
+    def test_batch_process_rejects_injection(self):
+        """Test that batch processing still rejects injected queries"""
+        responses = self.handler.batch_process([{"query": "Normal"}, {"query": "<script>x"}, {}])
+        
+        self.assertTrue(responses[0]["success"])
+        self.assertFalse(responses[1]["success"])
+        self.assertFalse(responses[2]["success"])
+    
+    def test_batch_validates_context_data_once(self):
+        """Test that a batch validates all context data points in one call with per-request results"""
+        requests = [{"query": f"Query {i}", "context": {"value": f"fact {i}", "note": "As an AI I know"}}
+                    for i in range(4)]
+        expected = [[point["key"] for point in self.handler.process_request(request)["data"]] for request in requests]
+        
+        validator = self.handler.response_generator.data_validator
+        with patch.object(validator, "validate_data_points", wraps=validator.validate_data_points) as validate:
+            responses = self.handler.batch_process(requests)
+        
+        self.assertEqual(validate.call_count, 1)
+        self.assertEqual(len(validate.call_args[0][0]), 8)
+        self.assertEqual([[point["key"] for point in response["data"]] for response in responses], expected)
+        self.assertEqual(expected[0], ["value"])
+    
+    def test_batch_context_validations_expire_with_source_fingerprints(self):
+        """Test that batch data validations are redone once source fingerprints change"""
+        generator = self.handler.response_generator
+        context = {"value": "fact"}
+        data_validations = generator.validate_context_data([context])[0]
+        generator.data_validator.set_source_fingerprint("context", "0" * 32)
+        
+        response = generator.generate_response({"query": "Query", "context": context,
+                                                "data_validations": data_validations})
+        
+        self.assertEqual(data_validations["results"], [(True, 1.0, None)])
+        self.assertEqual(response["data"], [])
+    
+    def test_validate_data_points_matches_single(self):
+        """Test that screened batch validation matches per-point validation"""
+        validator = DataValidator()
+        points = [("clean", "s"), ("As an AI I know", "s"), ("[INSERT\\nHERE]", "s"), ("[INSERT x HERE]", "s")]
+        
+        expected = [DataValidator().validate_data_point(data, source) for data, source in points]
+        
+        self.assertEqual(validator.validate_data_points(points), expected)
+
+
+class TestAdmissionControl(unittest.TestCase):
+    """Test cases for admission control and load shedding"""
+    
+    def test_queue_full_rejects(self):
+        """Test that requests beyond the concurrency limit and queue are rejected"""
+        import threading
+        controller = AdmissionController(max_concurrency=1, max_queue=1, max_response_time_ms=1000)
+        self.assertIsNone(controller.acquire())
+        
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(controller.acquire()))
+        waiter.start()
+        while controller.queue_depth == 0:
+            pass
+        
+        self.assertIsNotNone(controller.acquire())
+        controller.release()
+        waiter.join()
+        
+        self.assertEqual(results, [None])
+        self.assertEqual(controller.get_stats()["rejected"]["queue_full"], 1)
+        self.assertEqual(controller.in_flight, 1)
+    
+    def test_slo_based_rejection(self):
+        """Test that queued requests are shed when recent latency exceeds the SLO"""
+        controller = AdmissionController(max_concurrency=1, max_queue=10, max_response_time_ms=100)
+        controller.acquire()
+        controller.release(0.5)
+        controller.acquire()
+        
+        self.assertIn("exceeds", controller.acquire())
+        self.assertEqual(controller.get_stats()["rejected"]["slo"], 1)
+    
+    def test_queued_request_times_out(self):
+        """Test that a request still queued after its budget is rejected"""
+        import asyncio
+        controller = AdmissionController(max_concurrency=1, max_queue=10, max_response_time_ms=20)
+        controller.acquire()
+        
+        rejection = asyncio.run(controller.acquire_async())
+        
+        self.assertIsNotNone(rejection)
+        self.assertEqual(controller.queue_depth, 0)
+        self.assertEqual(controller.get_stats()["rejected"]["timeout"], 1)
+    
+    def test_handler_sheds_with_distinct_error(self):
+        """Test that the handler fast-fails overloaded requests and counts them"""
+        import asyncio
+        handler = ModelHandler({"max_concurrent_requests": 1, "max_queued_requests": 0},
+                               backend=DeterministicBackend(latency_ms=50))
+        
+        async def run():
+            return await asyncio.gather(*(handler.process_request_async({"query": f"Q{i}"}) for i in range(3)))
+        
+        responses = asyncio.run(run())
+        handler.close()
+        shed = [r for r in responses if r.get("error_code") == "overloaded"]
+        
+        self.assertEqual(len(shed), 2)
+        self.assertEqual(shed[0]["error"], "Service overloaded")
+        metrics = handler.get_performance_metrics()
+        self.assertEqual(metrics["rejected_requests"], 2)
+        self.assertEqual(metrics["admission"]["rejected"]["queue_full"], 2)
+    
+    def test_invalid_admission_config(self):
+        """Test invalid admission limits"""
+        with self.assertRaises(ValueError):
+            ModelHandler({"max_concurrent_requests": 0})
+
+
+class TestDegradation(unittest.TestCase):
+    """Test cases for graceful degradation tiers"""
+    
+    def test_tier_steps_down_and_restores_with_hysteresis(self):
+        """Test that tiers follow rolling p95 with a gap between thresholds"""
+        controller = DegradationController(max_response_time_ms=100, min_samples=5, window_size=10)
+        
+        for _ in range(5):
+            controller.observe(0.095)
+        self.assertEqual(controller.tier, "standard")
+        
+        # Between the restore and degrade thresholds nothing changes
+        for _ in range(10):
+            controller.observe(0.07)
+        self.assertEqual(controller.tier, "standard")
+        
+        for _ in range(5):
+            controller.observe(0.095)
+        self.assertEqual(controller.tier, "minimal")
+        
+        # Recovery waits until slow samples have left the window
+        for _ in range(9):
+            controller.observe(0.01)
+        self.assertEqual(controller.tier, "minimal")
+        controller.observe(0.01)
+        self.assertEqual(controller.tier, "standard")
+        self.assertEqual(controller.get_stats()["transitions"], 3)
+    
+    def test_disabled_controller_stays_full(self):
+        """Test that a disabled controller never degrades"""
+        controller = DegradationController(min_samples=1, enabled=False)
+        controller.observe(10.0)
+        
+        self.assertEqual(controller.tier, "full")
+    
+    def test_response_records_applied_tier(self):
+        """Test that responses record the tier and its checks"""
+        handler = ModelHandler()
+        handler.degradation.tier = "minimal"
+        
+        response = handler.process_request({"query": "Test query", "context": {"value": 1}})
+        
+        self.assertTrue(response["success"])
+        self.assertEqual(response["hallucination_prevention"]["check_tier"], "minimal")
+        self.assertEqual(response["hallucination_prevention"]["checks_performed"], ["content_validation"])
+        self.assertEqual(len(handler.response_generator.logic_checker.context_memory), 0)
+    
+    def test_full_tier_reports_every_response_check(self):
+        """Test that the full tier reports content, data and logic checks"""
+        handler = ModelHandler()
+        
+        response = handler.process_request({"query": "Test query", "context": {"value": 1}})
+        
+        self.assertEqual(response["hallucination_prevention"]["checks_performed"],
+                         ["content_validation", "data_validation", "logic_consistency"])
+    
+    def test_detect_hallucination_keeps_pattern_check_when_degraded(self):
+        """Test that the minimal tier still catches pattern hallucinations"""
+        handler = ModelHandler()
+        handler.degradation.tier = "minimal"
+        
+        detected, _, reason = handler.detect_hallucination("As an AI, I think so")
+        
+        self.assertTrue(detected)
+        self.assertEqual(reason, "Self-referential AI pattern")
+        self.assertEqual(len(handler.logic_checker.context_memory), 0)
+
+
+class TestAdaptiveCheckOrder(unittest.TestCase):
+    """Test cases for cost-aware check ordering and early exit"""
+    
+    def test_declared_order_until_enough_samples(self):
+        """Test that the declared order is kept without enough observations"""
+        order = AdaptiveCheckOrder(["expensive", "cheap"], min_samples=5, reorder_interval=1)
+        order.record("cheap", 0.001, True)
+        
+        self.assertEqual(order.order(), ["expensive", "cheap"])
+    
+    def test_cheap_rejecting_check_moves_first(self):
+        """Test that checks are ordered by cost per rejection"""
+        order = AdaptiveCheckOrder(["context_scan", "patterns"], min_samples=5, reorder_interval=10)
+        
+        for _ in range(10):
+            order.record("context_scan", 0.010, False)
+            order.record("patterns", 0.001, True)
+        
+        self.assertEqual(order.order(), ["patterns", "context_scan"])
+        self.assertEqual(order.order(["context_scan"]), ["context_scan"])
+    
+    def test_pinned_check_stays_last(self):
+        """Test that a side-effecting check runs last however cheap it is"""
+        order = AdaptiveCheckOrder(["logic", "context_scan", "patterns"], min_samples=5, reorder_interval=10,
+                                   pinned_last=["logic"])
+        
+        for _ in range(10):
+            order.record("logic", 0.0001, True)
+            order.record("context_scan", 0.010, False)
+            order.record("patterns", 0.001, True)
+        
+        self.assertEqual(order.order(), ["patterns", "context_scan", "logic"])
+    
+    def test_detect_hallucination_records_check_stats(self):
+        """Test that detection checks report their cost and rejections"""
+        handler = ModelHandler()
+        
+        for _ in range(3):
+            detected, _, reason = handler.detect_hallucination("Hypothetically this is fine", {"source": "s"})
+            self.assertTrue(detected)
+            self.assertEqual(reason, "Speculative language pattern")
+        
+        stats = handler.get_performance_metrics()["check_order"]["checks"]
+        self.assertEqual(stats["pattern_detection"]["samples"], 3)
+        self.assertEqual(stats["pattern_detection"]["reject_rate"], 1.0)
+    
+    def test_confidence_scoring_stops_once_decided(self):
+        """Test that scoring stops once confidence is below the threshold"""
+        validator = DataValidator(0.85)
+        validator.source_data_cache["s"] = "stale"
+        
+        is_valid, confidence, _ = validator.validate_data_point("As an AI [PLACEHOLDER]", "s")
+        
+        self.assertFalse(is_valid)
+        self.assertAlmostEqual(confidence, 0.3)
+
+
+class TestCheckGraph(unittest.TestCase):
+    """Test cases for the check dependency graph"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.calls = []
+        
+        def node(name, result):
+            def run(**inputs):
+                self.calls.append(name)
+                return result(**inputs)
+            return run
+        
+        self.graph = CheckGraph([
+            CheckNode("length", node("length", lambda text: {"length": len(text)}), ["text"], ["length"]),
+            CheckNode("upper", node("upper", lambda text: {"upper": text.upper()}), ["text"], ["upper"]),
+            CheckNode("summary", node("summary", lambda length, upper: {"summary": f"{upper}:{length}"}),
+                      ["length", "upper"], ["summary"])
+        ])
+    
+    def test_each_node_runs_once(self):
+        """Test that shared dependencies are computed once and reused across stages"""
+        values = self.graph.run({"text": "abc"}, ["length", "summary"])
+        self.graph.run(values, ["summary", "upper"])
+        
+        self.assertEqual(values["summary"], "ABC:3")
+        self.assertEqual(sorted(self.calls), ["length", "summary", "upper"])
+    
+    def test_only_required_nodes_run(self):
+        """Test that nodes not needed for the targets are skipped"""
+        self.graph.run({"text": "abc"}, ["length"])
+        
+        self.assertEqual(self.calls, ["length"])
+    
+    def test_parallel_matches_sequential(self):
+        """Test that running independent nodes on an executor gives the same results"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            values = self.graph.run({"text": "abc"}, ["summary"], pool)
+        
+        self.assertEqual(values["summary"], "ABC:3")
+        self.assertEqual(self.calls[-1], "summary")
+    
+    def test_cycle_and_missing_input_rejected(self):
+        """Test that cycles and missing inputs are reported"""
+        with self.assertRaises(ValueError):
+            CheckGraph([CheckNode("a", dict, ["b"], ["a"]), CheckNode("b", dict, ["a"], ["b"])])
+        
+        with self.assertRaises(ValueError):
+            self.graph.run({}, ["summary"])
+    
+    def test_handler_shares_components_with_generator(self):
+        """Test that the generator uses the handler's validator and checker"""
+        handler = ModelHandler({"check_workers": 2})
+        response = handler.process_request({"query": "Test", "context": {"value": 1}})
+        handler.close()
+        
+        self.assertTrue(response["success"])
+        self.assertIs(handler.response_generator.data_validator, handler.data_validator)
+        self.assertIs(handler.response_generator.logic_checker, handler.logic_checker)
+        self.assertEqual(len(handler.logic_checker.context_memory), 1)
+
+
+class TestKnownGoodIndex(unittest.TestCase):
+    """Test the known-good fast path"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.handler = ModelHandler()
+        self.content = "The sky is blue today"
+        self.context = {"source": "sensor"}
+    
+    def test_source_update_invalidates(self):
+        """Test that a new source fingerprint drops cached verdicts"""
+        self.assertFalse(self.handler.detect_hallucination(self.content, self.context)[0])
+        self.handler.detect_hallucination(self.content, self.context)
+        self.assertEqual(self.handler.known_good.hits, 1)
+        
+        self.handler.data_validator.set_source_fingerprint("sensor", "5d41402abc4b2a76b9719d911017c592")
+        self.handler.detect_hallucination(self.content, self.context)
+        
+        self.assertEqual(self.handler.known_good.hits, 1)
+        self.assertEqual(self.handler.known_good.invalidations, 1)
+    
+    def test_index_evicts_and_invalidates(self):
+        """Test index is bounded and cleared on a state change"""
+        index = KnownGoodIndex(capacity=2)
+        fingerprints = [KnownGoodIndex.fingerprint(str(i)) for i in range(3)]
+        for fingerprint in fingerprints:
+            index.put(fingerprint, "v1", "ok")
+        
+        self.assertIsNone(index.get(fingerprints[0], "v1"))
+        self.assertEqual(index.get(fingerprints[2], "v1"), "ok")
+        self.assertIsNone(index.get(fingerprints[2], "v2"))
+        self.assertEqual(index.get_stats()["invalidations"], 1)
+    
+    def test_repeat_content_skips_validation(self):
+        """Test repeated clean content is served from the index"""
+        first = self.handler.detect_hallucination(self.content, self.context)
+        validations = len(self.handler.data_validator.validation_history)
+        
+        second = self.handler.detect_hallucination(self.content, self.context)
+        
+        self.assertEqual(first, second)
+        self.assertFalse(second[0])
+        self.assertEqual(len(self.handler.data_validator.validation_history), validations)
+        self.assertEqual(self.handler.known_good.get_stats()["hits"], 1)
+    
+    def test_fact_change_invalidates(self):
+        """Test registering a fact drops cached verdicts"""
+        self.handler.detect_hallucination(self.content, self.context)
+        self.handler.logic_checker.register_fact("sky", "blue")
+        validations = len(self.handler.data_validator.validation_history)
+        
+        self.handler.detect_hallucination(self.content, self.context)
+        
+        self.assertEqual(len(self.handler.data_validator.validation_history), validations + 1)
+    
+    def test_threshold_change_invalidates(self):
+        """Test changing the confidence threshold drops cached verdicts"""
+        self.handler.detect_hallucination(self.content, self.context)
+        self.handler.data_validator.confidence_threshold = 0.5
+        
+        self.handler.detect_hallucination(self.content, self.context)
+        
+        self.assertEqual(self.handler.known_good.get_stats()["hits"], 0)
+    
+    def test_no_hit_after_context_eviction(self):
+        """Test content is re-checked once it left the context window"""
+        handler = ModelHandler({"context_window": 2})
+        handler.detect_hallucination(self.content, self.context)
+        handler.detect_hallucination("Water boils at high heat", self.context)
+        handler.detect_hallucination("Grass grows in spring", self.context)
+        validations = len(handler.data_validator.validation_history)
+        
+        handler.detect_hallucination(self.content, self.context)
+        
+        self.assertEqual(len(handler.data_validator.validation_history), validations + 1)
+    
+    def test_disabled_with_caching(self):
+        """Test fast path is off when caching is disabled"""
+        handler = ModelHandler({"enable_caching": False})
+        
+        self.assertIsNone(handler.known_good)
+        self.assertIsNone(handler.get_performance_metrics()["known_good"])
+
+
+class TestNearDuplicateCache(unittest.TestCase):
+    """Test the SimHash near-duplicate response cache"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.cache = NearDuplicateCache(max_distance=3)
+        self.response = {"success": True, "content": "Revenue grew"}
+    
+    def test_normalization_ignores_case_whitespace_and_fillers(self):
+        """Test trivially different queries normalize to the same tokens"""
+        self.assertEqual(normalize_query("What is  THE revenue?"), normalize_query("please what is revenue"))
+        self.assertEqual(simhash(normalize_query("What is the revenue?")),
+                         simhash(normalize_query("what is revenue")))
+    
+    def test_near_duplicate_hit(self):
+        """Test a reworded query hits within the distance threshold"""
+        self.cache.put("What is the quarterly revenue for the northern region", self.response)
+        
+        hit = self.cache.get("what is quarterly revenue for northern region?")
+        
+        self.assertIsNotNone(hit)
+        self.assertEqual(hit[0], self.response)
+        self.assertLessEqual(hit[1], 3)
+    
+    def test_numbers_negations_and_context_must_match(self):
+        """Test numbers, negations and context are exact parts of the key"""
+        self.cache.put("Revenue in 2023", self.response, {"region": "north"})
+        
+        self.assertIsNone(self.cache.get("Revenue in 2024", {"region": "north"}))
+        self.assertIsNone(self.cache.get("Revenue not in 2023", {"region": "north"}))
+        self.assertIsNone(self.cache.get("Revenue in 2023", {"region": "south"}))
+        self.assertIsNotNone(self.cache.get("revenue in 2023", {"region": "north"}))
+    
+    def test_default_distance_requires_same_words(self):
+        """Test the default cache only merges queries that differ in fillers and punctuation"""
+        cache = NearDuplicateCache()
+        cache.put("What is the quarterly revenue for the northern region", self.response)
+        
+        self.assertIsNone(cache.get("What is the quarterly revenue for the southern region"))
+        self.assertEqual(cache.get("what is quarterly revenue for northern region?")[1], 0)
+    
+    def test_unrelated_query_misses(self):
+        """Test distant queries fall back to full processing"""
+        self.cache.put("What is the quarterly revenue", self.response)
+        
+        self.assertIsNone(self.cache.get("Describe the weather forecast for tomorrow"))
+    
+    def test_memory_bound_evicts_lru(self):
+        """Test entries are evicted once the byte budget is exceeded"""
+        cache = NearDuplicateCache(max_bytes=1000)
+        for i in range(20):
+            cache.put(f"query number {i}", {"success": True, "content": "x" * 100})
+        
+        stats = cache.get_stats()
+        self.assertLessEqual(stats["bytes_used"], 1000)
+        self.assertGreater(stats["evictions"], 0)
+        self.assertIsNone(cache.get("query number 0"))
+    
+    def test_ttl_expiry(self):
+        """Test expired entries are not served"""
+        import time
+        
+        cache = NearDuplicateCache(ttl_seconds=0.01)
+        cache.put("What is the revenue", self.response)
+        time.sleep(0.02)
+        
+        self.assertIsNone(cache.get("What is the revenue"))
+    
+    def test_invalid_distance(self):
+        """Test distance threshold is validated"""
+        with self.assertRaises(ValueError):
+            NearDuplicateCache(max_distance=-1)
+    
+    def test_handler_serves_near_duplicate(self):
+        """Test ModelHandler serves a near-duplicate query from cache"""
+        handler = ModelHandler()
+        first = handler.process_request({"query": "What is the revenue?"})
+        second = handler.process_request({"query": "what is   revenue"})
+        
+        self.assertTrue(first["success"])
+        self.assertEqual(second["content"], first["content"])
+        self.assertTrue(second["cache"]["hit"])
+        self.assertEqual(handler.get_performance_metrics()["response_cache"]["hits"], 1)
+    
+    def test_handler_keys_each_request_once(self):
+        """Test a request's context is hashed once for both the lookup and the store"""
+        handler = ModelHandler()
+        cache = handler.response_generator.response_cache
+        with patch.object(cache, "key", wraps=cache.key) as key:
+            handler.process_request({"query": "What is the revenue?", "context": {"revenue": "10"}})
+        
+        self.assertEqual(key.call_count, 1)
+        self.assertEqual(cache.get_stats()["size"], 1)
+    
+    def test_cached_response_detached_from_caller(self):
+        """Test changes to a response after caching do not reach the cache"""
+        response = {"success": True, "content": "Revenue is 10", "data": [{"key": "revenue", "value": "10"}]}
+        self.cache.put("What is the revenue", response)
+        response["request_id"] = "changed"
+        response["data"][0]["value"] = "changed"
+        
+        cached = self.cache.get("What is the revenue")[0]
+        self.assertNotIn("request_id", cached)
+        self.assertEqual(cached["data"][0]["value"], "10")
+    
+    def test_inconsistent_cached_response_is_regenerated(self):
+        """Test a cache hit that fails the logic check falls back to full generation"""
+        handler = ModelHandler()
+        handler.process_request({"query": "What is the revenue?"})
+        checker = handler.response_generator.logic_checker
+        
+        with patch.object(checker, "check_response_logic",
+                          return_value={"valid": False, "errors": ["contradiction"], "warnings": []}):
+            response = handler.process_request({"query": "what is revenue"})
+        
+        self.assertNotIn("cache", response)
+        self.assertFalse(response["success"])
+    
+    def test_fact_change_bypasses_cache(self):
+        """Test registering a fact forces full processing"""
+        handler = ModelHandler()
+        handler.process_request({"query": "What is the revenue?"})
+        handler.logic_checker.register_fact("revenue", "10")
+        
+        response = handler.process_request({"query": "What is the revenue?"})
+        
+        self.assertNotIn("cache", response)
+
+
+class TestShardedServing(unittest.TestCase):
+    """Test multi-process sharded serving"""
+    
+    def test_hash_ring_is_stable_and_spread(self):
+        """Test keys map consistently and only a removed node's keys move"""
+        ring = HashRing(range(4))
+        smaller = HashRing(range(3))
+        keys = [f"session-{i}" for i in range(1000)]
+        
+        owners = [ring.node_for(key) for key in keys]
+        self.assertEqual(owners, [ring.node_for(key) for key in keys])
+        self.assertEqual(set(owners), {0, 1, 2, 3})
+        
+        moved = [key for key, owner in zip(keys, owners) if owner != 3 and smaller.node_for(key) != owner]
+        self.assertEqual(moved, [])
+    
+    def test_hash_ring_requires_nodes(self):
+        """Test an empty ring is rejected"""
+        with self.assertRaises(ValueError):
+            HashRing([])
+    
+    def test_session_affinity_metrics_and_restart(self):
+        """Test sessions stick to a worker, metrics merge and restarts are graceful"""
+        with ShardedServer(2) as server:
+            request = {"query": "What is the revenue?", "session_id": "analyst-1"}
+            worker = server.worker_for(request)
+            
+            responses = [server.process_request(dict(request), timeout=30) for _ in range(3)]
+            self.assertTrue(all(response["success"] for response in responses))
+            
+            metrics = server.get_performance_metrics()
+            self.assertEqual(metrics["total_requests"], 3)
+            self.assertEqual(metrics["workers"][worker]["total_requests"], 3)
+            self.assertEqual(metrics["latency"]["total"]["count"], 3)
+            
+            pending = server.submit(dict(request))
+            server.restart_worker(worker, timeout=30)
+            self.assertTrue(pending.result(30)["success"])
+            self.assertTrue(server.process_request(dict(request), timeout=30)["success"])
+            
+            metrics = server.get_performance_metrics()
+            self.assertEqual(metrics["workers"][worker]["restarts"], 1)
+            self.assertEqual(metrics["workers"][worker]["total_requests"], 1)
+    
+    def test_dead_worker_fails_pending_and_respawns(self):
+        """Test a killed worker's requests fail and the slot is respawned"""
+        with ShardedServer(1) as server:
+            # Queued while the worker is still starting, so it is never served
+            pending = server.submit({"query": "What is the revenue?"})
+            server._slots[0].process.kill()
+            
+            with self.assertRaises(RuntimeError):
+                pending.result(30)
+            
+            self.assertTrue(server.process_request({"query": "What is the revenue?"}, timeout=30)["success"])
+            self.assertEqual(server._slots[0].restarts, 1)
+    
+    def test_http_rejects_non_object_json(self):
+        """Test the HTTP front end answers 400 for a JSON body that is not an object"""
+        import threading
+        import urllib.error
+        import urllib.request
+        
+        with ShardedServer(1) as server:
+            http_server = serve_http(server, port=0)
+            thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                url = f"http://127.0.0.1:{http_server.server_address[1]}/process"
+                with self.assertRaises(urllib.error.HTTPError) as raised:
+                    urllib.request.urlopen(urllib.request.Request(url, data=b"[1, 2]"), timeout=30)
+                self.assertEqual(raised.exception.code, 400)
+                raised.exception.close()
+            finally:
+                http_server.shutdown()
+                http_server.server_close()
+
+
+class TestSharedReferenceStore(unittest.TestCase):
+    """Test the shared-memory reference store"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.store = SharedReferenceStore.create(64 * 1024)
+        self.reader = SharedReferenceStore.attach(self.store.name)
+        self.digest = "5d41402abc4b2a76b9719d911017c592"
+    
+    def tearDown(self):
+        """Detach and destroy the store"""
+        self.reader.close()
+        self.store.close()
+        self.store.unlink()
+    
+    def test_publish_and_read(self):
+        """Test readers see published facts and fingerprints"""
+        self.store.publish({"capital": "Paris", "population": 67}, {"census": self.digest})
+        
+        self.assertEqual(self.reader.version, 1)
+        self.assertEqual(self.reader.get_fact("capital"), "Paris")
+        self.assertEqual(self.reader.get_fact("population"), 67)
+        self.assertIsNone(self.reader.get_fact("missing"))
+        self.assertEqual(sorted(self.reader.facts()), [("capital", "Paris"), ("population", 67)])
+        self.assertEqual(self.reader.source_fingerprint("census"), self.digest)
+        self.assertIsNone(self.reader.source_fingerprint("other"))
+    
+    def test_publish_replaces_snapshot(self):
+        """Test each publish replaces the tables and bumps the version"""
+        self.store.publish({"a": 1}, {})
+        self.store.publish({"b": 2}, {})
+        
+        self.assertEqual(self.reader.version, 2)
+        self.assertIsNone(self.reader.get_fact("a"))
+        self.assertEqual(self.reader.get_fact("b"), 2)
+    
+    def test_facts_decoded_once_per_version(self):
+        """Test the decoded fact table is reused until the next publish"""
+        self.store.publish({"a": 1}, {})
+        first = self.reader.facts()
+        
+        self.assertIs(self.reader.facts(), first)
+        self.store.publish({"b": 2}, {})
+        self.assertEqual(self.reader.facts(), (("b", 2),))
+    
+    def test_stalled_writer_raises(self):
+        """Test a read gives up when the writer never finishes a publish"""
+        import struct
+        
+        struct.pack_into("<Q", self.store._buf, 8, 1)
+        self.reader.read_timeout = 0.05
+        
+        with self.assertRaises(RuntimeError):
+            self.reader.get_fact("a")
+        struct.pack_into("<Q", self.store._buf, 8, 2)
+    
+    def test_only_writer_publishes(self):
+        """Test readers cannot publish and oversized snapshots are rejected"""
+        with self.assertRaises(RuntimeError):
+            self.reader.publish({}, {})
+        with self.assertRaises(ValueError):
+            self.store.publish({"big": "x" * 100000}, {})
+    
+    def test_components_use_shared_data(self):
+        """Test validator and checker consult the store and see version changes"""
+        self.store.publish({"sky": "blue"}, {"sensor": self.digest})
+        checker = LogicChecker(shared_store=self.reader)
+        validator = DataValidator(shared_store=self.reader)
+        version = checker.facts_version
+        
+        consistent, contradictions = checker.check_statement_consistency("The sky is not blue")
+        self.assertFalse(consistent)
+        self.assertTrue(any("sky" in c for c in contradictions))
+        self.assertTrue(validator.validate_data_point("hello", "sensor")[0])
+        self.assertFalse(validator.validate_data_point("changed", "sensor")[0])
+        
+        self.store.publish({}, {})
+        self.assertGreater(checker.facts_version, version)
+    
+    def test_handler_attaches_by_name(self):
+        """Test ModelHandler attaches to a store named in its config"""
+        handler = ModelHandler({"shared_store_name": self.store.name})
+        
+        self.assertEqual(handler.get_performance_metrics()["shared_store"]["name"], self.store.name)
+        handler.close()
+
+
+class TestSnapshotRestore(unittest.TestCase):
+    """Test snapshot and lazy warm-start of handler state"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        import tempfile
+        
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "handler.snap")
+    
+    def tearDown(self):
+        """Remove snapshot files"""
+        self.tempdir.cleanup()
+    
+    def test_sections_round_trip(self):
+        """Test sections are read back individually"""
+        write_snapshot(self.path, {"a": {"x": 1}, "b": [1, 2, 3]})
+        reader = SnapshotReader(self.path)
+        
+        self.assertEqual(reader.sections, ["a", "b"])
+        self.assertEqual(reader.load("b"), [1, 2, 3])
+        self.assertEqual(reader.load("a"), {"x": 1})
+    
+    def test_rejects_foreign_file(self):
+        """Test files without the snapshot header are rejected"""
+        with open(self.path, "wb") as f:
+            f.write(b"not a snapshot at all")
+        
+        with self.assertRaises(ValueError):
+            SnapshotReader(self.path)
+    
+    def test_handler_warm_start(self):
+        """Test caches, context, facts and metrics survive a restart"""
+        handler = ModelHandler()
+        handler.logic_checker.register_fact("sky", "blue")
+        handler.data_validator.set_source_fingerprint("sensor", "5d41402abc4b2a76b9719d911017c592")
+        first = handler.process_request({"query": "What is the revenue?"})
+        handler.snapshot(self.path)
+        handler.close()
+        
+        restored = ModelHandler()
+        restored.restore(self.path)
+        
+        self.assertEqual(restored.logic_checker.get_context_summary()["facts_registered"], 1)
+        self.assertEqual(restored.data_validator.export_state()["source_data_cache"],
+                         {"sensor": "5d41402abc4b2a76b9719d911017c592"})
+        
+        second = restored.process_request({"query": "what is revenue"})
+        self.assertEqual(second["content"], first["content"])
+        self.assertTrue(second["cache"]["hit"])
+        self.assertEqual(restored.get_performance_metrics()["total_requests"], 2)
+        restored.close()
+    
+    def test_restore_is_deferred_until_first_use(self):
+        """Test deferred state is loaded on first use, exactly once"""
+        calls = []
+        state = LogicChecker().export_state()
+        state["session_facts"] = {"sky": {"value": "blue", "timestamp": "2024-01-01T00:00:00"}}
+        checker = LogicChecker()
+        checker.defer_restore(lambda: calls.append(1) or state)
+        
+        self.assertEqual(calls, [])
+        self.assertEqual(checker.get_context_summary()["facts_registered"], 1)
+        checker.check_statement_consistency("The sky is blue")
+        self.assertEqual(calls, [1])
+        
+        cache = NearDuplicateCache()
+        cache.put("What is the revenue", {"success": True})
+        entries = cache.export_state()
+        warm = NearDuplicateCache()
+        warm.defer_restore(lambda: entries)
+        self.assertIsNotNone(warm.get("what is revenue"))
+
+
+class TestShardedCounterRetirement(unittest.TestCase):
+    """Test counter shards of exited threads are folded"""
+    
+    def test_exited_threads_are_folded(self):
+        """Test totals survive while shards of finished threads are dropped"""
+        import threading
+        from amb.metrics import ShardedCounters
+        
+        counters = ShardedCounters(["hits"])
+        for _ in range(10):
+            thread = threading.Thread(target=counters.add, args=("hits", 2))
+            thread.start()
+            thread.join()
+        
+        self.assertEqual(counters.snapshot()["hits"], 20)
+        self.assertEqual(len(counters._shards), 0)
+        counters.add("hits")
+        self.assertEqual(counters.snapshot()["hits"], 21)
+
+
+class TestQueueLogging(unittest.TestCase):
+    """Test the queue-based logging pipeline"""
+    
+    def setUp(self):
+        """Set up a logger that passes INFO records"""
+        import logging
+        
+        self.logger = logging.getLogger("amb.test_pipeline")
+        self.logger.setLevel(logging.INFO)
+        self.records = []
+        self.capture = logging.Handler()
+        self.capture.emit = self.records.append
+    
+    def tearDown(self):
+        """Reset the logger level"""
+        import logging
+        
+        self.logger.setLevel(logging.NOTSET)
+    
+    def test_sampler_only_samples_per_request_info(self):
+        """Test warnings and unmarked records always pass the sampler"""
+        import logging
+        
+        sampler = RequestLogSampler(0.0)
+        
+        def record(level, per_request):
+            entry = logging.LogRecord("amb", level, __file__, 1, "message", None, None)
+            if per_request:
+                entry.per_request = True
+            return entry
+        
+        self.assertFalse(sampler.filter(record(logging.INFO, True)))
+        self.assertTrue(sampler.filter(record(logging.INFO, False)))
+        self.assertTrue(sampler.filter(record(logging.WARNING, True)))
+        with self.assertRaises(ValueError):
+            RequestLogSampler(1.5)
+    
+    def test_records_reach_handlers_through_queue(self):
+        """Test records are sampled, delivered by the listener and formatted lazily"""
+        import threading
+        
+        threads = []
+        self.capture.emit = lambda record: (self.records.append(record), threads.append(threading.current_thread()))
+        
+        with QueueLogging([self.capture], logger_name="amb.test_pipeline", sample_rate=0.0) as pipeline:
+            self.logger.info("Processing request %s", "r1", extra=PER_REQUEST)
+            self.logger.info("Started")
+            self.logger.warning("Slow request %s", "r2", extra=PER_REQUEST)
+        
+        self.assertEqual([record.getMessage() for record in self.records], ["Started", "Slow request r2"])
+        self.assertEqual(self.records[1].args, ("r2",))
+        self.assertNotIn(threading.current_thread(), threads)
+        self.assertEqual(pipeline.get_stats()["dropped"], 0)
+        self.assertEqual(self.logger.handlers, [])
+    
+    def test_handler_config_enables_queue_logging(self):
+        """Test log_queue and log_sample_rate route the handler's logs through a sampled queue"""
+        import logging
+        
+        amb_logger = logging.getLogger("amb")
+        saved = amb_logger.handlers[:]
+        handler = ModelHandler({"confidence_threshold": 0.85, "context_window": 100, "max_response_time_ms": 200,
+                                "log_queue": True, "log_sample_rate": 0.25})
+        
+        self.assertEqual(amb_logger.handlers, [handler.log_queue._handler])
+        self.assertEqual(handler.log_queue.get_stats()["sample_rate"], 0.25)
+        self.assertTrue(handler.process_request({"query": "Test query"})["success"])
+        
+        handler.close()
+        self.assertEqual(amb_logger.handlers, saved)
+        self.assertIsNone(ModelHandler().log_queue)
+
+
+class TestAuditSink(unittest.TestCase):
+    """Test the rotating compressed audit sink"""
+    
+    def setUp(self):
+        """Create a scratch directory"""
+        import tempfile
+        
+        self.directory = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Remove the scratch directory"""
+        import shutil
+        
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def test_entries_rotate_and_read_back_in_order(self):
+        """Test size-based rotation keeps every entry in order"""
+        sink = SegmentAuditSink(self.directory, segment_bytes=200, flush_interval=60)
+        for i in range(20):
+            sink.write("validation", {"index": i})
+        sink.write("hallucination", {"reason": "pattern"})
+        sink.close()
+        
+        self.assertGreater(len(segment_paths(self.directory)), 1)
+        self.assertEqual([entry["index"] for entry in read_audit(self.directory, "validation")], list(range(20)))
+        self.assertEqual(list(read_audit(self.directory, "hallucination")),
+                         [{"stream": "hallucination", "reason": "pattern"}])
+        self.assertEqual(sink.get_stats()["written"], 21)
+    
+    def test_full_buffer_drops_after_backpressure(self):
+        """Test writes beyond the buffer wait briefly and are then counted as dropped"""
+        sink = SegmentAuditSink(self.directory, flush_interval=60, max_buffer=2, backpressure_timeout=0.01)
+        for i in range(5):
+            sink.write("validation", {"index": i})
+        
+        self.assertEqual(sink.get_stats()["dropped"], 3)
+        sink.close()
+        self.assertEqual(len(list(read_audit(self.directory))), 2)
+    
+    def test_concurrent_writes_and_flushes_keep_order(self):
+        """Test entries stay in order under concurrent flushes and writes after close are dropped"""
+        import threading
+        
+        sink = SegmentAuditSink(self.directory, segment_bytes=500, flush_interval=0.001)
+        
+        def flush_repeatedly():
+            for _ in range(50):
+                sink.flush()
+        
+        flushers = [threading.Thread(target=flush_repeatedly) for _ in range(4)]
+        for thread in flushers:
+            thread.start()
+        for i in range(500):
+            sink.write("validation", {"index": i})
+        for thread in flushers:
+            thread.join()
+        sink.close()
+        sink.write("validation", {"index": 500})
+        
+        self.assertEqual([entry["index"] for entry in read_audit(self.directory)], list(range(500)))
+        self.assertEqual(sink.get_stats()["written"], 500)
+        self.assertEqual(sink.get_stats()["dropped"], 1)
+    
+    def test_handler_audits_validations_and_hallucinations(self):
+        """Test the handler sends validation and hallucination events to the sink"""
+        handler = ModelHandler({"audit_path": self.directory})
+        handler.data_validator.validate_data_point("value", "sensor")
+        handler.detect_hallucination("As an AI, I think so")
+        handler.close()
+        
+        streams = [entry["stream"] for entry in read_audit(self.directory)]
+        self.assertIn("validation", streams)
+        self.assertIn("hallucination", streams)
+
+
+class TestRecords(unittest.TestCase):
+    """Test the slotted internal record types"""
+    
+    def test_records_export_compatible_dicts(self):
+        """Test records format timestamps only when exported and round-trip"""
+        import time
+        
+        now = time.time()
+        record = ContextRecord("The sky is blue", now, {"turn": 1})
+        exported = record.to_dict()
+        
+        self.assertEqual(datetime.fromisoformat(exported["timestamp"]), datetime.utcfromtimestamp(now))
+        self.assertEqual(ContextRecord.from_dict(exported).to_dict(), exported)
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertEqual(ValidationRecord(now, b"\x01" * 16, "s", True, 0.9).to_dict()["data_hash"], "01" * 16)
+    
+    def test_public_outputs_stay_dicts(self):
+        """Test context summaries, exports and response data are still plain dicts"""
+        handler = ModelHandler()
+        response = handler.process_request({"query": "Test query", "context": {"value": 1}})
+        handler.logic_checker.check_statement_consistency("The sky is blue")
+        
+        self.assertEqual(response["data"][0]["key"], "value")
+        self.assertIsInstance(response["data"][0]["timestamp"], str)
+        self.assertIsInstance(handler.logic_checker.export_state()["context"][0], dict)
+        self.assertIsInstance(handler.logic_checker.get_context_summary()["newest_context"], str)
+        self.assertEqual(format_timestamp(0), "1970-01-01T00:00:00")
+    
+    def test_response_timestamp_formatted_once(self):
+        """Test a large context's data points share one formatted timestamp"""
+        import amb.clock
+        import amb.records
+        
+        handler = ModelHandler()
+        context = {f"key{i}": i for i in range(5000)}
+        
+        with patch.object(amb.records, "format_timestamp", wraps=amb.records.format_timestamp) as records_format, \
+                patch.object(amb.clock, "format_timestamp", wraps=amb.clock.format_timestamp) as clock_format:
+            response = handler.process_request({"query": "Test query", "context": context})
+        
+        self.assertEqual(len(response["data"]), 5000)
+        self.assertEqual(records_format.call_count, 0)
+        self.assertEqual(clock_format.call_count, 1)
+        self.assertEqual({point["timestamp"] for point in response["data"]}, {response["metadata"]["timestamp"]})
+
+
+class TestRequestClock(unittest.TestCase):
+    """Test the per-request clock snapshot"""
+    
+    def test_clock_is_scoped_and_memoized(self):
+        """Test the clock is visible only inside its scope and formats once"""
+        self.assertIsNone(current_clock())
+        
+        with request_clock() as clock:
+            self.assertIs(current_clock(), clock)
+            self.assertIs(request_timestamp(), clock.iso)
+            self.assertIs(clock.iso, clock.iso)
+        
+        self.assertIsNone(current_clock())
+        self.assertIsInstance(request_timestamp(), str)
+    
+    def test_response_timestamps_are_consistent(self):
+        """Test every timestamp in one response comes from the request clock"""
+        handler = ModelHandler()
+        
+        response = handler.process_request({"query": "Test query", "context": {"a": 1, "b": 2}})
+        
+        timestamps = {point["timestamp"] for point in response["data"]}
+        timestamps.add(response["metadata"]["timestamp"])
+        self.assertEqual(len(timestamps), 1)
+        started = datetime.fromisoformat(timestamps.pop())
+        self.assertEqual(response["request_id"][4:18], started.strftime("%Y%m%d%H%M%S"))
+
+
+class TestContextView(unittest.TestCase):
+    """Test lazy data-point views and serialized contexts"""
+    
+    def test_json_context_streams_members(self):
+        """Test serialized contexts decode member by member like json.loads"""
+        import json
+        
+        raw = json.dumps({"a": 1, "b": None, "c": {"d": [1, 2]}, "e": "x"}).encode()
+        context = JsonContext(raw)
+        
+        self.assertEqual(dict(context.items()), json.loads(raw))
+        self.assertEqual(context["c"], {"d": [1, 2]})
+        self.assertEqual(context.get("missing"), None)
+        self.assertEqual(len(context), 4)
+        self.assertEqual(dict(JsonContext('{"k": 1, "k": 2}')), {"k": 2})
+        self.assertFalse(JsonContext(b" { } "))
+        
+        points = list(DataPointView(context, 0.0))
+        self.assertEqual([point.key for point in points], ["a", "c", "e"])
+        
+        with self.assertRaises(ValueError):
+            JsonContext(b"[1, 2]")
+        with self.assertRaises(ValueError):
+            list(iter_json_object('{"a": 1,}'))
+        with self.assertRaises(ValueError):
+            list(iter_json_object('{"a": 1} trailing'))
+    
+    def test_serialized_context_request(self):
+        """Test requests accept a JSON bytes context and only keep accepted points"""
+        import json
+        
+        handler = ModelHandler()
+        context = {f"key{i}": i for i in range(2000)}
+        context["bad"] = "[INSERT DATA HERE]"
+        
+        response = handler.process_request({"query": "Test query", "context": json.dumps(context).encode()})
+        
+        self.assertTrue(response["success"])
+        self.assertEqual(len(response["data"]), 2000)
+        self.assertNotIn("bad", [point["key"] for point in response["data"]])
+        
+        rejected = handler.process_request({"query": "Test query", "context": b"not json"})
+        self.assertFalse(rejected["success"])
+
+
+class TestContentScanner(unittest.TestCase):
+    """Test linear-time chunked content scanning"""
+    
+    def test_linear_pattern_matches_like_original(self):
+        """Test rewritten gap rules match exactly when the original patterns do"""
+        import re
+        
+        patterns = [r"\[INSERT.*HERE\]", r"\[.*?\]|\{.*?\}", r"(?i)as an ai|as a language model"]
+        texts = ["[INSERT name HERE]", "[INSERT [INSERT x HERE]", "[INSERT x\nHERE]", "HERE] [INSERT",
+                 "a [b] c", "{ [ }", "] [", "As An AI", ""]
+        
+        for pattern in patterns:
+            for text in texts:
+                self.assertEqual(bool(re.search(pattern, text)), bool(re.search(linear_pattern(pattern), text)))
+    
+    def test_matches_across_chunks(self):
+        """Test chunked and parallel scans find matches spanning chunk boundaries"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        patterns = [r"\[INSERT.*HERE\]", r"\{.*?\}", r"needle"]
+        text = "x" * 50 + "[INSERT" + "y" * 100 + "HERE]" + "\n{" + "z" * 60 + "nee" + "dle"
+        
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for scanner in (ContentScanner(patterns, chunk_size=16, overlap=8),
+                            ContentScanner(patterns, chunk_size=16, overlap=8, executor=executor)):
+                self.assertEqual(scanner.matches(text), [0, 2])
+                self.assertEqual(scanner.first_match(text), 0)
+                self.assertEqual(scanner.matches(text.replace("\n", "")), [0, 2])
+                self.assertEqual(scanner.matches("[INSERT" + "y" * 40 + "\nHERE]"), [])
+    
+    def test_pathological_content_stays_within_budget(self):
+        """Test multi-megabyte adversarial content cannot stall a worker"""
+        import time
+        
+        handler = ModelHandler({"confidence_threshold": 0.85, "context_window": 100,
+                                "max_response_time_ms": 200, "scan_budget_ms": 20})
+        
+        for content in ("[" * 5_000_000, "[INSERT" * 700_000):
+            start = time.monotonic()
+            detected, _, _ = handler.detect_hallucination(content)
+            self.assertTrue(detected)
+            self.assertLess(time.monotonic() - start, 2.0)
+        
+        scanner = ContentScanner([r"\[.*?\]"], chunk_size=1024, overlap=16, time_budget=0.001)
+        with self.assertRaises(ScanBudgetExceeded):
+            scanner.matches("[" * 5_000_000)
+        
+        is_valid, confidence, error = handler.data_validator.validate_data_point("[" * 5_000_000, "doc")
+        self.assertFalse(is_valid)
+        self.assertTrue(error.startswith("Scan budget exceeded"))
+        self.assertEqual(confidence, 1.0)
+        
+        handler.close()
+    
+    def test_large_clean_content_passes_by_default(self):
+        """Test a multi-megabyte clean payload is scanned in full and accepted with the default config"""
+        handler = ModelHandler()
+        content = "The value is clean text. " * 200_000
+        
+        self.assertEqual(handler.data_validator.validate_data_point(content, "doc")[:2], (True, 1.0))
+        detected, _, reason = handler.detect_hallucination(content, {"source": "doc"})
+        self.assertFalse(detected, reason)
+        
+        handler.close()
+
+
 if __name__ == "__main__":
     # Run tests with verbosity
     unittest.main(verbosity=2)
\ No newline at end of file